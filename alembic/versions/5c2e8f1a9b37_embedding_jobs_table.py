@@ -0,0 +1,52 @@
+"""embedding jobs table
+
+Revision ID: 5c2e8f1a9b37
+Revises: 40e20833a8bd
+Create Date: 2026-10-18 09:14:27.318442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8f1a9b37'
+down_revision: Union[str, None] = '40e20833a8bd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('embedding_jobs',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('candidate_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('pending', 'processing', 'failed', name='embedding_job_status_enum'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.String(), nullable=True),
+    sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['candidate_id'], ['candidates.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_embedding_jobs_id'), 'embedding_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_embedding_jobs_candidate_id'), 'embedding_jobs', ['candidate_id'], unique=False)
+    op.create_index(op.f('ix_embedding_jobs_status'), 'embedding_jobs', ['status'], unique=False)
+
+    # Re-queue candidates whose embedding never landed (e.g. a BackgroundTask
+    # lost on restart) so the worker picks them up.
+    op.execute(
+        """
+        INSERT INTO embedding_jobs (candidate_id, status, attempts, created_at)
+        SELECT id, 'pending', 0, now() FROM candidates WHERE is_embedding_ready = false
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_embedding_jobs_status'), table_name='embedding_jobs')
+    op.drop_index(op.f('ix_embedding_jobs_candidate_id'), table_name='embedding_jobs')
+    op.drop_index(op.f('ix_embedding_jobs_id'), table_name='embedding_jobs')
+    op.drop_table('embedding_jobs')
+    sa.Enum(name='embedding_job_status_enum').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,30 @@
+"""candidate created_at keyset index
+
+Revision ID: a6e2c8f4b0d3
+Revises: f3a7d1c5e9b2
+Create Date: 2026-10-18 16:29:14.508731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6e2c8f4b0d3'
+down_revision: Union[str, None] = 'f3a7d1c5e9b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows without created_at would never match a (created_at, id) cursor.
+    op.execute("UPDATE candidates SET created_at = to_timestamp(0) WHERE created_at IS NULL")
+    with op.get_context().autocommit_block():
+        op.create_index('ix_candidates_created_at_id', 'candidates', ['created_at', 'id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_candidates_created_at_id', table_name='candidates', postgresql_concurrently=True)
@@ -0,0 +1,50 @@
+"""embedding halfvec hnsw indexes
+
+Revision ID: b8f0c3d5e7a1
+Revises: a4d8e2c6b190
+Create Date: 2026-10-18 14:47:05.117384
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8f0c3d5e7a1'
+down_revision: Union[str, None] = 'a4d8e2c6b190'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EMBEDDING_DIMENSION = 3072
+
+
+def upgrade() -> None:
+    # HNSW on `vector` is limited to 2000 dimensions, so index a halfvec
+    # cast of the 3072-dim columns instead. Built CONCURRENTLY so writes to
+    # candidates keep working during the (long) build; that cannot run in
+    # the migration transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_candidates_embedding_halfvec_hnsw',
+            'candidates',
+            [sa.text(f'(embedding::halfvec({EMBEDDING_DIMENSION})) halfvec_cosine_ops')],
+            unique=False,
+            postgresql_using='hnsw',
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_candidate_chunks_embedding_halfvec_hnsw',
+            'candidate_chunks',
+            [sa.text(f'(embedding::halfvec({EMBEDDING_DIMENSION})) halfvec_cosine_ops')],
+            unique=False,
+            postgresql_using='hnsw',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_candidate_chunks_embedding_halfvec_hnsw', table_name='candidate_chunks', postgresql_concurrently=True)
+        op.drop_index('ix_candidates_embedding_halfvec_hnsw', table_name='candidates', postgresql_concurrently=True)
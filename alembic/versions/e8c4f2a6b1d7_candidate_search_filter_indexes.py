@@ -0,0 +1,35 @@
+"""candidate search filter indexes
+
+Revision ID: e8c4f2a6b1d7
+Revises: d5b1e7a3c9f4
+Create Date: 2026-10-18 15:58:42.270194
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c4f2a6b1d7'
+down_revision: Union[str, None] = 'd5b1e7a3c9f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built CONCURRENTLY so the candidates table stays writable.
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_candidates_years_of_experience'), 'candidates', ['years_of_experience'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_candidates_status'), 'candidates', ['status'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_candidates_skills', 'candidates', ['skills'], unique=False, postgresql_using='gin', postgresql_ops={'skills': 'jsonb_path_ops'}, postgresql_concurrently=True)
+        op.create_index('ix_candidates_address_country', 'candidates', [sa.text("lower(address ->> 'country')")], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_candidates_address_country', table_name='candidates', postgresql_concurrently=True)
+        op.drop_index('ix_candidates_skills', table_name='candidates', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_candidates_status'), table_name='candidates', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_candidates_years_of_experience'), table_name='candidates', postgresql_concurrently=True)
@@ -0,0 +1,49 @@
+"""candidate trigram indexes
+
+Revision ID: f3a7d1c5e9b2
+Revises: e8c4f2a6b1d7
+Create Date: 2026-10-18 16:12:37.845216
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a7d1c5e9b2'
+down_revision: Union[str, None] = 'e8c4f2a6b1d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Built CONCURRENTLY so the candidates table stays writable.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_candidates_full_name_trgm',
+            'candidates',
+            [sa.text("((coalesce(first_name, '') || ' ') || coalesce(last_name, '')) gin_trgm_ops")],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+        for column in ('email', 'phone_number', 'job_title'):
+            op.create_index(
+                f'ix_candidates_{column}_trgm',
+                'candidates',
+                [column],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in ('job_title', 'phone_number', 'email'):
+            op.drop_index(f'ix_candidates_{column}_trgm', table_name='candidates', postgresql_concurrently=True)
+        op.drop_index('ix_candidates_full_name_trgm', table_name='candidates', postgresql_concurrently=True)
@@ -8,8 +8,14 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     BigInteger,
+    Index,
+    UniqueConstraint,
+    cast,
+    func,
+    literal_column,
+    text,
 )
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR, UUID, JSONB
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from datetime import datetime, timezone
 import uuid
@@ -17,7 +23,18 @@ import uuid
 from .base import Base
 from typing import Optional
 
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import BIT, HALFVEC, Vector
+
+# Width of every full embedding column.
+EMBEDDING_DIMENSION = 3072
+# Width of CandidateEmbedding.embedding_compact: the leading dimensions of
+# the full embedding, re-normalized and stored as half precision for the
+# ANN index.
+COMPACT_EMBEDDING_DIMENSION = 768
+# Width of CandidateEmbedding.embedding_binary: one sign bit per dimension.
+EMBEDDING_BITS = EMBEDDING_DIMENSION
+# CandidateEmbedding.section of the whole-profile vector.
+PROFILE_SECTION = "profile"
 
 
 
@@ -53,6 +70,100 @@ class Attachment(Base):
     candidate: Mapped["Candidate"] = relationship("Candidate", back_populates="resume")
 
 
+class AttachmentText(Base):
+    """
+    Text extracted once from an attachment's PDF at upload. Parsing,
+    embedding and chat read it from here instead of re-downloading and
+    re-parsing the file.
+    """
+
+    __tablename__ = "attachment_texts"
+
+    attachment_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("attachments.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # sha256 of the file bytes; an identical upload reuses the stored text.
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    text: Mapped[str] = mapped_column(String, nullable=False)
+    page_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Fewer than page_count when the PDF_EXTRACT_MAX_PAGES cap applied.
+    pages_extracted: Mapped[int] = mapped_column(Integer, nullable=False)
+    extracted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+
+
+class CvParseResult(Base):
+    """
+    cv_data the LLM extracted from a resume file, cached per file content,
+    prompt version and model. A duplicate upload returns it without a new
+    LLM call; its file is still stored as a separate S3 object, so every
+    attachment owns its object and can be deleted independently.
+    """
+
+    __tablename__ = "cv_parse_results"
+
+    # sha256 of the file bytes, as in AttachmentText.content_hash.
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    prompt_version: Mapped[int] = mapped_column(Integer, primary_key=True)
+    model: Mapped[str] = mapped_column(String, primary_key=True)
+    cv_data: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+
+
+class ResumeParseJob(Base):
+    """
+    A resume accepted by /upload_resume/async, queued for the resume parse
+    worker (tasks.resume_parse_worker).
+    """
+
+    __tablename__ = "resume_parse_jobs"
+    __table_args__ = (
+        # Workers claim and reclaim unfinished jobs by their heartbeat.
+        Index(
+            "ix_resume_parse_jobs_unfinished_updated_at",
+            "updated_at",
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    status: Mapped[str] = mapped_column(
+        Enum(
+            "queued", "running", "succeeded", "failed",
+            name="resume_parse_job_status_enum",
+        ),
+        nullable=False,
+        default="queued",
+    )
+    filename: Mapped[str] = mapped_column(String, nullable=False)
+    content_type: Mapped[str] = mapped_column(String, nullable=False)
+    # The uploaded resume, stored before the job is queued. It becomes the
+    # attachment's object once the job succeeds.
+    s3_key: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Latest completed stage, and every stage as {"stage", "at"} in order.
+    stage: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    stages: Mapped[list[dict]] = mapped_column(
+        JSONB, nullable=False, default=lambda: []
+    )
+    # UploadCVResponse of a succeeded job.
+    result: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -127,6 +238,18 @@ class Recruiter(Base):
 
 class Candidate(Base):
     __tablename__ = "candidates"
+    __table_args__ = (
+        Index("ix_candidates_search_vector", "search_vector", postgresql_using="gin"),
+        # Keyset pagination of the candidate list (newest first)
+        Index("ix_candidates_created_at_id", "created_at", "id"),
+        # Search filters (helpers.search.candidate_filter_conditions)
+        Index(
+            "ix_candidates_skills",
+            "skills",
+            postgresql_using="gin",
+            postgresql_ops={"skills": "jsonb_path_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(
@@ -138,24 +261,23 @@ class Candidate(Base):
     phone_number: Mapped[str] = mapped_column(String, nullable=True)
     address: Mapped[dict] = mapped_column(JSONB, nullable=True)
     date_of_birth: Mapped[datetime] = mapped_column(DateTime, nullable=True)
-    years_of_experience: Mapped[int] = mapped_column(Integer, nullable=True)
+    years_of_experience: Mapped[int] = mapped_column(Integer, nullable=True, index=True)
     job_title: Mapped[str] = mapped_column(String, nullable=True)
     skills: Mapped[dict] = mapped_column(JSONB, nullable=True)
     certifications: Mapped[list[dict]] = mapped_column(JSONB, nullable=True)
     personal_growth : Mapped[list[dict]] = mapped_column(JSONB, nullable=True)
     who_am_i: Mapped[dict] = mapped_column(JSONB, nullable=True)
     success_stories: Mapped[list[dict]] = mapped_column(JSONB, nullable=True)
-    status: Mapped[str] = mapped_column(String, nullable=True, default="applied")
+    status: Mapped[str] = mapped_column(String, nullable=True, default="applied", index=True)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=True, default=datetime.now(timezone.utc)
+        DateTime(timezone=True), nullable=True, default=lambda: datetime.now(timezone.utc)
     )
     resume_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("attachments.id"), nullable=True
     )
-    embedding: Mapped[list[float]] = mapped_column(Vector(3072), nullable=True)
-    is_embedding_ready: Mapped[bool] = mapped_column(
-        Boolean, nullable=False, default=False
-    )
+    # Vectors live in candidate_embeddings (CandidateEmbedding).
+    # Full-text document, see helpers.search.candidate_search_vector
+    search_vector: Mapped[Optional[str]] = mapped_column(TSVECTOR, nullable=True)
 
     # Relationship
     user: Mapped["User"] = relationship("User", back_populates="candidate")
@@ -171,6 +293,246 @@ class Candidate(Base):
     
 
 
+class CandidateChunk(Base):
+    __tablename__ = "candidate_chunks"
+    # One row per embedding model, so a version being backfilled keeps its
+    # own chunks until the cutover drops the retired model's.
+    __table_args__ = (
+        UniqueConstraint(
+            "candidate_id",
+            "section",
+            "source_key",
+            "embedding_model",
+            name="uq_candidate_chunks_source_model",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
+    candidate_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("candidates.id", ondelete="CASCADE"), index=True
+    )
+    # work_experience, education, skills, success_stories or resume
+    section: Mapped[str] = mapped_column(String, nullable=False)
+    # Identifies the chunk within its section (row id, story id, resume window)
+    source_key: Mapped[str] = mapped_column(String, nullable=False)
+    content: Mapped[str] = mapped_column(String, nullable=False)
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    embedding: Mapped[list[float]] = mapped_column(Vector(EMBEDDING_DIMENSION), nullable=False)
+    embedding_model: Mapped[str] = mapped_column(String, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+
+
+# Full-width HNSW indexes. `vector` indexes are capped at 2000 dimensions,
+# so they index a half-precision cast; queries must order by the same
+# expression (see helpers.search.halfvec_cosine_distance).
+Index(
+    "ix_candidate_chunks_embedding_halfvec_hnsw",
+    cast(CandidateChunk.embedding, HALFVEC(EMBEDDING_DIMENSION)).label("embedding_halfvec"),
+    postgresql_using="hnsw",
+    postgresql_ops={"embedding_halfvec": "halfvec_cosine_ops"},
+)
+# Country filter, matched case-insensitively. The key is rendered inline
+# (not as a bind parameter) so filter queries match the index expression.
+CANDIDATE_COUNTRY = func.lower(Candidate.address.op("->>")(literal_column("'country'")))
+Index("ix_candidates_address_country", CANDIDATE_COUNTRY)
+
+# Trigram indexes for the name/contact search (helpers.search.trigram_search).
+CANDIDATE_FULL_NAME = (
+    func.coalesce(Candidate.first_name, text("''"))
+    .op("||")(text("' '"))
+    .op("||")(func.coalesce(Candidate.last_name, text("''")))
+)
+Index(
+    "ix_candidates_full_name_trgm",
+    CANDIDATE_FULL_NAME.label("full_name"),
+    postgresql_using="gin",
+    postgresql_ops={"full_name": "gin_trgm_ops"},
+)
+for _column in ("email", "phone_number", "job_title"):
+    Index(
+        f"ix_candidates_{_column}_trgm",
+        Candidate.__table__.c[_column],
+        postgresql_using="gin",
+        postgresql_ops={_column: "gin_trgm_ops"},
+    )
+
+
+class EmbeddingJob(Base):
+    __tablename__ = "embedding_jobs"
+    __table_args__ = (
+        # At most one pending job per candidate: change events for the same
+        # candidate are merged into it (see tasks.candidates.candidate_changed).
+        Index(
+            "uq_embedding_jobs_pending_candidate",
+            "candidate_id",
+            unique=True,
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
+    candidate_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("candidates.id", ondelete="CASCADE"), index=True
+    )
+    status: Mapped[str] = mapped_column(
+        Enum("pending", "processing", "failed", name="embedding_job_status_enum"),
+        nullable=False,
+        default="pending",
+        index=True,
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    # Not claimed before this time; pushed back by further edits (debounce).
+    run_after: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        index=True,
+    )
+    # Chunk sections to refresh; NULL means the whole candidate.
+    sections: Mapped[Optional[list[str]]] = mapped_column(ARRAY(String), nullable=True)
+    locked_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+
+
+class EmbeddingBackfill(Base):
+    __tablename__ = "embedding_backfills"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    last_candidate_id: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    processed: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+
+
+class EmbeddingVersion(Base):
+    """
+    An embedding model the candidate index has been or is being built with.
+    Vectors of every version live in `candidate_embeddings` and
+    `candidate_chunks`, tagged with the model. Exactly one version is
+    `active` and every search is pinned to it; a `backfilling` version is
+    dual-written next to it until it is cut over.
+    """
+
+    __tablename__ = "embedding_versions"
+
+    model: Mapped[str] = mapped_column(String, primary_key=True)
+    provider: Mapped[str] = mapped_column(String, nullable=False)
+    status: Mapped[str] = mapped_column(
+        Enum("backfilling", "active", "retired", name="embedding_version_status_enum"),
+        nullable=False,
+        default="backfilling",
+        index=True,
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+    activated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+
+class CandidateEmbedding(Base):
+    """
+    Candidate vectors, one row per embedding model and section. Kept off
+    the candidates row so candidate reads and updates never touch them.
+    """
+
+    __tablename__ = "candidate_embeddings"
+    __table_args__ = (
+        Index(
+            "ix_candidate_embeddings_compact_hnsw",
+            "embedding_compact",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding_compact": "halfvec_cosine_ops"},
+        ),
+        Index(
+            "ix_candidate_embeddings_binary_hnsw",
+            "embedding_binary",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding_binary": "bit_hamming_ops"},
+        ),
+    )
+
+    candidate_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("candidates.id", ondelete="CASCADE"), primary_key=True
+    )
+    model: Mapped[str] = mapped_column(String, primary_key=True)
+    section: Mapped[str] = mapped_column(
+        String, primary_key=True, default=PROFILE_SECTION
+    )
+    embedding: Mapped[list[float]] = mapped_column(Vector(EMBEDDING_DIMENSION), nullable=False)
+    embedding_compact: Mapped[Optional[list[float]]] = mapped_column(
+        HALFVEC(COMPACT_EMBEDDING_DIMENSION), nullable=True
+    )
+    embedding_binary: Mapped[Optional[str]] = mapped_column(
+        BIT(EMBEDDING_BITS), nullable=True
+    )
+    input_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+
+
+Index(
+    "ix_candidate_embeddings_embedding_halfvec_hnsw",
+    cast(CandidateEmbedding.embedding, HALFVEC(EMBEDDING_DIMENSION)).label(
+        "embedding_halfvec"
+    ),
+    postgresql_using="hnsw",
+    postgresql_ops={"embedding_halfvec": "halfvec_cosine_ops"},
+)
+
+
+class CandidateEmbeddingDeletion(Base):
+    """
+    Log of deleted whole-profile vectors, written by a trigger on
+    `candidate_embeddings` (see the b8e4f0a6c2d9 migration) so vector
+    snapshots can drop them without re-reading every id.
+    """
+
+    __tablename__ = "candidate_embedding_deletions"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    candidate_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    model: Mapped[str] = mapped_column(String, nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        index=True,
+    )
+
+
+class QueryEmbedding(Base):
+    """Persisted search-query embeddings, shared by all API workers."""
+
+    __tablename__ = "query_embeddings"
+
+    model: Mapped[str] = mapped_column(String, primary_key=True)
+    # Normalized search string (see util.query_cache.normalize_query)
+    query: Mapped[str] = mapped_column(String, primary_key=True)
+    embedding: Mapped[list[float]] = mapped_column(
+        Vector(EMBEDDING_DIMENSION), nullable=False
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        index=True,
+    )
+
+
 class WorkExperience(Base):
     __tablename__ = "work_experience"
     
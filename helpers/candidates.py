@@ -0,0 +1,40 @@
+from sqlalchemy import Select, select
+from sqlalchemy.orm import load_only
+
+from db.models import Candidate
+
+# Columns read by the candidate card responses (ListCandidatesResponse and
+# ListCandidatesFromSessionIdResponse).
+CANDIDATE_CARD_COLUMNS = (
+    Candidate.id,
+    Candidate.first_name,
+    Candidate.last_name,
+    Candidate.email,
+    Candidate.phone_number,
+    Candidate.date_of_birth,
+    Candidate.years_of_experience,
+    Candidate.job_title,
+    Candidate.status,
+    Candidate.created_at,
+    Candidate.skills,
+)
+
+CANDIDATE_PERSONAL_INFO_COLUMNS = (
+    Candidate.id,
+    Candidate.first_name,
+    Candidate.last_name,
+    Candidate.job_title,
+    Candidate.email,
+    Candidate.phone_number,
+    Candidate.address,
+    Candidate.years_of_experience,
+)
+
+
+def candidate_card_query(columns=CANDIDATE_CARD_COLUMNS) -> Select:
+    """
+    `select(Candidate)` loading only `columns`. The embeddings, search
+    vector and large JSONB documents stay in the database; reading any
+    other attribute raises instead of issuing a lazy load.
+    """
+    return select(Candidate).options(load_only(*columns, raiseload=True))
@@ -1,15 +1,15 @@
-import pdfplumber
 import httpx
 from util.app_config import config
 from datetime import datetime
 
+# OpenRouter model that turns resume text into cv_data.
+CV_PARSE_MODEL = "google/gemini-2.0-flash-001"
+# Bump when the prompt below changes so cached parse results go stale.
+CV_PROMPT_VERSION = 1
 
-async def process_cv_async(file_path) -> str:
-    try:
-        # Read PDF content
-        with pdfplumber.open(file_path) as pdf:
-            docs_content = "\n\n".join(page.extract_text() for page in pdf.pages)
 
+async def process_cv_async(docs_content: str) -> str:
+    try:
         api_key = config.OPEN_ROUTER_KEY
 
         current_date = datetime.now()
@@ -86,7 +86,7 @@ async def process_cv_async(file_path) -> str:
                     "Content-Type": "application/json",
                 },
                 json={
-                    "model": "google/gemini-2.0-flash-001",
+                    "model": CV_PARSE_MODEL,
                     "messages": [{"role": "user", "content": prompt}],
                 },
             )
@@ -0,0 +1,123 @@
+import asyncio
+import hashlib
+import logging
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import Attachment, AttachmentText
+from util.app_config import config
+from util.pdf_text import PdfText, extract_pdf
+
+logger = logging.getLogger(__name__)
+
+
+def file_content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+async def extract_resume_text(
+    db: AsyncSession, source: str | bytes, content_hash: str
+) -> PdfText:
+    """
+    Text of the resume at path `source` or in `source` bytes. A file whose
+    content was already extracted for another attachment is not parsed
+    again.
+    """
+    stored = (
+        await db.execute(
+            select(
+                AttachmentText.text,
+                AttachmentText.page_count,
+                AttachmentText.pages_extracted,
+            )
+            .where(AttachmentText.content_hash == content_hash)
+            .limit(1)
+        )
+    ).one_or_none()
+    if stored is not None:
+        return PdfText(*stored)
+    return await extract_pdf(source)
+
+
+def _text_values(
+    attachment_id: uuid.UUID | str, content_hash: str, pdf: PdfText
+) -> dict:
+    return {
+        "attachment_id": attachment_id,
+        "content_hash": content_hash,
+        "text": pdf.text,
+        "page_count": pdf.page_count,
+        "pages_extracted": pdf.pages_extracted,
+    }
+
+
+def attachment_text(
+    attachment_id: uuid.UUID | str, content_hash: str, pdf: PdfText
+) -> AttachmentText:
+    return AttachmentText(**_text_values(attachment_id, content_hash, pdf))
+
+
+def _download_object(s3_client, bucket_name: str, s3_key: str) -> bytes:
+    return s3_client.get_object(Bucket=bucket_name, Key=s3_key)["Body"].read()
+
+
+async def _read_stored_file(s3_client, s3_key: str) -> tuple[str, PdfText] | None:
+    try:
+        data = await asyncio.to_thread(
+            _download_object, s3_client, config.AWS_S3_BUCKET_NAME, s3_key
+        )
+        return file_content_hash(data), await extract_pdf(data)
+    except Exception:
+        logger.warning("Could not read resume %s", s3_key, exc_info=True)
+        return None
+
+
+async def get_resume_texts(db: AsyncSession, s3_keys: list[str]) -> dict[str, str]:
+    """
+    Stored text of the resumes at `s3_keys`, by key. Attachments uploaded
+    before texts were stored are downloaded and parsed once, and their text
+    is saved in the caller's transaction; keys that still fail are left out.
+    """
+    if not s3_keys:
+        return {}
+    rows = (
+        await db.execute(
+            select(Attachment.id, Attachment.file_path, AttachmentText.text)
+            .join(
+                AttachmentText,
+                AttachmentText.attachment_id == Attachment.id,
+                isouter=True,
+            )
+            .where(Attachment.file_path.in_(set(s3_keys)))
+        )
+    ).all()
+    texts = {row.file_path: row.text for row in rows if row.text is not None}
+    missing = [row for row in rows if row.text is None]
+    if not missing:
+        return texts
+
+    # Imported here: tasks.candidates imports this module.
+    from tasks.candidates import get_task_s3_client
+
+    s3_client = get_task_s3_client()
+    if not s3_client:
+        return texts
+    results = await asyncio.gather(
+        *(_read_stored_file(s3_client, row.file_path) for row in missing)
+    )
+    extracted = {
+        row.file_path: (row.id, *result)
+        for row, result in zip(missing, results)
+        if result is not None
+    }
+    if extracted:
+        await db.execute(
+            insert(AttachmentText)
+            .values([_text_values(*values) for values in extracted.values()])
+            .on_conflict_do_nothing(index_elements=["attachment_id"])
+        )
+    texts.update((s3_key, pdf.text) for s3_key, (_, _, pdf) in extracted.items())
+    return texts
@@ -0,0 +1,684 @@
+import asyncio
+import logging
+import os
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Literal, Sequence
+
+from pgvector.sqlalchemy import BIT, HALFVEC, Vector
+from sqlalchemy import (
+    ColumnElement,
+    Float,
+    Integer,
+    and_,
+    cast,
+    column,
+    delete,
+    func,
+    literal_column,
+    exists,
+    or_,
+    select,
+    text,
+    tuple_,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import (
+    CANDIDATE_COUNTRY,
+    CANDIDATE_FULL_NAME,
+    COMPACT_EMBEDDING_DIMENSION,
+    EMBEDDING_BITS,
+    EMBEDDING_DIMENSION,
+    PROFILE_SECTION,
+    Candidate,
+    CandidateChunk,
+    CandidateEmbedding,
+    CandidateEmbeddingDeletion,
+    QueryEmbedding,
+    WorkExperience,
+)
+from db.session import SessionLocal
+from schema.filters import CandidateFilters
+from util.app_config import config
+from util.embeddings import EmbeddingProvider, compact_vector
+from util.memmap_index import MemmapVectorIndex
+from util.query_cache import (
+    QueryEmbeddingCache,
+    SimilarCandidatesCache,
+    normalize_query,
+)
+
+logger = logging.getLogger(__name__)
+
+ChunkAggregate = Literal["max", "mean"]
+
+# Chunks are ranked first and only then grouped per candidate, so we fetch
+# several chunks per requested candidate to fill the page after grouping.
+CHUNK_SHORTLIST_FACTOR = 10
+CHUNK_SHORTLIST_MIN = 200
+
+# Constant used by reciprocal rank fusion; 60 is the value from the
+# original RRF paper and damps the influence of the very top ranks.
+RRF_K = 60
+
+# 'simple' keeps tokens such as "SAA-C03" or "node.js" intact instead of
+# stemming them as English words.
+TEXT_SEARCH_CONFIG = literal_column("'simple'::regconfig")
+
+
+def candidate_filter_conditions(
+    filters: CandidateFilters | None, model_name: str | None = None
+) -> list[ColumnElement[bool]]:
+    """
+    WHERE clauses on Candidate for the structured search filters. Each one
+    is backed by an index so selective filters can be planned without the
+    vector index. Embedding readiness means having a profile vector from
+    `model_name` (the active version).
+    """
+    if filters is None:
+        return []
+    conditions = []
+    if filters.min_experience is not None:
+        conditions.append(Candidate.years_of_experience >= filters.min_experience)
+    if filters.max_experience is not None:
+        conditions.append(Candidate.years_of_experience <= filters.max_experience)
+    if filters.status:
+        conditions.append(Candidate.status.in_(filters.status))
+    if filters.skills:
+        conditions.append(Candidate.skills.contains({"technical_skills": filters.skills}))
+    if filters.country:
+        conditions.append(CANDIDATE_COUNTRY == filters.country.lower())
+    if filters.embedding_ready is not None:
+        ready = has_profile_embedding(model_name)
+        conditions.append(ready if filters.embedding_ready else ~ready)
+    return conditions
+
+
+def has_profile_embedding(model_name: str) -> ColumnElement[bool]:
+    return exists().where(
+        CandidateEmbedding.candidate_id == Candidate.id,
+        CandidateEmbedding.model == model_name,
+        CandidateEmbedding.section == PROFILE_SECTION,
+    )
+
+
+def trigram_search(search: str) -> tuple[ColumnElement[bool], ColumnElement[float]]:
+    """
+    Match `search` against full name, email, phone number and job title,
+    either as a substring (ILIKE) or as a close word match (pg_trgm `%>`,
+    tolerant of typos). Both forms use the trigram GIN indexes. Returns the
+    WHERE clause and the best word similarity across the fields, for
+    ordering.
+    """
+    fields = [
+        CANDIDATE_FULL_NAME,
+        Candidate.email,
+        Candidate.phone_number,
+        Candidate.job_title,
+    ]
+    pattern = f"%{search}%"
+    condition = or_(
+        *(field.ilike(pattern) for field in fields),
+        *(field.op("%>")(search) for field in fields),
+    )
+    similarity = func.greatest(
+        *(func.coalesce(func.word_similarity(search, field), 0.0) for field in fields)
+    )
+    return condition, similarity
+
+
+def _weighted(document, weight: str):
+    return func.setweight(
+        func.coalesce(document, literal_column("''::tsvector")),
+        literal_column(f"'{weight}'"),
+    )
+
+
+def candidate_search_vector():
+    """
+    SQL for a candidate's full-text document: job title and skills (A),
+    work experience titles and companies (B) and resume text (D). The
+    resume text comes from the stored resume chunks, so no PDF is read.
+    """
+    work_experience = (
+        select(
+            func.string_agg(
+                func.concat_ws(" ", WorkExperience.title, WorkExperience.company), " "
+            )
+        )
+        .where(WorkExperience.candidate_id == Candidate.id)
+        .scalar_subquery()
+    )
+    resume = (
+        select(func.string_agg(CandidateChunk.content, " "))
+        .where(
+            CandidateChunk.candidate_id == Candidate.id,
+            CandidateChunk.section == "resume",
+        )
+        .scalar_subquery()
+    )
+    return (
+        _weighted(func.to_tsvector(TEXT_SEARCH_CONFIG, Candidate.job_title), "A")
+        .op("||")(
+            _weighted(
+                func.jsonb_to_tsvector(
+                    TEXT_SEARCH_CONFIG,
+                    Candidate.skills,
+                    literal_column("'[\"string\"]'::jsonb"),
+                ),
+                "A",
+            )
+        )
+        .op("||")(_weighted(func.to_tsvector(TEXT_SEARCH_CONFIG, work_experience), "B"))
+        .op("||")(_weighted(func.to_tsvector(TEXT_SEARCH_CONFIG, resume), "D"))
+    )
+
+
+def lexical_ranking(
+    search: str, limit: int, filters: Sequence[ColumnElement[bool]] = ()
+):
+    """
+    Rank candidates by full-text match of `search` (web-search syntax:
+    quotes, OR, -exclusions) against the GIN-indexed search_vector.
+    """
+    query = func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, search)
+    rank = func.ts_rank_cd(Candidate.search_vector, query)
+    return (
+        select(Candidate.id)
+        .where(Candidate.search_vector.op("@@")(query), *filters)
+        .order_by(rank.desc(), Candidate.id)
+        .limit(limit)
+    )
+
+
+def reciprocal_rank_fusion(
+    rankings: list[list[int]], k: int = RRF_K
+) -> list[tuple[int, float]]:
+    """
+    Merge ranked id lists: each id scores the sum of 1 / (k + rank) over
+    the lists it appears in. Returns (id, score), best first; ties are
+    broken by id so the order can be paged with a (score, id) cursor.
+    """
+    scores: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda entry: (-entry[1], entry[0]))
+
+
+query_embedding_cache = QueryEmbeddingCache(
+    max_entries=config.QUERY_EMBEDDING_CACHE_SIZE,
+    ttl_seconds=config.QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+)
+
+# Pages of /candidates/{id}/similar, keyed by source candidate, model,
+# filters and cursor, and stamped with the source vector's updated_at.
+similar_candidates_cache = SimilarCandidatesCache(
+    max_entries=config.SIMILAR_CANDIDATES_CACHE_SIZE,
+    ttl_seconds=config.SIMILAR_CANDIDATES_CACHE_TTL_SECONDS,
+)
+
+
+async def embed_search_query(
+    db: AsyncSession, provider: EmbeddingProvider, search: str
+) -> list[float]:
+    """
+    Embed a search string, reusing earlier embeddings of the same
+    normalized query from the in-process LRU and, when
+    QUERY_EMBEDDING_CACHE_PERSIST is set, from the query_embeddings table
+    shared by all workers. Only misses reach the embedding provider.
+    """
+    cache = query_embedding_cache
+    vector = cache.get(provider.model_name, search)
+    if vector is not None:
+        cache.hits += 1
+        return vector
+
+    query = normalize_query(search)
+    if config.QUERY_EMBEDDING_CACHE_PERSIST:
+        fresh_after = datetime.now(timezone.utc) - timedelta(
+            seconds=config.QUERY_EMBEDDING_CACHE_TTL_SECONDS
+        )
+        vector = await db.scalar(
+            select(QueryEmbedding.embedding).where(
+                QueryEmbedding.model == provider.model_name,
+                QueryEmbedding.query == query,
+                QueryEmbedding.created_at > fresh_after,
+            )
+        )
+        if vector is not None:
+            vector = list(vector)
+            cache.persisted_hits += 1
+            cache.put(provider.model_name, search, vector)
+            return vector
+
+    cache.misses += 1
+    vector = await provider.embed_query(query)
+    cache.put(provider.model_name, search, vector)
+    if config.QUERY_EMBEDDING_CACHE_PERSIST:
+        await _persist_query_embedding(provider.model_name, query, vector)
+    return vector
+
+
+# Expired rows are pruned at most this often per process, on a write.
+QUERY_EMBEDDING_PRUNE_INTERVAL_SECONDS = 300.0
+_query_embeddings_pruned_at = float("-inf")
+
+
+def _query_embedding_prune(now: datetime):
+    """DELETE of persisted query embeddings older than the cache TTL."""
+    return delete(QueryEmbedding).where(
+        QueryEmbedding.created_at
+        <= now - timedelta(seconds=config.QUERY_EMBEDDING_CACHE_TTL_SECONDS)
+    )
+
+
+async def _persist_query_embedding(model: str, query: str, vector: list[float]) -> None:
+    # Own session, so the write neither joins nor commits the search's
+    # transaction. A failed write only costs a future cache miss.
+    global _query_embeddings_pruned_at
+    now = datetime.now(timezone.utc)
+    values = {
+        "model": model,
+        "query": query,
+        "embedding": vector,
+        "created_at": now,
+    }
+    try:
+        async with SessionLocal() as session:
+            await session.execute(
+                insert(QueryEmbedding)
+                .values(**values)
+                .on_conflict_do_update(index_elements=["model", "query"], set_=values)
+            )
+            # Rows past the TTL are never read again (see embed_search_query).
+            prune_due = (
+                time.monotonic() - _query_embeddings_pruned_at
+                >= QUERY_EMBEDDING_PRUNE_INTERVAL_SECONDS
+            )
+            if prune_due:
+                await session.execute(_query_embedding_prune(now))
+            await session.commit()
+            if prune_due:
+                _query_embeddings_pruned_at = time.monotonic()
+    except Exception:
+        logger.warning("Could not persist query embedding", exc_info=True)
+
+
+# pgvector rejects larger hnsw.ef_search values.
+HNSW_MAX_EF_SEARCH = 1000
+
+
+async def set_hnsw_ef_search(
+    db: AsyncSession, ef_search: int, filtered: bool = False
+) -> None:
+    """
+    `SET LOCAL hnsw.ef_search` for the current transaction. HNSW scans
+    return at most ef_search rows, so it must cover the largest LIMIT the
+    query asks the index for; higher values trade latency for recall.
+
+    Filters are applied to the rows the index returns, so a `filtered`
+    scan could come back short. With SEARCH_HNSW_ITERATIVE_SCAN enabled
+    (pgvector >= 0.8) the scan keeps walking the graph until the LIMIT is
+    met; when it is "off", ef_search is over-fetched instead.
+    """
+    if filtered:
+        if config.SEARCH_HNSW_ITERATIVE_SCAN != "off":
+            await db.execute(
+                text("SELECT set_config('hnsw.iterative_scan', :value, true)"),
+                {"value": config.SEARCH_HNSW_ITERATIVE_SCAN},
+            )
+        else:
+            ef_search *= config.SEARCH_FILTER_OVERFETCH
+    await db.execute(
+        text("SELECT set_config('hnsw.ef_search', :value, true)"),
+        {"value": str(min(ef_search, HNSW_MAX_EF_SEARCH))},
+    )
+
+
+def after_key(sort_key, id_column, after: Sequence | None, descending: bool = False):
+    """
+    Keyset condition for rows ordered by (`sort_key`, `id_column`) that
+    come strictly after the cursor values `after` = (sort key, id). With
+    `descending` the sort key is ordered high to low (ids stay ascending).
+    """
+    if descending:
+        return or_(
+            sort_key < after[0], and_(sort_key == after[0], id_column > after[1])
+        )
+    return tuple_(sort_key, id_column) > tuple_(after[0], after[1])
+
+
+def halfvec_cosine_distance(column, query_embedding: list[float]):
+    """
+    Cosine distance over the half-precision cast of a full embedding
+    column, matching the expression the HNSW indexes are built on.
+    """
+    return cast(column, HALFVEC(EMBEDDING_DIMENSION)).cosine_distance(
+        cast(query_embedding, HALFVEC(EMBEDDING_DIMENSION))
+    )
+
+
+def chunk_shortlist_size(limit: int) -> int:
+    return max(limit * CHUNK_SHORTLIST_FACTOR, CHUNK_SHORTLIST_MIN)
+
+
+def profile_embeddings(
+    model_name: str, filters: Sequence[ColumnElement[bool]], *columns
+):
+    """
+    SELECT `columns` from the whole-profile vectors of `model_name`,
+    joined to candidates only when there are candidate filters to apply.
+    """
+    stmt = select(*columns).where(
+        CandidateEmbedding.model == model_name,
+        CandidateEmbedding.section == PROFILE_SECTION,
+    )
+    if filters:
+        stmt = stmt.join(
+            Candidate, Candidate.id == CandidateEmbedding.candidate_id
+        ).where(*filters)
+    return stmt
+
+
+def full_similarity_ranking(
+    query_embedding: list[float],
+    model_name: str,
+    limit: int,
+    filters: Sequence[ColumnElement[bool]] = (),
+    after: Sequence | None = None,
+):
+    """
+    Rank candidates with the HNSW index over the full-width embedding cast
+    to halfvec. Slower than the compact tier but with no truncation loss.
+    `after` = (distance, id) continues from a previous page. Returns a
+    subquery with `candidate_id` and `distance` columns.
+    """
+    distance = halfvec_cosine_distance(CandidateEmbedding.embedding, query_embedding)
+    if after:
+        filters = [*filters, after_key(distance, CandidateEmbedding.candidate_id, after)]
+    return (
+        profile_embeddings(
+            model_name,
+            filters,
+            CandidateEmbedding.candidate_id.label("candidate_id"),
+            distance.label("distance"),
+        )
+        .order_by(distance, CandidateEmbedding.candidate_id)
+        .limit(limit)
+        .subquery()
+    )
+
+
+def _rerank(query_embedding: list[float], model_name: str, limit: int, shortlist):
+    # Exact cosine distance on the full vectors of the shortlisted rows.
+    distance = CandidateEmbedding.embedding.cosine_distance(query_embedding)
+    return (
+        select(
+            CandidateEmbedding.candidate_id.label("candidate_id"),
+            distance.label("distance"),
+        )
+        .where(
+            CandidateEmbedding.model == model_name,
+            CandidateEmbedding.section == PROFILE_SECTION,
+            CandidateEmbedding.candidate_id.in_(select(shortlist.c.candidate_id)),
+        )
+        .order_by(distance, CandidateEmbedding.candidate_id)
+        .limit(limit)
+        .subquery()
+    )
+
+
+def profile_similarity_ranking(
+    query_embedding: list[float],
+    model_name: str,
+    limit: int,
+    rerank_candidates: int,
+    filters: Sequence[ColumnElement[bool]] = (),
+    after: Sequence | None = None,
+):
+    """
+    Rank candidates by whole-profile similarity in two passes: an ANN scan
+    of the HNSW-indexed half-precision `embedding_compact` picks the
+    `rerank_candidates` nearest rows, and only those are re-ranked with the
+    exact cosine distance on the full `embedding`. Only vectors produced by
+    `model_name` and candidates matching `filters` are considered, so the
+    shortlist is filled with eligible rows. `after` = (exact distance, id)
+    continues from a previous page. Returns a subquery with `candidate_id`
+    and `distance` columns, nearest first.
+    """
+    compact_query = compact_vector(query_embedding, COMPACT_EMBEDDING_DIMENSION)
+    if after:
+        # Rows up to the cursor are skipped while the index is scanned, so
+        # the shortlist is refilled with unseen candidates.
+        distance = CandidateEmbedding.embedding.cosine_distance(query_embedding)
+        filters = [*filters, after_key(distance, CandidateEmbedding.candidate_id, after)]
+    shortlist = (
+        profile_embeddings(model_name, filters, CandidateEmbedding.candidate_id)
+        .where(CandidateEmbedding.embedding_compact.is_not(None))
+        .order_by(CandidateEmbedding.embedding_compact.cosine_distance(compact_query))
+        .limit(max(limit, rerank_candidates))
+        .subquery()
+    )
+    return _rerank(query_embedding, model_name, limit, shortlist)
+
+
+def binary_similarity_ranking(
+    query_embedding: list[float],
+    model_name: str,
+    limit: int,
+    rerank_candidates: int,
+    filters: Sequence[ColumnElement[bool]] = (),
+    after: Sequence | None = None,
+):
+    """
+    Cheapest search tier for very large pools: the HNSW index over the
+    sign-bit quantized `embedding_binary` finds the `rerank_candidates`
+    nearest rows by Hamming distance, which are then re-ranked by exact
+    cosine distance on the full `embedding`. Only vectors produced by
+    `model_name` and candidates matching `filters` are considered; `after`
+    = (exact distance, id) continues from a previous page. Returns a
+    subquery with `candidate_id` and `distance` columns, nearest first.
+    """
+    query_bits = cast(
+        func.binary_quantize(cast(query_embedding, Vector(EMBEDDING_BITS))),
+        BIT(EMBEDDING_BITS),
+    )
+    if after:
+        distance = CandidateEmbedding.embedding.cosine_distance(query_embedding)
+        filters = [*filters, after_key(distance, CandidateEmbedding.candidate_id, after)]
+    shortlist = (
+        profile_embeddings(model_name, filters, CandidateEmbedding.candidate_id)
+        .where(CandidateEmbedding.embedding_binary.is_not(None))
+        .order_by(CandidateEmbedding.embedding_binary.hamming_distance(query_bits))
+        .limit(max(limit, rerank_candidates))
+        .subquery()
+    )
+    return _rerank(query_embedding, model_name, limit, shortlist)
+
+
+def chunk_similarity_ranking(
+    query_embedding: list[float],
+    model_name: str,
+    limit: int,
+    aggregate: ChunkAggregate = "max",
+    filters: Sequence[ColumnElement[bool]] = (),
+    after: Sequence | None = None,
+    depth: int = 0,
+):
+    """
+    Rank candidates by how well their section chunks match the query.
+
+    The nearest chunks (embedded with `model_name`, of candidates matching
+    `filters`) are shortlisted by cosine distance, then grouped per
+    candidate and scored with the best (`max`) or average (`mean`)
+    similarity of that candidate's shortlisted chunks. Returns a subquery
+    with `candidate_id` and `score` columns, highest score first.
+
+    Scores depend on the whole shortlist, so a later page (`after` = (score,
+    id), with `depth` candidates already served) re-ranks a shortlist deep
+    enough to cover the earlier pages and continues after the cursor.
+    """
+    distance = halfvec_cosine_distance(CandidateChunk.embedding, query_embedding)
+    shortlist = select(
+        CandidateChunk.candidate_id, (1 - distance).label("similarity")
+    ).where(CandidateChunk.embedding_model == model_name)
+    if filters:
+        shortlist = shortlist.join(
+            Candidate, Candidate.id == CandidateChunk.candidate_id
+        ).where(*filters)
+    shortlist = (
+        shortlist.order_by(distance)
+        .limit(chunk_shortlist_size(depth + limit))
+        .subquery()
+    )
+    score_fn = func.max if aggregate == "max" else func.avg
+    score = score_fn(shortlist.c.similarity)
+    ranking = select(shortlist.c.candidate_id, score.label("score")).group_by(
+        shortlist.c.candidate_id
+    )
+    if after:
+        ranking = ranking.having(
+            after_key(score, shortlist.c.candidate_id, after, descending=True)
+        )
+    return (
+        ranking.order_by(score.desc(), shortlist.c.candidate_id)
+        .limit(limit)
+        .subquery()
+    )
+
+
+# Rows whose transaction committed after a refresh read past them can carry
+# an older updated_at; re-reading this window picks them up.
+EXACT_INDEX_REFRESH_OVERLAP = timedelta(minutes=1)
+# Deletions are logged this long; a snapshot that fell further behind is
+# rebuilt instead of caught up.
+EXACT_INDEX_DELETION_RETENTION = timedelta(days=1)
+
+
+@lru_cache
+def get_exact_index(model_name: str) -> MemmapVectorIndex:
+    """This worker's handle on the shared snapshot of `model_name`'s vectors."""
+    directory = os.path.join(
+        config.SEARCH_MEMMAP_DIR, re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+    )
+    return MemmapVectorIndex(directory, EMBEDDING_DIMENSION)
+
+
+async def refresh_exact_index(db: AsyncSession, model_name: str) -> MemmapVectorIndex:
+    """
+    Bring the snapshot up to date with the profile vectors deleted and
+    changed since its watermarks, at most every
+    SEARCH_MEMMAP_REFRESH_SECONDS across all workers. The first call
+    builds it, streaming every vector of the model, and it is compacted
+    once too many of its rows are tombstones.
+    """
+    index = get_exact_index(model_name)
+    if index.is_fresh(config.SEARCH_MEMMAP_REFRESH_SECONDS):
+        return index
+    with index.try_lock() as locked:
+        if not locked:
+            return index
+        now = await db.scalar(select(func.now()))
+        deleted_since = index.deleted_watermark
+        if (
+            deleted_since is None
+            or deleted_since - EXACT_INDEX_REFRESH_OVERLAP
+            < now - EXACT_INDEX_DELETION_RETENTION
+        ):
+            await asyncio.to_thread(index.clear)
+        else:
+            # Ids deleted and embedded again since are upserted below.
+            removed = await db.scalars(
+                select(CandidateEmbeddingDeletion.candidate_id)
+                .distinct()
+                .where(
+                    CandidateEmbeddingDeletion.model == model_name,
+                    CandidateEmbeddingDeletion.deleted_at
+                    > deleted_since - EXACT_INDEX_REFRESH_OVERLAP,
+                    ~exists().where(
+                        CandidateEmbedding.candidate_id
+                        == CandidateEmbeddingDeletion.candidate_id,
+                        CandidateEmbedding.model == model_name,
+                        CandidateEmbedding.section == PROFILE_SECTION,
+                    ),
+                )
+            )
+            await asyncio.to_thread(index.apply, [], [], removed.all())
+        watermark = index.watermark
+        stmt = profile_embeddings(
+            model_name,
+            (),
+            CandidateEmbedding.candidate_id,
+            CandidateEmbedding.embedding,
+            CandidateEmbedding.updated_at,
+        )
+        if watermark:
+            stmt = stmt.where(
+                CandidateEmbedding.updated_at > watermark - EXACT_INDEX_REFRESH_OVERLAP
+            )
+        result = await db.stream(stmt.execution_options(yield_per=1000))
+        async for rows in result.partitions():
+            await asyncio.to_thread(
+                index.apply,
+                [row.candidate_id for row in rows],
+                [row.embedding for row in rows],
+            )
+            latest = max(row.updated_at for row in rows)
+            watermark = max(watermark, latest) if watermark else latest
+        await asyncio.to_thread(
+            index.apply, [], [], watermark=watermark, deleted_watermark=now
+        )
+        if index.needs_compaction:
+            await asyncio.to_thread(index.compact)
+    await _prune_embedding_deletions(now)
+    return index
+
+
+async def _prune_embedding_deletions(now: datetime) -> None:
+    # Own session, so the search's transaction stays read-only.
+    try:
+        async with SessionLocal() as session:
+            await session.execute(
+                delete(CandidateEmbeddingDeletion).where(
+                    CandidateEmbeddingDeletion.deleted_at
+                    < now - EXACT_INDEX_DELETION_RETENTION
+                )
+            )
+            await session.commit()
+    except Exception:
+        logger.warning("Could not prune the embedding deletion log", exc_info=True)
+
+
+async def exact_similarity_ranking(
+    db: AsyncSession,
+    query_embedding: list[float],
+    model_name: str,
+    limit: int,
+    filters: Sequence[ColumnElement[bool]] = (),
+    after: Sequence | None = None,
+    exclude: Sequence[int] = (),
+):
+    """
+    Exact cosine ranking over the memory-mapped snapshot instead of an
+    HNSW scan. Returns a VALUES subquery with `candidate_id` and `distance`
+    columns like the other rankings, or None when nothing matches. Ids in
+    `exclude` are dropped in the snapshot; only `filters` need SQL.
+    """
+    index = await refresh_exact_index(db, model_name)
+    allowed = None
+    if filters:
+        allowed = (await db.scalars(select(Candidate.id).where(*filters))).all()
+    ranked = await asyncio.to_thread(
+        index.search, query_embedding, limit, allowed, after, exclude
+    )
+    if not ranked:
+        return None
+    return values(
+        column("candidate_id", Integer), column("distance", Float), name="ranking"
+    ).data(ranked)
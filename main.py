@@ -1,9 +1,32 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
+from db.session import SessionLocal
+from helpers.search import refresh_exact_index
 from router import recruiter, vacancies, cv, candidates, attachments, chat, auth, llm_models
+from tasks.embedding_versions import get_embedding_versions
+from util.app_config import config
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build or catch up the exact-search snapshot before serving, so the
+    # first search after a deploy does not stream every vector.
+    if config.SEARCH_ENGINE == "memmap":
+        try:
+            async with SessionLocal() as db:
+                versions = await get_embedding_versions(db)
+                await refresh_exact_index(db, versions.active.model)
+        except Exception:
+            logger.warning("Could not warm the exact search index", exc_info=True)
+    yield
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -1,9 +1,10 @@
-from typing import List, Tuple, Optional
+import asyncio
+from typing import List, Literal, Tuple, Optional
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Query, status
+from fastapi import APIRouter, HTTPException, Depends, Query, status
 from regex import E
-from sqlalchemy import Update, delete, select, insert
+from sqlalchemy import Update, delete, select, insert, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sympy import use
 
@@ -48,19 +49,40 @@ from schema.candidates import (
     UnverifyWorkExperienceResponse,
     GetCandidateWorkExperience,
 )
-from schema.pagination import Pagination
-
-from db.models import Attachment, Candidate, User, TempChatSession, Recruiter, WorkExperience, Education, WorkExperienceProjects, WorkExperienceVerification
-from db.session import get_db
+from schema.filters import CandidateFilters
+from schema.pagination import CursorPage, CursorPagination, encode_cursor
+
+from db.models import PROFILE_SECTION, Attachment, Candidate, CandidateEmbedding, User, TempChatSession, Recruiter, WorkExperience, Education, WorkExperienceProjects, WorkExperienceVerification
+from db.session import SessionLocal, get_db
+from helpers.candidates import CANDIDATE_PERSONAL_INFO_COLUMNS, candidate_card_query
+from helpers.search import (
+    HNSW_MAX_EF_SEARCH,
+    ChunkAggregate,
+    after_key,
+    binary_similarity_ranking,
+    candidate_filter_conditions,
+    chunk_shortlist_size,
+    chunk_similarity_ranking,
+    embed_search_query,
+    exact_similarity_ranking,
+    full_similarity_ranking,
+    lexical_ranking,
+    profile_similarity_ranking,
+    query_embedding_cache,
+    reciprocal_rank_fusion,
+    set_hnsw_ef_search,
+    similar_candidates_cache,
+    trigram_search,
+)
 
-from tasks.candidates import embed_candidates_data
+from tasks.candidates import candidate_changed
+from tasks.embedding_versions import get_embedding_versions
 import json
 from typing import Dict
 from uuid import UUID
 from sqlalchemy import update
-from google import genai
-from google.genai import types
 from util.app_config import config
+from util.embeddings import EmbeddingUnavailableError
 
 
 router = APIRouter(prefix="/candidates")
@@ -91,7 +113,6 @@ async def create_candidate_account(
 @router.post("/personal_info")
 async def update_personal_info(
     candidate_data: CVData,
-    background_tasks: BackgroundTasks,
     user_id: int = Query(..., description="User ID of the candidate"),
     db: AsyncSession = Depends(get_db),
 ):
@@ -140,8 +161,8 @@ async def update_personal_info(
             ]
             await db.execute(insert(Education),education_data)
         
+        await candidate_changed(db, candidate.id)
         await db.commit()
-        background_tasks.add_task(embed_candidates_data, candidate.id)
         return {"message": "Candidate personal information updated successfully."}
     except Exception as e:
         await db.rollback()
@@ -153,33 +174,60 @@ async def update_personal_info(
 
 
 
-@router.get("", response_model=List[ListCandidatesResponse])
+@router.get("", response_model=CursorPage[ListCandidatesResponse])
 async def list_candidates(
     deps: Tuple[User, AsyncSession] = Depends(get_current_user),
-    pagination: Pagination = Depends(),
-    search: str = Query(None, description="Search by first name or last name"),
+    pagination: CursorPagination = Depends(),
+    search: str = Query(
+        None, description="Search by name, email, phone number or job title"
+    ),
 ):
     try:
         _, db = deps
-        query = select(Candidate)
 
+        # Keyset pagination: newest first by (created_at, id), or by
+        # (similarity, id) when searching.
         if search:
-            query = query.filter(
-                (Candidate.first_name.ilike(f"%{search}%"))
-                | (Candidate.last_name.ilike(f"%{search}%"))
+            condition, similarity = trigram_search(search)
+            query = (
+                candidate_card_query()
+                .add_columns(similarity.label("sort_key"))
+                .filter(condition)
+            )
+            after = pagination.after("search", float, int)
+            if after:
+                query = query.filter(
+                    after_key(similarity, Candidate.id, after, descending=True)
+                )
+            query = query.order_by(similarity.desc(), Candidate.id)
+        else:
+            query = candidate_card_query().add_columns(
+                Candidate.created_at.label("sort_key")
             )
-
-        # Apply pagination
-        query = query.offset(pagination.offset).limit(pagination.limit)
-
-        # Execute query
-        result = await db.execute(query)
-        print("ending")
-        candidates = result.scalars().all()
-        print("ending2")
+            after = pagination.after("created_at", datetime, int)
+            if after:
+                query = query.filter(
+                    tuple_(Candidate.created_at, Candidate.id) < tuple_(*after)
+                )
+            query = query.order_by(Candidate.created_at.desc(), Candidate.id.desc())
+
+        # One extra row tells whether there is a next page.
+        result = await db.execute(query.limit(pagination.limit + 1))
+        rows = result.all()
+        next_cursor = None
+        if len(rows) > pagination.limit:
+            rows = rows[: pagination.limit]
+            last = rows[-1]
+            if search:
+                next_cursor = encode_cursor("search", last.sort_key, last.Candidate.id)
+            else:
+                next_cursor = encode_cursor(
+                    "created_at", last.sort_key.isoformat(), last.Candidate.id
+                )
+        candidates = [row.Candidate for row in rows]
 
         # Convert SQLAlchemy models to response models
-        return [
+        items = [
             ListCandidatesResponse(
                 id=candidate.id,
                 first_name=candidate.first_name,
@@ -202,6 +250,9 @@ async def list_candidates(
             )
             for candidate in candidates
         ]
+        return CursorPage(items=items, next_cursor=next_cursor)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error fetching candidates: {str(e)}")
         raise HTTPException(
@@ -332,7 +383,7 @@ async def list_candidates_by_id(
 
         candidate_ids = temp_session.candidates
         result = await db.execute(
-            select(Candidate).filter(Candidate.id.in_(candidate_ids))
+            candidate_card_query().filter(Candidate.id.in_(candidate_ids))
         )
         candidates = result.scalars().all()
         if not candidates:
@@ -351,29 +402,297 @@ async def list_candidates_by_id(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/similarity_search", response_model=List[ListCandidatesResponse])
+@router.get("/similarity_search/cache_stats")
+async def similarity_search_cache_stats():
+    """Hit/miss counters of this worker's query-embedding cache."""
+    return query_embedding_cache.stats()
+
+
+@router.get("/similarity_search", response_model=CursorPage[ListCandidatesResponse])
 async def similarity_search(
     search: str = Query(..., description="Search by first name or last name"),
+    mode: Literal["profile", "full", "binary", "chunks"] = Query(
+        "profile",
+        description=(
+            "Match the whole-profile embedding (compact index, re-ranked), the "
+            "full-width index, the binary-quantized prefilter (fastest on very "
+            "large pools), or per-section chunks"
+        ),
+    ),
+    aggregate: ChunkAggregate = Query(
+        "max", description="How chunk similarities are combined per candidate"
+    ),
+    ef_search: Optional[int] = Query(
+        None,
+        ge=1,
+        le=HNSW_MAX_EF_SEARCH,
+        description="HNSW candidate list size: higher is slower but more accurate",
+    ),
+    filters: CandidateFilters = Depends(),
     db: AsyncSession = Depends(get_db),
-    pagination: Pagination = Depends(),
+    pagination: CursorPagination = Depends(),
 ):
     try:
-        client = genai.Client(api_key= config.GEMINI_API_KEY)
-        embedding_vector = client.models.embed_content(
-                model="gemini-embedding-exp-03-07",
-                contents=[search],
-                config= types.EmbedContentConfig(task_type="SEMANTIC_SIMILARITY")
-            ).embeddings
-        query_embedding = embedding_vector[0].values # type: ignore
-        stmt = (
-            select(Candidate)
-            .order_by(Candidate.embedding.cosine_distance(query_embedding))
-            .limit(pagination.limit)
-        )
-        results = await db.execute(stmt)
-        candidates = results.scalars().all()
+        # The in-process engine answers every whole-profile mode with the
+        # same exact ranking; chunks always go to the database.
+        exact = config.SEARCH_ENGINE == "memmap" and mode != "chunks"
+        # Cursors hold (distance, id) of the last row; chunk cursors hold
+        # (score, id) plus how many candidates were already served.
+        if exact:
+            kind = "exact"
+        else:
+            kind = f"chunks:{aggregate}" if mode == "chunks" else mode
+        key_types = (float, int, int) if mode == "chunks" and not exact else (float, int)
+        after = pagination.after(kind, *key_types)
+        # One extra row tells whether there is a next page.
+        limit = pagination.limit + 1
+        # Pin the query to the active embedding version so a model migration
+        # in progress never compares vectors from different models.
+        versions = await get_embedding_versions(db)
+        version = versions.active
+        query_embedding = await embed_search_query(db, version.get_provider(), search)
+        # The index scan must be allowed to return every row the query
+        # shortlists, whatever recall/latency trade-off was requested.
+        shortlist = {
+            "profile": config.SEARCH_RERANK_CANDIDATES,
+            "full": limit,
+            "binary": config.SEARCH_BINARY_RERANK_CANDIDATES,
+            "chunks": chunk_shortlist_size((after[2] if after else 0) + limit),
+        }[mode]
+        # Filters and the cursor run inside the ranking queries, so the
+        # shortlists are filled with matching, unseen candidates rather
+        # than filtered afterwards. Vectors of a version being backfilled
+        # share the index and are filtered out the same way.
+        conditions = candidate_filter_conditions(filters, version.model)
+        if not exact:
+            await set_hnsw_ef_search(
+                db,
+                max(ef_search or config.SEARCH_HNSW_EF_SEARCH, shortlist, limit),
+                filtered=bool(conditions or after or versions.backfilling),
+            )
+        if exact:
+            ranking = await exact_similarity_ranking(
+                db, query_embedding, version.model, limit, conditions, after
+            )
+            stmt = (
+                candidate_card_query()
+                .add_columns(ranking.c.distance.label("sort_key"))
+                .join(ranking, ranking.c.candidate_id == Candidate.id)
+                .order_by(ranking.c.distance, Candidate.id)
+                if ranking is not None
+                else None
+            )
+        elif mode == "chunks":
+            ranking = chunk_similarity_ranking(
+                query_embedding,
+                version.model,
+                limit,
+                aggregate,
+                conditions,
+                after=after[:2] if after else None,
+                depth=after[2] if after else 0,
+            )
+            stmt = (
+                candidate_card_query()
+                .add_columns(ranking.c.score.label("sort_key"))
+                .join(ranking, ranking.c.candidate_id == Candidate.id)
+                .order_by(ranking.c.score.desc(), Candidate.id)
+            )
+        elif mode == "full":
+            ranking = full_similarity_ranking(
+                query_embedding, version.model, limit, conditions, after
+            )
+            stmt = (
+                candidate_card_query()
+                .add_columns(ranking.c.distance.label("sort_key"))
+                .join(ranking, ranking.c.candidate_id == Candidate.id)
+                .order_by(ranking.c.distance, Candidate.id)
+            )
+        elif mode == "binary":
+            ranking = binary_similarity_ranking(
+                query_embedding,
+                version.model,
+                limit,
+                config.SEARCH_BINARY_RERANK_CANDIDATES,
+                conditions,
+                after,
+            )
+            stmt = (
+                candidate_card_query()
+                .add_columns(ranking.c.distance.label("sort_key"))
+                .join(ranking, ranking.c.candidate_id == Candidate.id)
+                .order_by(ranking.c.distance, Candidate.id)
+            )
+        else:
+            ranking = profile_similarity_ranking(
+                query_embedding,
+                version.model,
+                limit,
+                config.SEARCH_RERANK_CANDIDATES,
+                conditions,
+                after,
+            )
+            stmt = (
+                candidate_card_query()
+                .add_columns(ranking.c.distance.label("sort_key"))
+                .join(ranking, ranking.c.candidate_id == Candidate.id)
+                .order_by(ranking.c.distance, Candidate.id)
+            )
+        rows = (await db.execute(stmt)).all() if stmt is not None else []
+        next_cursor = None
+        if len(rows) > pagination.limit:
+            rows = rows[: pagination.limit]
+            last = rows[-1]
+            keys = [last.sort_key, last.Candidate.id]
+            if mode == "chunks":
+                keys.append((after[2] if after else 0) + len(rows))
+            next_cursor = encode_cursor(kind, *keys)
+        candidates = [row.Candidate for row in rows]
+
+        items = [
+            ListCandidatesResponse(
+                id=candidate.id,
+                first_name=candidate.first_name,
+                last_name=candidate.last_name,
+                email=candidate.email,
+                phone_number=candidate.phone_number,
+                date_of_birth=candidate.date_of_birth.isoformat()
+                if candidate.date_of_birth
+                else "2000-01-01",
+                years_of_experience=float(candidate.years_of_experience)
+                if candidate.years_of_experience
+                else 0.0,
+                job_title=candidate.job_title,
+                status=candidate.status if candidate.status else "Applied",
+                created_at=candidate.created_at.isoformat()
+                if candidate.created_at
+                else "2000-01-01",
+                tags=candidate.skills["technical_skills"][:3],
+                rating=5,
+            )
+            for candidate in candidates
+        ]
+        return CursorPage(items=items, next_cursor=next_cursor)
+    except HTTPException:
+        raise
+    except EmbeddingUnavailableError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Search is temporarily unavailable, please retry shortly.",
+            headers={"Retry-After": "5"},
+        )
+    except Exception as e:
+        print(f"Error fetching candidates: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Error fetching candidates: {str(e)}"
+        )
 
-        return [
+
+@router.get("/{candidate_id}/similar", response_model=CursorPage[ListCandidatesResponse])
+async def similar_candidates(
+    candidate_id: int,
+    filters: CandidateFilters = Depends(),
+    db: AsyncSession = Depends(get_db),
+    pagination: CursorPagination = Depends(),
+):
+    """
+    Candidates closest to `candidate_id`, ranked with its stored profile
+    vector as the query, so no embedding call is made. Pages are cached
+    until that candidate's vector changes.
+    """
+    try:
+        after = pagination.after("similar", float, int)
+        versions = await get_embedding_versions(db)
+        version = versions.active
+        source = (
+            await db.execute(
+                select(CandidateEmbedding.embedding, CandidateEmbedding.updated_at).where(
+                    CandidateEmbedding.candidate_id == candidate_id,
+                    CandidateEmbedding.model == version.model,
+                    CandidateEmbedding.section == PROFILE_SECTION,
+                )
+            )
+        ).one_or_none()
+        if source is None:
+            found = await db.scalar(
+                select(Candidate.id).where(Candidate.id == candidate_id)
+            )
+            if found is None:
+                raise HTTPException(status_code=404, detail="Candidate not found")
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Candidate has no embedding yet",
+            )
+
+        cache_key = (
+            candidate_id,
+            version.model,
+            filters.cache_key,
+            tuple(after) if after else None,
+            pagination.limit,
+        )
+        page = similar_candidates_cache.get(cache_key, source.updated_at)
+        if page is None:
+            query_embedding = source.embedding.tolist()
+            # One extra row tells whether there is a next page.
+            limit = pagination.limit + 1
+            conditions = candidate_filter_conditions(filters, version.model)
+            if config.SEARCH_ENGINE == "memmap":
+                # The source candidate is masked out of the snapshot rather
+                # than filtered in SQL, so unfiltered requests skip loading
+                # the allowed ids.
+                ranking = await exact_similarity_ranking(
+                    db,
+                    query_embedding,
+                    version.model,
+                    limit,
+                    conditions,
+                    after,
+                    exclude=[candidate_id],
+                )
+            else:
+                conditions = [*conditions, Candidate.id != candidate_id]
+                await set_hnsw_ef_search(
+                    db,
+                    max(
+                        config.SEARCH_HNSW_EF_SEARCH,
+                        config.SEARCH_RERANK_CANDIDATES,
+                        limit,
+                    ),
+                    filtered=True,
+                )
+                ranking = profile_similarity_ranking(
+                    query_embedding,
+                    version.model,
+                    limit,
+                    config.SEARCH_RERANK_CANDIDATES,
+                    conditions,
+                    after,
+                )
+            ranked = []
+            if ranking is not None:
+                ranked = (
+                    await db.execute(
+                        select(ranking.c.candidate_id, ranking.c.distance).order_by(
+                            ranking.c.distance, ranking.c.candidate_id
+                        )
+                    )
+                ).all()
+            next_cursor = None
+            if len(ranked) > pagination.limit:
+                ranked = ranked[: pagination.limit]
+                last = ranked[-1]
+                next_cursor = encode_cursor("similar", last.distance, last.candidate_id)
+            page = ([row.candidate_id for row in ranked], next_cursor)
+            similar_candidates_cache.put(cache_key, source.updated_at, page)
+
+        ids, next_cursor = page
+        # Cards are loaded fresh so cached pages still show current details.
+        results = await db.execute(candidate_card_query().where(Candidate.id.in_(ids)))
+        by_id = {candidate.id: candidate for candidate in results.scalars()}
+        candidates = [by_id[id] for id in ids if id in by_id]
+
+        items = [
             ListCandidatesResponse(
                 id=candidate.id,
                 first_name=candidate.first_name,
@@ -396,6 +715,127 @@ async def similarity_search(
             )
             for candidate in candidates
         ]
+        return CursorPage(items=items, next_cursor=next_cursor)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error fetching similar candidates: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Error fetching similar candidates: {str(e)}"
+        )
+
+
+@router.get("/hybrid_search", response_model=CursorPage[ListCandidatesResponse])
+async def hybrid_search(
+    search: str = Query(..., description="Keywords and/or a natural-language query"),
+    lexical_only: bool = Query(
+        False, description="Only run the full-text search (no embedding call)"
+    ),
+    filters: CandidateFilters = Depends(),
+    db: AsyncSession = Depends(get_db),
+    pagination: CursorPagination = Depends(),
+):
+    """
+    Full-text search over job title, skills, work experience and resume
+    text, fused with vector similarity by reciprocal rank fusion. The two
+    searches run concurrently on separate connections.
+    """
+    # Cursors hold (fused score, id) of the last row and the depth of the
+    # fused lists. Each side contributes a list deeper than a page so
+    # fusion can promote candidates that rank moderately well in both.
+    # Fused scores depend on that depth, so it is fixed for the whole
+    # cursor chain: every page slices the same fused ranking.
+    kind = "lexical" if lexical_only else "hybrid"
+    after = pagination.after(kind, float, int, int)
+    depth = after[2] if after else config.HYBRID_SEARCH_DEPTH
+    if not 0 < depth <= config.HYBRID_SEARCH_DEPTH:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    async def lexical() -> list[int]:
+        async with SessionLocal() as session:
+            result = await session.execute(lexical_ranking(search, depth, conditions))
+            return list(result.scalars().all())
+
+    async def semantic() -> list[int]:
+        async with SessionLocal() as session:
+            query_embedding = await embed_search_query(
+                session, versions.active.get_provider(), search
+            )
+            await set_hnsw_ef_search(
+                session,
+                max(config.SEARCH_HNSW_EF_SEARCH, config.SEARCH_RERANK_CANDIDATES, depth),
+                filtered=bool(conditions or versions.backfilling),
+            )
+            ranking = profile_similarity_ranking(
+                query_embedding,
+                versions.active.model,
+                depth,
+                config.SEARCH_RERANK_CANDIDATES,
+                conditions,
+            )
+            result = await session.execute(
+                select(ranking.c.candidate_id).order_by(ranking.c.distance)
+            )
+            return list(result.scalars().all())
+
+    try:
+        versions = await get_embedding_versions(db)
+        conditions = candidate_filter_conditions(filters, versions.active.model)
+        if lexical_only:
+            rankings = [await lexical()]
+        else:
+            rankings = list(await asyncio.gather(lexical(), semantic()))
+        fused = reciprocal_rank_fusion(rankings)
+        if after:
+            fused = [
+                (candidate_id, score)
+                for candidate_id, score in fused
+                if (-score, candidate_id) > (-after[0], after[1])
+            ]
+        next_cursor = None
+        if len(fused) > pagination.limit:
+            last_id, last_score = fused[pagination.limit - 1]
+            next_cursor = encode_cursor(kind, last_score, last_id, depth)
+        page = [candidate_id for candidate_id, _ in fused[: pagination.limit]]
+        if not page:
+            return CursorPage(items=[])
+
+        results = await db.execute(candidate_card_query().where(Candidate.id.in_(page)))
+        candidates_by_id = {candidate.id: candidate for candidate in results.scalars()}
+        candidates = [candidates_by_id[i] for i in page if i in candidates_by_id]
+
+        items = [
+            ListCandidatesResponse(
+                id=candidate.id,
+                first_name=candidate.first_name,
+                last_name=candidate.last_name,
+                email=candidate.email,
+                phone_number=candidate.phone_number,
+                date_of_birth=candidate.date_of_birth.isoformat()
+                if candidate.date_of_birth
+                else "2000-01-01",
+                years_of_experience=float(candidate.years_of_experience)
+                if candidate.years_of_experience
+                else 0.0,
+                job_title=candidate.job_title,
+                status=candidate.status if candidate.status else "Applied",
+                created_at=candidate.created_at.isoformat()
+                if candidate.created_at
+                else "2000-01-01",
+                tags=candidate.skills["technical_skills"][:3]
+                if candidate.skills and "technical_skills" in candidate.skills
+                else [],
+                rating=5,
+            )
+            for candidate in candidates
+        ]
+        return CursorPage(items=items, next_cursor=next_cursor)
+    except EmbeddingUnavailableError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Semantic search is temporarily unavailable; retry or use lexical_only.",
+            headers={"Retry-After": "5"},
+        )
     except Exception as e:
         print(f"Error fetching candidates: {str(e)}")
         raise HTTPException(
@@ -409,7 +849,9 @@ async def get_candidate_personal_info(
 ):
     try:
         result = await db.execute(
-            select(Candidate).filter(Candidate.id == candidate_id)
+            candidate_card_query(CANDIDATE_PERSONAL_INFO_COLUMNS).filter(
+                Candidate.id == candidate_id
+            )
         )
         candidate = result.scalar_one_or_none()
         if candidate is None:
@@ -1168,6 +1610,7 @@ async def verify_work_experience(
         )
 
         db.add(verification)
+        await candidate_changed(db, candidate_id, ["work_experience"])
         await db.commit()
         
         return VerifyWorkExperienceResponse(
@@ -1237,6 +1680,7 @@ async def unverify_work_experience(
 
         # Remove the verification
         await db.delete(verification)
+        await candidate_changed(db, candidate_id, ["work_experience"])
         await db.commit()
         
         return UnverifyWorkExperienceResponse(
@@ -1931,6 +2375,7 @@ async def update_work_experience_description(
 
         # Update the description
         work_experience.description = req.description
+        await candidate_changed(db, candidate_id, ["work_experience"])
         await db.commit()
 
         return UpdateWorkExperienceDescriptionResponse(
@@ -1983,6 +2428,7 @@ async def update_work_experience_key_achievements(
 
         # Update the key achievements
         work_experience.key_achievements = req.key_achievements
+        await candidate_changed(db, candidate_id, ["work_experience"])
         await db.commit()
 
         return UpdateWorkExperienceKeyAchievementsResponse(
@@ -2048,6 +2494,7 @@ async def update_work_experience_projects(
         db.add_all(projects)
 
         # commit everything in one transaction
+        await candidate_changed(db, candidate_id, ["work_experience"])
         await db.commit()
 
         return UpdateWorkExperienceProjectsResponse(
@@ -18,6 +18,7 @@ from pydantic_ai import Agent
 from pydantic_ai.models.openai import OpenAIModel
 from pydantic_ai.providers.openai import OpenAIProvider
 
+from helpers.resume_text import get_resume_texts
 from util.app_config import config
 from sse_starlette.sse import EventSourceResponse
 
@@ -90,13 +91,17 @@ async def send_message(
         .where(Candidate.id.in_(chat_session.candidates))
     )
     candidates_objs = candidates_data_q.unique().scalars().all()
+    resume_texts = await get_resume_texts(
+        db, [candidate.resume.file_path for candidate in candidates_objs if candidate.resume]
+    )
     candidates_data = []
     for candidate in candidates_objs:
-        resume_access_url = None
-        if candidate.resume and candidate.resume.id:
-            resume_access_url = f"{config.API_BASE_URL}/downloadresumeurl/{candidate.resume.id}"
+        if candidate.resume and candidate.resume.file_path in resume_texts:
+            resume = resume_texts[candidate.resume.file_path]
+        elif candidate.resume and candidate.resume.id:
+            resume = f"{config.API_BASE_URL}/downloadresumeurl/{candidate.resume.id}"
         else:
-            resume_access_url = "No resume file associated."
+            resume = "No resume file associated."
         candidates_data.append(
             {
                 "id": candidate.id,
@@ -112,7 +117,7 @@ async def send_message(
                 "education": candidate.educations,
                 "skills": candidate.skills,
                 "certifications": candidate.certifications,
-                "resume_link": resume_access_url,
+                "resume": resume,
             }
         )
 
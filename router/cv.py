@@ -1,116 +1,581 @@
+import asyncio
 import tempfile
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
 from pathlib import Path
 import shutil
-from db.models import Attachment
-from db.session import get_db
-from helpers.cv import process_cv_async
+from db.models import Attachment, CvParseResult, ResumeParseJob
+from helpers.resume_text import attachment_text, extract_resume_text, file_content_hash
+from db.session import SessionLocal, get_db
+from helpers.cv import CV_PARSE_MODEL, CV_PROMPT_VERSION, process_cv_async
 import json
-from schema.cv import UploadCVResponse
+from schema.cv import ResumeParseJobAccepted, ResumeParseJobStatus, UploadCVResponse
+from sqlalchemy import and_, cast, delete, exists, func, or_, select, update
+from sqlalchemy.dialects.postgresql import JSONB, insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sse_starlette.sse import EventSourceResponse
 from util.app_config import config # config has the env variable like this config.SQLALCHEMY_DATABASE_URI and all others
 import boto3
 from botocore.exceptions import ClientError
 from botocore.client import ClientCreator
 from util.s3 import get_s3_client
+from util.pdf_text import PdfExtractionError, PdfText
 import uuid
 import os
 
 
 router = APIRouter()
 
+# How often the events stream re-reads the job row.
+RESUME_PARSE_EVENTS_POLL_SECONDS = 0.5
+# How often a running job touches its row. A queued or running job whose
+# row is older than RESUME_PARSE_JOB_STALE_SECONDS lost its worker.
+RESUME_PARSE_JOB_HEARTBEAT_SECONDS = 15.0
 
-@router.post("/upload_resume", response_model=UploadCVResponse)
-async def upload_resume_to_s3(
-    file: UploadFile = File(...), 
-    db: AsyncSession = Depends(get_db),
-    s3: ClientCreator = Depends(get_s3_client) # Inject S3 client here!
-):
-    # Now use the injected 's3' variable instead of the global 's3_client'
-    
-    # No need for this check, dependency injection handles failure
-    # if not s3: 
-    #     raise HTTPException(status_code=500, detail="S3 client not initialized.")
 
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="No filename provided.")
+def _upload_file(s3, file_path: str, bucket_name: str, key: str, content_type: str) -> None:
+    try:
+        s3.upload_file(file_path, bucket_name, key, ExtraArgs={'ContentType': content_type})
+    except ClientError:
+        raise HTTPException(status_code=500, detail="Could not upload file to storage.")
+    except Exception:
+        raise HTTPException(status_code=500, detail="An unexpected error occurred during file upload.")
+
+
+async def _discard_upload(upload: asyncio.Task, s3, bucket_name: str, key: str) -> None:
+    """
+    Remove the object of an upload whose request failed. A running boto3
+    transfer cannot be interrupted, so wait for it to end first.
+    """
+    try:
+        await upload
+    except BaseException:
+        return
+    try:
+        await asyncio.to_thread(s3.delete_object, Bucket=bucket_name, Key=key)
+    except Exception as e:
+        print(f"Could not remove orphaned upload {key}: {str(e)}")
 
-    # --- Get Bucket Name ---
-    bucket_name = config.AWS_S3_BUCKET_NAME
-    if not bucket_name:
-        raise HTTPException(status_code=500, detail="S3 bucket configuration missing.")
 
-    # --- Generate Unique S3 Object Key ---
-    file_extension = Path(file.filename).suffix
+# Cleanups of failed uploads still in flight, referenced until they end.
+_pending_discards: set[asyncio.Task] = set()
+
+
+def _discard_upload_later(upload: asyncio.Task, s3, bucket_name: str, key: str) -> None:
+    """Run `_discard_upload` without delaying the failed request."""
+    cleanup = asyncio.create_task(_discard_upload(upload, s3, bucket_name, key))
+    _pending_discards.add(cleanup)
+    cleanup.add_done_callback(_pending_discards.discard)
+
+
+def _hash_file(file_path: str) -> str:
+    return file_content_hash(Path(file_path).read_bytes())
+
+
+async def _no_report(stage: str) -> None:
+    return None
+
+
+async def parse_resume(
+    db: AsyncSession,
+    s3: ClientCreator,
+    temp_file_path: str,
+    filename: str,
+    content_type: str,
+    report: Callable[[str], Awaitable[None]] = _no_report,
+    s3_object_key: str | None = None,
+) -> UploadCVResponse:
+    """
+    Store the resume at `temp_file_path` in S3, extract and parse it, and
+    save its Attachment. `report` is awaited with each ResumeParseStage as
+    it completes; "uploaded" may come before or after
+    "text_extracted" since the two run concurrently. A resume already
+    stored at `s3_object_key` is not uploaded again, nor removed on failure.
+    """
+    bucket_name = config.AWS_S3_BUCKET_NAME
     file_uuid = str(uuid.uuid4())
-    s3_object_key = f"resumes/{file_uuid}{file_extension}" 
+    stored = s3_object_key is not None
+    if not stored:
+        s3_object_key = f"resumes/{file_uuid}{Path(filename).suffix}"
+    content_hash = await asyncio.to_thread(_hash_file, temp_file_path)
 
-    temp_file_path = None
-    try:
-        # --- Save to Temporary File for Processing ---
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-            shutil.copyfileobj(file.file, temp_file)
-            temp_file_path = temp_file.name
-
-        print(f"Temporary file created at: {temp_file_path}")
-        
-        cv_content_str = await process_cv_async(temp_file_path)
-        
-        # ... (rest of CV parsing logic remains the same) ...
-        try:
-            json_str = cv_content_str.replace("```json\n", "").replace("\n```", "")
-            cv_data = json.loads(json_str)
-        except json.JSONDecodeError:
-            raise HTTPException(status_code=500, detail="Error parsing processed CV data.")
+    # A file already parsed with this prompt and model reuses the cached
+    # cv_data. It is still uploaded as its own object: attachments never
+    # share an S3 key, so deleting one resume cannot break another.
+    cached = await db.get(
+        CvParseResult, (content_hash, CV_PROMPT_VERSION, CV_PARSE_MODEL)
+    )
 
+    # --- Upload Temporary File to S3 ---
+    # Runs in a worker thread alongside text extraction and the LLM
+    # call, so the request takes max(upload, parsing), not the sum.
+    async def upload_file() -> None:
+        if stored:
+            return
+        await asyncio.to_thread(
+            _upload_file, s3, temp_file_path, bucket_name, s3_object_key, content_type
+        )
+        await report("uploaded")
 
-        # --- Upload Temporary File to S3 ---
-        try:
-             # Use the injected 's3' client
-             s3.upload_file(  # type: ignore
-                 temp_file_path, 
-                 bucket_name, 
-                 s3_object_key,
-                 ExtraArgs={'ContentType': file.content_type or 'application/octet-stream'} 
-             )
-        except ClientError:
-            raise HTTPException(status_code=500, detail="Could not upload file to storage.")
-        except Exception:
-            raise HTTPException(status_code=500, detail="An unexpected error occurred during file upload.")
+    async def parse_file() -> tuple[PdfText, dict]:
+        # Extracted once here and stored with the attachment; embedding
+        # and chat read the stored text instead of parsing the PDF again.
+        resume_text = await extract_resume_text(db, temp_file_path, content_hash)
+        await report("text_extracted")
+
+        if cached is not None:
+            cv_data = cached.cv_data
+        else:
+            cv_content_str = await process_cv_async(resume_text.text)
+
+            # ... (rest of CV parsing logic remains the same) ...
+            try:
+                json_str = cv_content_str.replace("```json\n", "").replace("\n```", "")
+                cv_data = json.loads(json_str)
+            except json.JSONDecodeError:
+                raise HTTPException(status_code=500, detail="Error parsing processed CV data.")
+
+        await report("llm_parsed")
+        return resume_text, cv_data
+
+    upload = asyncio.create_task(upload_file())
+    parse = asyncio.create_task(parse_file())
+    try:
+        # Whichever side fails first fails the request: a failed upload
+        # cancels parsing, so the LLM is not called for a file that
+        # cannot be stored.
+        await asyncio.wait({upload, parse}, return_when=asyncio.FIRST_EXCEPTION)
+        for task in (upload, parse):
+            if task.done() and not task.cancelled() and task.exception():
+                raise task.exception()
+        resume_text, cv_data = parse.result()
 
         # --- Save Metadata to Database ---
-        # ... (database logic remains the same, using db_file = Attachment(...) etc) ...
         db_file = Attachment(
             id=file_uuid,
-            filename=file.filename, 
-            file_path=s3_object_key, 
-            content_type=file.content_type or 'application/octet-stream',
+            filename=filename,
+            file_path=s3_object_key,
+            content_type=content_type,
         )
         db.add(db_file)
+        await db.flush()
+        db.add(attachment_text(db_file.id, content_hash, resume_text))
+        if cached is None:
+            # A concurrent upload of the same file may have stored it first.
+            await db.execute(
+                insert(CvParseResult)
+                .values(
+                    content_hash=content_hash,
+                    prompt_version=CV_PROMPT_VERSION,
+                    model=CV_PARSE_MODEL,
+                    cv_data=cv_data,
+                )
+                .on_conflict_do_nothing()
+            )
         await db.commit()
-        await db.refresh(db_file)
-        
-
-
-        # --- Prepare Response ---
-        # ... (response preparation remains the same) ...
-        res = UploadCVResponse(
-            file_id=db_file.id,
-            filename=db_file.filename,
-            content_type=db_file.content_type,
-            file_path=db_file.file_path, # S3 Key
-            cv_data=cv_data,
-        )
-        return res
+    except BaseException:
+        parse.cancel()
+        # Let a cancelled parse release the session before the caller
+        # closes it; the upload thread cannot be stopped and is cleaned up
+        # in the background instead of holding up the error response.
+        await asyncio.gather(parse, return_exceptions=True)
+        if not stored:
+            _discard_upload_later(upload, s3, bucket_name, s3_object_key)
+        raise
+    # Committed: from here on the object belongs to the attachment and a
+    # failure must not delete it.
+    await db.refresh(db_file)
+    await report("saved")
+
+    # --- Prepare Response ---
+    return UploadCVResponse(
+        file_id=db_file.id,
+        filename=db_file.filename,
+        content_type=db_file.content_type,
+        file_path=db_file.file_path, # S3 Key
+        cv_data=cv_data,
+    )
+
+
+def _check_upload(file: UploadFile) -> None:
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="No filename provided.")
+    if not config.AWS_S3_BUCKET_NAME:
+        raise HTTPException(status_code=500, detail="S3 bucket configuration missing.")
+
+
+def _save_temp_file(file: UploadFile) -> str:
+    # --- Save to Temporary File for Processing ---
+    with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as temp_file:
+        shutil.copyfileobj(file.file, temp_file)
+        return temp_file.name
+
+
+def _remove_temp_file(temp_file_path: str | None) -> None:
+    if temp_file_path and Path(temp_file_path).exists():
+        os.remove(temp_file_path)
+
+
+@router.post("/upload_resume", response_model=UploadCVResponse)
+async def upload_resume_to_s3(
+    file: UploadFile = File(...), 
+    db: AsyncSession = Depends(get_db),
+    s3: ClientCreator = Depends(get_s3_client) # Inject S3 client here!
+):
+    _check_upload(file)
 
+    temp_file_path = None
+    try:
+        temp_file_path = _save_temp_file(file)
+        return await parse_resume(
+            db,
+            s3,
+            temp_file_path,
+            file.filename,
+            file.content_type or 'application/octet-stream',
+        )
     except HTTPException:
          # Re-raise HTTPException to ensure FastAPI handles it correctly
          raise
+    except PdfExtractionError as e:
+        raise HTTPException(status_code=422, detail=f"Could not read the resume PDF. {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An internal server error occurred. {str(e)}")
     finally:
         # --- Clean up Temporary File ---
-        # ... (temp file cleanup logic remains the same) ...
-        if temp_file_path and Path(temp_file_path).exists():
-            os.remove(temp_file_path)
-        await file.seek(0)
\ No newline at end of file
+        _remove_temp_file(temp_file_path)
+        await file.seek(0)
+
+
+# --- Asynchronous parsing ---
+# The upload is stored in S3 and queued as a resume_parse_jobs row before
+# the 202 response, so it survives API restarts. Resume parse workers
+# (tasks.resume_parse_worker) claim queued jobs and heartbeat them while
+# they run; a job whose worker died is reclaimed by another worker once
+# its heartbeat is RESUME_PARSE_JOB_STALE_SECONDS old. The status and
+# events endpoints only read the row.
+
+
+async def _update_job(job_id: uuid.UUID, **values) -> None:
+    async with SessionLocal() as db:
+        await db.execute(
+            update(ResumeParseJob)
+            .where(ResumeParseJob.id == job_id)
+            .values(updated_at=datetime.now(timezone.utc), **values)
+        )
+        await db.commit()
+
+
+def _stage_entry(stage: str) -> dict:
+    return {"stage": stage, "at": datetime.now(timezone.utc).isoformat()}
+
+
+async def _record_stage(job_id: uuid.UUID, stage: str) -> None:
+    await _update_job(
+        job_id,
+        stage=stage,
+        stages=ResumeParseJob.stages.op("||")(
+            func.jsonb_build_array(cast(_stage_entry(stage), JSONB))
+        ),
+    )
+
+
+async def _heartbeat(job_id: uuid.UUID) -> None:
+    while True:
+        await asyncio.sleep(RESUME_PARSE_JOB_HEARTBEAT_SECONDS)
+        try:
+            await _update_job(job_id)
+        except Exception as e:
+            print(f"Could not heartbeat resume parse job {job_id}: {str(e)}")
+
+
+async def _load_job(db: AsyncSession, job_id: uuid.UUID) -> ResumeParseJob | None:
+    return await db.get(ResumeParseJob, job_id, populate_existing=True)
+
+
+async def _poll_job(job_id: uuid.UUID) -> ResumeParseJob | None:
+    async with SessionLocal() as session:
+        return await _load_job(session, job_id)
+
+
+STALE_JOB_ERROR = "The job stopped before it finished; upload the resume again."
+
+
+async def claim_resume_parse_jobs(db: AsyncSession, batch_size: int) -> tuple[list, list[str]]:
+    """
+    Claim up to `batch_size` queued jobs with SELECT ... FOR UPDATE SKIP
+    LOCKED, oldest first. Running jobs whose heartbeat stopped are
+    reclaimed, or failed once out of attempts. Returns the claimed jobs
+    and the S3 keys of the jobs failed here.
+    """
+    now = datetime.now(timezone.utc)
+    stale = now - timedelta(seconds=config.RESUME_PARSE_JOB_STALE_SECONDS)
+    parked = await db.execute(
+        update(ResumeParseJob)
+        .where(
+            ResumeParseJob.status == "running",
+            ResumeParseJob.updated_at < stale,
+            ResumeParseJob.attempts >= config.RESUME_PARSE_JOB_MAX_ATTEMPTS,
+        )
+        .values(status="failed", error=STALE_JOB_ERROR, updated_at=now)
+        .returning(ResumeParseJob.s3_key)
+        .execution_options(synchronize_session=False)
+    )
+    parked_keys = [key for key in parked.scalars().all() if key]
+    claimable = (
+        select(ResumeParseJob.id)
+        .where(
+            or_(
+                ResumeParseJob.status == "queued",
+                and_(
+                    ResumeParseJob.status == "running",
+                    ResumeParseJob.updated_at < stale,
+                ),
+            )
+        )
+        .order_by(ResumeParseJob.updated_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        update(ResumeParseJob)
+        .where(ResumeParseJob.id.in_(claimable))
+        .values(
+            status="running",
+            attempts=ResumeParseJob.attempts + 1,
+            updated_at=now,
+        )
+        .returning(
+            ResumeParseJob.id,
+            ResumeParseJob.filename,
+            ResumeParseJob.content_type,
+            ResumeParseJob.s3_key,
+            ResumeParseJob.attempts,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    jobs = result.all()
+    await db.commit()
+    return jobs, parked_keys
+
+
+async def _is_attached(s3_key: str) -> bool:
+    async with SessionLocal() as db:
+        return bool(
+            await db.scalar(select(exists().where(Attachment.file_path == s3_key)))
+        )
+
+
+async def discard_job_upload(s3: ClientCreator, s3_key: str) -> None:
+    """Remove the object of a failed job unless an attachment was saved with it."""
+    try:
+        if await _is_attached(s3_key):
+            return
+        await asyncio.to_thread(
+            s3.delete_object, Bucket=config.AWS_S3_BUCKET_NAME, Key=s3_key
+        )
+    except Exception as e:
+        print(f"Could not remove the upload of a failed job {s3_key}: {str(e)}")
+
+
+async def _fail_job(job, s3: ClientCreator, error: str, retry: bool = False) -> None:
+    """
+    Requeue the job when `retry` allows and attempts remain, otherwise fail
+    it and drop its upload. A job that already saved its attachment is
+    never run again, as that would save a second one.
+    """
+    if job.s3_key and await _is_attached(job.s3_key):
+        await _update_job(job.id, status="failed", error=error)
+        return
+    if retry and job.attempts < config.RESUME_PARSE_JOB_MAX_ATTEMPTS:
+        await _update_job(job.id, status="queued", error=error)
+        return
+    await _update_job(job.id, status="failed", error=error)
+    if job.s3_key:
+        await discard_job_upload(s3, job.s3_key)
+
+
+def _download_file(s3, bucket_name: str, key: str, suffix: str) -> str:
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+        s3.download_fileobj(bucket_name, key, temp_file)
+        return temp_file.name
+
+
+async def run_resume_parse_job(job, s3: ClientCreator) -> None:
+    """Parse the stored resume of a claimed job and record the outcome."""
+    async def report(stage: str) -> None:
+        await _record_stage(job.id, stage)
+
+    heartbeat = asyncio.create_task(_heartbeat(job.id))
+    temp_file_path = None
+    try:
+        if job.s3_key is None:
+            # Queued before uploads were stored with the job.
+            raise HTTPException(status_code=500, detail=STALE_JOB_ERROR)
+        temp_file_path = await asyncio.to_thread(
+            _download_file,
+            s3,
+            config.AWS_S3_BUCKET_NAME,
+            job.s3_key,
+            Path(job.filename).suffix,
+        )
+        async with SessionLocal() as db:
+            result = await parse_resume(
+                db,
+                s3,
+                temp_file_path,
+                job.filename,
+                job.content_type,
+                report,
+                s3_object_key=job.s3_key,
+            )
+        await _update_job(
+            job.id,
+            status="succeeded",
+            result=result.model_dump(mode="json"),
+            error=None,
+        )
+    except HTTPException as e:
+        await _fail_job(job, s3, str(e.detail))
+    except PdfExtractionError as e:
+        await _fail_job(job, s3, f"Could not read the resume PDF. {str(e)}")
+    except Exception as e:
+        print(f"Resume parse job {job.id} failed: {str(e)}")
+        await _fail_job(job, s3, str(e), retry=True)
+    finally:
+        heartbeat.cancel()
+        _remove_temp_file(temp_file_path)
+
+
+async def prune_resume_parse_jobs(db: AsyncSession) -> int:
+    """Delete jobs that finished more than RESUME_PARSE_JOB_RETENTION_SECONDS ago."""
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        seconds=config.RESUME_PARSE_JOB_RETENTION_SECONDS
+    )
+    result = await db.execute(
+        delete(ResumeParseJob)
+        .where(
+            ResumeParseJob.status.in_(["succeeded", "failed"]),
+            ResumeParseJob.updated_at < cutoff,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+def _job_status(job: ResumeParseJob) -> ResumeParseJobStatus:
+    return ResumeParseJobStatus(
+        job_id=job.id,
+        status=job.status,
+        stage=job.stage,
+        stages=job.stages,
+        result=job.result,
+        error=job.error,
+    )
+
+
+@router.post(
+    "/upload_resume/async",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=ResumeParseJobAccepted,
+)
+async def upload_resume_async(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    s3: ClientCreator = Depends(get_s3_client),
+):
+    """
+    Store a resume and queue it for the resume parse workers. Poll the
+    status URL or follow the events URL for the stages and the final
+    cv_data.
+    """
+    _check_upload(file)
+    content_type = file.content_type or 'application/octet-stream'
+    s3_object_key = f"resumes/{uuid.uuid4()}{Path(file.filename).suffix}"
+    temp_file_path = None
+    try:
+        temp_file_path = _save_temp_file(file)
+        await asyncio.to_thread(
+            _upload_file,
+            s3,
+            temp_file_path,
+            config.AWS_S3_BUCKET_NAME,
+            s3_object_key,
+            content_type,
+        )
+    finally:
+        _remove_temp_file(temp_file_path)
+        await file.seek(0)
+
+    try:
+        job = ResumeParseJob(
+            filename=file.filename,
+            content_type=content_type,
+            s3_key=s3_object_key,
+            stage="uploaded",
+            stages=[_stage_entry("uploaded")],
+        )
+        db.add(job)
+        await db.commit()
+    except Exception as e:
+        await discard_job_upload(s3, s3_object_key)
+        raise HTTPException(status_code=500, detail=f"Could not queue the resume. {str(e)}")
+
+    return ResumeParseJobAccepted(
+        job_id=job.id,
+        status_url=f"{config.API_BASE_URL}/upload_resume/jobs/{job.id}",
+        events_url=f"{config.API_BASE_URL}/upload_resume/jobs/{job.id}/events",
+    )
+
+
+@router.get("/upload_resume/jobs/{job_id}", response_model=ResumeParseJobStatus)
+async def get_resume_parse_job(job_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
+    job = await _load_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_status(job)
+
+
+@router.get("/upload_resume/jobs/{job_id}/events")
+async def stream_resume_parse_job(job_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
+    """
+    Server-sent events: one "stage" event per completed stage, then a
+    "done" event with the final job status once it succeeds or fails. The
+    stream ends with an "error" event if the job disappears or is still
+    not finished after RESUME_PARSE_EVENTS_MAX_SECONDS; the status URL
+    keeps working after that.
+    """
+    if await _load_job(db, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_generator():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + config.RESUME_PARSE_EVENTS_MAX_SECONDS
+        sent = 0
+        while True:
+            job = await _poll_job(job_id)
+            if job is None:
+                yield {"event": "error", "data": json.dumps({"detail": "Job not found"})}
+                return
+            for entry in job.stages[sent:]:
+                yield {"event": "stage", "data": json.dumps(entry)}
+            sent = len(job.stages)
+            if job.status in ("succeeded", "failed"):
+                yield {
+                    "event": "done",
+                    "data": _job_status(job).model_dump_json(),
+                }
+                return
+            if loop.time() >= deadline:
+                yield {
+                    "event": "error",
+                    "data": json.dumps(
+                        {"detail": "Job still running; poll the status URL"}
+                    ),
+                }
+                return
+            await asyncio.sleep(RESUME_PARSE_EVENTS_POLL_SECONDS)
+
+    return EventSourceResponse(event_generator())
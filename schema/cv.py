@@ -1,6 +1,6 @@
 from uuid import UUID
 from pydantic import BaseModel
-from typing import Any
+from typing import Any, List, Literal, Optional
 
 
 class UploadCVResponse(BaseModel):
@@ -9,3 +9,27 @@ class UploadCVResponse(BaseModel):
     content_type: str
     file_path: str
     cv_data: Any
+
+
+# Stages of a resume parse, reported as they complete.
+ResumeParseStage = Literal["uploaded", "text_extracted", "llm_parsed", "saved"]
+
+
+class ResumeParseJobAccepted(BaseModel):
+    job_id: UUID
+    status_url: str
+    events_url: str
+
+
+class ResumeParseStageEntry(BaseModel):
+    stage: ResumeParseStage
+    at: str
+
+
+class ResumeParseJobStatus(BaseModel):
+    job_id: UUID
+    status: Literal["queued", "running", "succeeded", "failed"]
+    stage: Optional[ResumeParseStage] = None
+    stages: List[ResumeParseStageEntry]
+    result: Optional[UploadCVResponse] = None
+    error: Optional[str] = None
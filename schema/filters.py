@@ -0,0 +1,44 @@
+from fastapi import Query
+from typing import List, Optional
+
+
+class CandidateFilters:
+    def __init__(
+        self,
+        min_experience: Optional[int] = Query(
+            None, ge=0, description="Minimum years of experience"
+        ),
+        max_experience: Optional[int] = Query(
+            None, ge=0, description="Maximum years of experience"
+        ),
+        status: Optional[List[str]] = Query(
+            None, description="Only candidates in one of these statuses"
+        ),
+        skills: Optional[List[str]] = Query(
+            None, description="Technical skills the candidate must all have"
+        ),
+        country: Optional[str] = Query(
+            None, description="Country of the candidate's address (case-insensitive)"
+        ),
+        embedding_ready: Optional[bool] = Query(
+            None,
+            description="Only candidates that have (or lack) a vector for the active embedding model",
+        ),
+    ):
+        self.min_experience = min_experience
+        self.max_experience = max_experience
+        self.status = status
+        self.skills = skills
+        self.country = country
+        self.embedding_ready = embedding_ready
+
+    @property
+    def cache_key(self) -> tuple:
+        return (
+            self.min_experience,
+            self.max_experience,
+            tuple(sorted(self.status or ())),
+            tuple(sorted(self.skills or ())),
+            self.country.lower() if self.country else None,
+            self.embedding_ready,
+        )
@@ -1,5 +1,10 @@
-from fastapi import Query
-from typing import List, Generic, TypeVar, Sequence
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, Query, status
+from typing import List, Generic, Optional, TypeVar, Sequence
 from pydantic import BaseModel, Field
 from math import ceil
 
@@ -56,3 +61,91 @@ class Pagination:
 class PaginatedResponse(Generic[T], BaseModel):
     items: List[T]
     pagination: dict = Field(...)
+
+
+def encode_cursor(kind: str, *keys) -> str:
+    """Opaque token for the sort key of the last row of a page."""
+    payload = json.dumps([kind, *keys], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> list:
+    try:
+        payload = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(payload)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Malformed cursor")
+    if not isinstance(values, list) or not values or not isinstance(values[0], str):
+        raise ValueError("Malformed cursor")
+    return values
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def _cursor_key(value, expected: type):
+    # bool is an int subclass, but never a valid sort key.
+    if isinstance(value, bool):
+        raise _invalid_cursor()
+    if expected is float and isinstance(value, (int, float)):
+        return value
+    if expected is datetime and isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            raise _invalid_cursor()
+    if expected in (int, str) and isinstance(value, expected):
+        return value
+    raise _invalid_cursor()
+
+
+class CursorPagination:
+    """
+    Keyset pagination: each page starts strictly after the sort key encoded
+    in the previous page's `next_cursor`, so deep pages cost the same as
+    the first one.
+    """
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(
+            None, description="next_cursor of the previous page; omit for the first page"
+        ),
+        page_size: int = Query(
+            10, ge=1, le=100, description="Number of items per page"
+        ),
+    ):
+        self.page_size = page_size
+        try:
+            self._after = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    @property
+    def limit(self) -> int:
+        return self.page_size
+
+    def after(self, kind: str, *types: type) -> list | None:
+        """
+        Sort key the page starts after, or None for the first page. `kind`
+        names the ordering so a cursor is never applied to another one, and
+        `types` are the types of its keys: `float` accepts any number and
+        `datetime` an ISO 8601 string, returned parsed.
+        """
+        if self._after is None:
+            return None
+        if self._after[0] != kind:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor does not belong to this search",
+            )
+        keys = self._after[1:]
+        if len(keys) != len(types):
+            raise _invalid_cursor()
+        return [_cursor_key(key, expected) for key, expected in zip(keys, types)]
+
+
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,243 @@
+"""
+Re-embed the candidates table in id order, resuming from the last checkpoint:
+
+    python -m tasks.backfill_embeddings --name gemini-refresh --concurrency 4
+
+Candidates whose embedding input and model are unchanged are skipped, so
+re-running a finished or partial backfill only pays for what is stale. While
+a new embedding version is being dual-written (see tasks.embedding_versions)
+this fills in its vectors without touching the active ones.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import exists, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+
+from db.models import PROFILE_SECTION, Candidate, CandidateEmbedding, EmbeddingBackfill
+from db.session import SessionLocal
+from tasks.candidates import embed_candidates
+from tasks.embedding_versions import get_embedding_versions
+from util.app_config import config
+
+logger = logging.getLogger(__name__)
+
+
+def _candidate_filter(after_id: int, missing_models: list[str] | None):
+    """Candidates after `after_id`, optionally only those lacking a vector."""
+    conditions = [Candidate.id > after_id]
+    if missing_models:
+        conditions.append(
+            or_(
+                *(
+                    ~exists().where(
+                        CandidateEmbedding.candidate_id == Candidate.id,
+                        CandidateEmbedding.model == model,
+                        CandidateEmbedding.section == PROFILE_SECTION,
+                    )
+                    for model in missing_models
+                )
+            )
+        )
+    return conditions
+
+
+async def _missing_models(only_missing: bool) -> list[str] | None:
+    if not only_missing:
+        return None
+    async with SessionLocal() as db:
+        versions = await get_embedding_versions(db)
+    return [versions.active.model, *(version.model for version in versions.backfilling)]
+
+
+async def load_checkpoint(name: str, restart: bool) -> EmbeddingBackfill:
+    async with SessionLocal() as db:
+        checkpoint = await db.get(EmbeddingBackfill, name)
+        if checkpoint is None or restart:
+            checkpoint = EmbeddingBackfill(name=name, last_candidate_id=0, processed=0)
+            await save_checkpoint(checkpoint)
+        return checkpoint
+
+
+async def save_checkpoint(checkpoint: EmbeddingBackfill) -> None:
+    values = {
+        "name": checkpoint.name,
+        "last_candidate_id": checkpoint.last_candidate_id,
+        "processed": checkpoint.processed,
+        "completed_at": checkpoint.completed_at,
+        "updated_at": datetime.now(timezone.utc),
+    }
+    async with SessionLocal() as db:
+        await db.execute(
+            insert(EmbeddingBackfill)
+            .values(**values)
+            .on_conflict_do_update(index_elements=["name"], set_=values)
+        )
+        await db.commit()
+
+
+async def next_batch(
+    after_id: int, batch_size: int, missing_models: list[str] | None
+) -> list[int]:
+    async with SessionLocal() as db:
+        result = await db.execute(
+            select(Candidate.id)
+            .where(*_candidate_filter(after_id, missing_models))
+            .order_by(Candidate.id)
+            .limit(batch_size)
+        )
+        return list(result.scalars().all())
+
+
+async def embed_batch(candidate_ids: list[int], force: bool) -> int:
+    async with SessionLocal() as db:
+        embedded = await embed_candidates(db, candidate_ids, force=force)
+        await db.commit()
+        return embedded
+
+
+class Progress:
+    def __init__(self, total: int):
+        self.total = total
+        self.scanned = 0
+        self.embedded = 0
+        self.started = time.monotonic()
+
+    def record(self, scanned: int, embedded: int) -> None:
+        self.scanned += scanned
+        self.embedded += embedded
+        elapsed = time.monotonic() - self.started
+        rate = self.scanned / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.total - self.scanned, 0)
+        eta = remaining / rate if rate > 0 else float("inf")
+        logger.info(
+            "%d/%d scanned (%d re-embedded), %.1f rows/s, ETA %s",
+            self.scanned,
+            self.total,
+            self.embedded,
+            rate,
+            timedelta(seconds=int(eta)) if eta != float("inf") else "?",
+        )
+
+
+async def run_backfill(
+    name: str,
+    batch_size: int,
+    concurrency: int,
+    force: bool = False,
+    only_missing: bool = False,
+    restart: bool = False,
+) -> None:
+    checkpoint = await load_checkpoint(name, restart)
+    if checkpoint.completed_at is not None:
+        logger.info("Backfill %r already completed; pass --restart to run it again", name)
+        return
+
+    missing_models = await _missing_models(only_missing)
+    async with SessionLocal() as db:
+        total = await db.scalar(
+            select(func.count())
+            .select_from(Candidate)
+            .where(*_candidate_filter(checkpoint.last_candidate_id, missing_models))
+        )
+    logger.info(
+        "Backfill %r resuming after candidate %d, %d rows to scan",
+        name,
+        checkpoint.last_candidate_id,
+        total,
+    )
+    progress = Progress(total or 0)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    # Batches finish out of order, so the checkpoint only advances past the
+    # longest prefix of completed batches. A crash redoes at most the
+    # batches that were in flight.
+    in_flight: deque[tuple[int, int, asyncio.Task]] = deque()
+
+    async def flush_completed() -> None:
+        advanced = False
+        while in_flight and in_flight[0][2].done():
+            last_id, size, task = in_flight.popleft()
+            task.result()
+            checkpoint.last_candidate_id = last_id
+            checkpoint.processed += size
+            advanced = True
+        if advanced:
+            await save_checkpoint(checkpoint)
+
+    async def run_batch(candidate_ids: list[int]) -> None:
+        try:
+            embedded = await embed_batch(candidate_ids, force)
+            progress.record(len(candidate_ids), embedded)
+        finally:
+            semaphore.release()
+
+    cursor = checkpoint.last_candidate_id
+    try:
+        while True:
+            candidate_ids = await next_batch(cursor, batch_size, missing_models)
+            if not candidate_ids:
+                break
+            cursor = candidate_ids[-1]
+            await semaphore.acquire()
+            task = asyncio.create_task(run_batch(candidate_ids))
+            in_flight.append((cursor, len(candidate_ids), task))
+            await flush_completed()
+
+        await asyncio.gather(*(task for _, _, task in in_flight))
+        await flush_completed()
+    except BaseException:
+        for _, _, task in in_flight:
+            task.cancel()
+        await asyncio.gather(*(task for _, _, task in in_flight), return_exceptions=True)
+        logger.error(
+            "Backfill %r stopped; checkpoint at candidate %d",
+            name,
+            checkpoint.last_candidate_id,
+        )
+        raise
+
+    checkpoint.completed_at = datetime.now(timezone.utc)
+    await save_checkpoint(checkpoint)
+    logger.info(
+        "Backfill %r finished: %d scanned, %d re-embedded",
+        name,
+        progress.scanned,
+        progress.embedded,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--name", default="default", help="Checkpoint name")
+    parser.add_argument("--batch-size", type=int, default=config.EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--force", action="store_true", help="Re-embed even when the input hash matches"
+    )
+    parser.add_argument(
+        "--only-missing",
+        action="store_true",
+        help="Only candidates missing a vector for the active or a backfilling version",
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="Discard the checkpoint and start over"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(
+        run_backfill(
+            args.name,
+            args.batch_size,
+            args.concurrency,
+            force=args.force,
+            only_missing=args.only_missing,
+            restart=args.restart,
+        )
+    )
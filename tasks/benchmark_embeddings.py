@@ -0,0 +1,50 @@
+"""
+Compare embedding providers on latency and throughput:
+
+    EMBEDDING_PROVIDER=sentence_transformers EMBEDDING_MODEL=all-MiniLM-L6-v2 \
+        python -m tasks.benchmark_embeddings --documents 512 --batch-size 64
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from faker import Faker
+
+from util.embeddings import get_embedding_provider
+
+
+async def run_benchmark(documents: int, batch_size: int) -> None:
+    fake = Faker()
+    texts = [fake.paragraph(nb_sentences=20) for _ in range(documents)]
+    provider = get_embedding_provider()
+
+    # Warm up so model loading / connection setup is not measured.
+    await provider.embed_documents(texts[:1])
+
+    latencies = []
+    started = time.perf_counter()
+    for start in range(0, len(texts), batch_size):
+        batch_started = time.perf_counter()
+        await provider.embed_documents(texts[start : start + batch_size])
+        latencies.append(time.perf_counter() - batch_started)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    # Report the backend, not the rate-limiting wrapper around it.
+    backend = getattr(provider, "inner", provider)
+    print(f"provider:    {type(backend).__name__} ({provider.model_name})")
+    print(f"documents:   {documents} in batches of {batch_size}")
+    print(f"throughput:  {documents / elapsed:.1f} docs/s")
+    print(f"batch p50:   {statistics.median(latencies) * 1000:.0f} ms")
+    print(f"batch p95:   {p95 * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.documents, args.batch_size))
@@ -0,0 +1,355 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import Any, NamedTuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import (
+    Attachment,
+    Candidate,
+    CandidateChunk,
+    Education,
+    WorkExperience,
+    WorkExperienceProjects,
+    WorkExperienceVerification,
+)
+from helpers.resume_text import get_resume_texts
+from util.embeddings import EmbeddingProvider
+
+SECTIONS = ("work_experience", "education", "skills", "success_stories", "resume")
+
+# Resume text is embedded in overlapping word windows so long resumes are
+# not truncated or diluted into a single vector.
+RESUME_WINDOW_WORDS = 300
+RESUME_WINDOW_OVERLAP = 50
+
+
+class Chunk(NamedTuple):
+    section: str
+    source_key: str
+    content: str
+
+
+def _join(label: str, values) -> str | None:
+    values = [str(value) for value in values or [] if value]
+    return f"{label}: {', '.join(values)}" if values else None
+
+
+def _lines(*lines) -> str:
+    return "\n".join(line for line in lines if line)
+
+
+def work_experience_chunk(work_experience, projects, verifications: int = 0) -> Chunk:
+    period = " - ".join(
+        date for date in (work_experience.start_date, work_experience.end_date) if date
+    )
+    heading = " at ".join(
+        part for part in (work_experience.title, work_experience.company) if part
+    )
+    project_lines = [
+        f"Project {project.project_name}: {project.description} Impact: {project.impact}"
+        for project in projects
+    ]
+    content = _lines(
+        heading,
+        period,
+        work_experience.location,
+        work_experience.description,
+        _join("Key achievements", work_experience.key_achievements),
+        _join("Skills", work_experience.skills),
+        *project_lines,
+        f"Verified by {verifications} recruiter(s)" if verifications else None,
+    )
+    return Chunk("work_experience", str(work_experience.id), content)
+
+
+def education_chunk(education) -> Chunk:
+    content = _lines(
+        " in ".join(part for part in (education.degree, education.major) if part),
+        education.school,
+        education.graduation_date,
+    )
+    return Chunk("education", str(education.id), content)
+
+
+def skills_chunk(skills: dict | None) -> Chunk | None:
+    if not skills:
+        return None
+    languages = [
+        f"{language.get('language')} ({language.get('level')})"
+        if language.get("level")
+        else language.get("language")
+        for language in skills.get("languages") or []
+        if isinstance(language, dict) and language.get("language")
+    ]
+    content = _lines(
+        _join("Technical skills", skills.get("technical_skills")),
+        _join("General skills", skills.get("general_skills")),
+        _join("Languages", languages),
+    )
+    return Chunk("skills", "skills", content) if content else None
+
+
+def success_story_chunks(stories: list | None) -> list[Chunk]:
+    chunks = []
+    for index, story in enumerate(stories or []):
+        if isinstance(story, str):
+            story = json.loads(story)
+        content = _lines(
+            story.get("headline"),
+            story.get("situation"),
+            story.get("actions"),
+            story.get("results"),
+            _join("Skills", story.get("skills")),
+        )
+        if content:
+            chunks.append(Chunk("success_stories", str(story.get("id") or index), content))
+    return chunks
+
+
+def resume_chunks(s3_key: str, resume_text: str) -> list[Chunk]:
+    words = resume_text.split()
+    step = RESUME_WINDOW_WORDS - RESUME_WINDOW_OVERLAP
+    chunks = []
+    for index, start in enumerate(range(0, len(words), step)):
+        window = words[start : start + RESUME_WINDOW_WORDS]
+        chunks.append(Chunk("resume", f"{s3_key}#{index}", " ".join(window)))
+        if start + RESUME_WINDOW_WORDS >= len(words):
+            break
+    return chunks
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+async def sync_candidate_chunks(
+    db: AsyncSession,
+    candidate_ids: list[int],
+    providers: list[EmbeddingProvider],
+    resume_texts: dict[str, str] | None = None,
+    force: bool = False,
+    sections: frozenset[str] | None = None,
+) -> int:
+    """
+    Rebuild the per-section chunks of the given candidates, embed only the
+    chunks whose content changed or that have no vector yet for one of
+    `providers` (one batched call per model), and drop chunks whose source
+    disappeared. Chunks are stored once per model, so a version being
+    backfilled gets its own chunks next to the active ones. Resume windows
+    are keyed by the resume's S3 key, so an unchanged resume is never
+    downloaded again; `resume_texts` lets callers pass text they already
+    loaded, `force` re-embeds every chunk and `sections` limits the sync to
+    those sections. The caller owns the transaction. Returns the number of
+    chunk vectors embedded.
+    """
+    resume_texts = dict(resume_texts or {})
+
+    # Sections that are not embedded (e.g. certifications) are ignored.
+    wanted = set(SECTIONS) if sections is None else set(sections) & set(SECTIONS)
+    if not wanted:
+        return 0
+
+    desired: dict[tuple[int, str, str], str] = {}
+
+    def add(candidate_id: int, chunk: Chunk | None) -> None:
+        if chunk and chunk.content:
+            desired[(candidate_id, chunk.section, chunk.source_key)] = chunk.content
+
+    existing = (
+        await db.execute(
+            select(
+                CandidateChunk.id,
+                CandidateChunk.candidate_id,
+                CandidateChunk.section,
+                CandidateChunk.source_key,
+                CandidateChunk.content_hash,
+                CandidateChunk.embedding_model,
+            ).where(
+                CandidateChunk.candidate_id.in_(candidate_ids),
+                CandidateChunk.section.in_(wanted),
+            )
+        )
+    ).all()
+    models = [provider.model_name for provider in providers]
+    existing_by_key: dict[tuple[int, str, str], dict[str, Any]] = {}
+    for row in existing:
+        existing_by_key.setdefault(
+            (row.candidate_id, row.section, row.source_key), {}
+        )[row.embedding_model] = row
+
+    if "work_experience" in wanted:
+        work_experiences = (
+            await db.execute(
+                select(WorkExperience).where(WorkExperience.candidate_id.in_(candidate_ids))
+            )
+        ).scalars().all()
+        work_experience_ids = [work_experience.id for work_experience in work_experiences]
+        projects_by_work_experience: dict = {}
+        verification_counts: dict = {}
+        if work_experience_ids:
+            projects = (
+                await db.execute(
+                    select(WorkExperienceProjects).where(
+                        WorkExperienceProjects.work_experience_id.in_(work_experience_ids)
+                    )
+                )
+            ).scalars().all()
+            for project in projects:
+                projects_by_work_experience.setdefault(
+                    project.work_experience_id, []
+                ).append(project)
+            verification_counts = dict(
+                (
+                    await db.execute(
+                        select(
+                            WorkExperienceVerification.work_experience_id, func.count()
+                        )
+                        .where(
+                            WorkExperienceVerification.work_experience_id.in_(
+                                work_experience_ids
+                            )
+                        )
+                        .group_by(WorkExperienceVerification.work_experience_id)
+                    )
+                ).all()
+            )
+        for work_experience in work_experiences:
+            add(
+                work_experience.candidate_id,
+                work_experience_chunk(
+                    work_experience,
+                    projects_by_work_experience.get(work_experience.id, []),
+                    verification_counts.get(work_experience.id, 0),
+                ),
+            )
+
+    if "education" in wanted:
+        educations = (
+            await db.execute(
+                select(Education).where(Education.candidate_id.in_(candidate_ids))
+            )
+        ).scalars().all()
+        for education in educations:
+            add(education.candidate_id, education_chunk(education))
+
+    kept_resume_keys = set()
+    resumes_to_read = []
+    if wanted & {"skills", "success_stories", "resume"}:
+        candidates = (
+            await db.execute(
+                select(
+                    Candidate.id,
+                    Candidate.skills,
+                    Candidate.success_stories,
+                    Attachment.file_path.label("s3_resume_key"),
+                )
+                .join(Attachment, Candidate.resume_id == Attachment.id, isouter=True)
+                .where(Candidate.id.in_(candidate_ids))
+            )
+        ).mappings().all()
+    else:
+        candidates = []
+    for candidate in candidates:
+        if "skills" in wanted:
+            add(candidate["id"], skills_chunk(candidate["skills"]))
+        if "success_stories" in wanted:
+            for chunk in success_story_chunks(candidate["success_stories"]):
+                add(candidate["id"], chunk)
+
+        s3_key = candidate["s3_resume_key"]
+        if "resume" not in wanted or not s3_key:
+            continue
+        current = {
+            key
+            for key in existing_by_key
+            if key[0] == candidate["id"]
+            and key[1] == "resume"
+            and key[2].startswith(f"{s3_key}#")
+        }
+        complete = all(
+            model in existing_by_key[key] for key in current for model in models
+        )
+        if current and complete and not force and s3_key not in resume_texts:
+            kept_resume_keys |= current
+        else:
+            resumes_to_read.append((candidate["id"], s3_key))
+
+    missing = [s3_key for _, s3_key in resumes_to_read if s3_key not in resume_texts]
+    if missing:
+        resume_texts.update(await get_resume_texts(db, missing))
+    for candidate_id, s3_key in resumes_to_read:
+        for chunk in resume_chunks(s3_key, resume_texts.get(s3_key) or ""):
+            add(candidate_id, chunk)
+
+    stale_ids = [
+        row.id
+        for key, rows in existing_by_key.items()
+        if key not in desired and key not in kept_resume_keys
+        for row in rows.values()
+    ]
+    if stale_ids:
+        await db.execute(
+            delete(CandidateChunk)
+            .where(CandidateChunk.id.in_(stale_ids))
+            .execution_options(synchronize_session=False)
+        )
+
+    embedded = 0
+    for provider in providers:
+        embedded += await _embed_chunks(db, desired, existing_by_key, provider, force)
+    return embedded
+
+
+async def _embed_chunks(
+    db: AsyncSession,
+    desired: dict[tuple[int, str, str], str],
+    existing_by_key: dict[tuple[int, str, str], dict[str, Any]],
+    provider: EmbeddingProvider,
+    force: bool,
+) -> int:
+    """Embed and upsert the chunks that are missing or stale for `provider`."""
+    changed = []
+    for key, content in desired.items():
+        row = existing_by_key.get(key, {}).get(provider.model_name)
+        hashed = content_hash(content)
+        if not force and row and row.content_hash == hashed:
+            continue
+        changed.append((key, content, hashed))
+    if not changed:
+        return 0
+
+    vectors = await provider.embed_documents([content for _, content, _ in changed])
+    now = datetime.now(timezone.utc)
+    stmt = insert(CandidateChunk).values(
+        [
+            {
+                "candidate_id": candidate_id,
+                "section": section,
+                "source_key": source_key,
+                "content": content,
+                "content_hash": hashed,
+                "embedding": vector,
+                "embedding_model": provider.model_name,
+                "updated_at": now,
+            }
+            for ((candidate_id, section, source_key), content, hashed), vector in zip(
+                changed, vectors
+            )
+        ]
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["candidate_id", "section", "source_key", "embedding_model"],
+            set_={
+                "content": stmt.excluded.content,
+                "content_hash": stmt.excluded.content_hash,
+                "embedding": stmt.excluded.embedding,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+    )
+    return len(changed)
@@ -1,149 +1,555 @@
-from http import client
-import types
-import pdfplumber
-from sqlalchemy import update
-from sqlalchemy.sql.expression import select
-from torch import embedding
-from db.models import Candidate
-from db.models import Attachment
+import hashlib
 import json
-from sentence_transformers import SentenceTransformer
-from db.session import SessionLocal
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+
 import boto3
 from botocore.exceptions import BotoCoreError, ClientError
+from pgvector.sqlalchemy import BIT
+from sqlalchemy import and_, case, cast, delete, func, null, or_, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.expression import select
+
+from db.models import (
+    COMPACT_EMBEDDING_DIMENSION,
+    EMBEDDING_BITS,
+    PROFILE_SECTION,
+    Attachment,
+    Candidate,
+    CandidateEmbedding,
+    EmbeddingJob,
+)
+from db.session import SessionLocal
+from helpers.resume_text import get_resume_texts
+from helpers.search import candidate_search_vector
+from tasks.candidate_chunks import sync_candidate_chunks
+from tasks.embedding_versions import (
+    EmbeddingVersions,
+    VersionRef,
+    get_embedding_versions,
+    lock_embedding_versions,
+)
 from util.app_config import config
-import os
-import io
-from google import genai
-from google.genai import types
+from util.embeddings import compact_vector
+
+logger = logging.getLogger(__name__)
+
+# Bump when format_candidate_document changes so stored hashes go stale.
+CANDIDATE_DOCUMENT_VERSION = 1
+
+
+class CandidateDocument(NamedTuple):
+    text: str
+    input_hash: str
+    s3_resume_key: str | None
+    resume_text: str | None
+    # Models whose stored vector for this candidate is out of date.
+    stale_models: frozenset[str]
 
 
-async def embed_candidates_data(candidate_id: int):
+def get_task_s3_client():
     """
-    Background task to fetch candidate data, download resume from S3,
-    extract text, generate embedding, and update the database.
+    Create an S3 client for background work, separate from FastAPI's
+    request lifecycle (see util.s3.get_s3_client for the request version).
     """
-    
-    # --- Initialize S3 client within the task ---
-    # We need a client instance here, separate from FastAPI's request lifecycle.
-    s3_client = None
-    print ("starting background task")
     try:
-        aws_region = getattr(config, 'AWS_REGION')
+        aws_region = getattr(config, "AWS_REGION")
         if aws_region:
-            s3_client = boto3.client('s3', region_name=aws_region)
-        else:
-            # Rely on default config or IAM role
-            s3_client = boto3.client('s3')
-        
-        bucket_name = getattr(config, 'AWS_S3_BUCKET_NAME')
-        if not bucket_name:
-             pass 
-
+            return boto3.client("s3", region_name=aws_region)
+        # Rely on default config or IAM role
+        return boto3.client("s3")
     except (BotoCoreError, ClientError, Exception) as e:
         raise ValueError(f"Failed to create S3 client: {e}")
 
-    async with SessionLocal() as db:
-        try:
-            # Query candidate and resume data (resume_path is now the S3 key)
-            query = await db.execute(
-                select(
-                    # ... (select all your Candidate fields) ...
-                    Candidate.id,
-                    Candidate.first_name,
-                    Candidate.last_name,
-                    Candidate.email,
-                    Candidate.phone_number,
-                    Candidate.address,
-                    Candidate.date_of_birth,
-                    Candidate.years_of_experience,
-                    Candidate.job_title,
-                    Attachment.file_path.label("s3_resume_key"), # Renamed label for clarity
-                )
-                .join(Attachment, Candidate.resume_id == Attachment.id, isouter=True)
-                .where(Candidate.id == candidate_id)
+
+def _merge_sections(current, incoming):
+    """SQL for the union of two job section lists, where NULL means all."""
+    return case(
+        (or_(current.is_(None), incoming.is_(None)), null()),
+        (current.contains(incoming), current),
+        else_=current.op("||")(incoming),
+    )
+
+
+async def enqueue_candidate_embedding(
+    db: AsyncSession,
+    candidate_id: int,
+    sections: list[str] | None = None,
+    delay_seconds: float = 0.0,
+) -> None:
+    """
+    Queue a candidate for embedding in the caller's transaction, so the job
+    is committed (or rolled back) together with the change that triggered
+    it. If the candidate already has a pending job the two are merged: the
+    sections are combined (None meaning everything) and the job runs at the
+    later of the two times, but never more than EMBEDDING_DEBOUNCE_MAX_SECONDS
+    after the first event so a steady stream of edits cannot starve it.
+    """
+    now = datetime.now(timezone.utc)
+    stmt = pg_insert(EmbeddingJob).values(
+        candidate_id=candidate_id,
+        status="pending",
+        attempts=0,
+        sections=sections,
+        run_after=now + timedelta(seconds=delay_seconds),
+        created_at=now,
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["candidate_id"],
+            index_where=text("status = 'pending'"),
+            set_={
+                "sections": _merge_sections(EmbeddingJob.sections, stmt.excluded.sections),
+                "run_after": func.least(
+                    func.greatest(EmbeddingJob.run_after, stmt.excluded.run_after),
+                    EmbeddingJob.created_at
+                    + timedelta(seconds=config.EMBEDDING_DEBOUNCE_MAX_SECONDS),
+                ),
+            },
+        )
+    )
+
+
+async def candidate_changed(
+    db: AsyncSession, candidate_id: int, sections: list[str] | None = None
+) -> None:
+    """
+    Record that a candidate's profile changed. Events are debounced per
+    candidate for EMBEDDING_DEBOUNCE_SECONDS, so a burst of saves results in
+    a single re-embedding that only refreshes the `sections` touched.
+    """
+    await enqueue_candidate_embedding(
+        db, candidate_id, sections, delay_seconds=config.EMBEDDING_DEBOUNCE_SECONDS
+    )
+
+
+def format_candidate_document(candidate: dict, resume_text: str | None) -> str:
+    """Render the text that is sent to the embedding model for a candidate."""
+    if resume_text is None:
+        resume_text = (
+            "Error: Failed to process resume PDF content."
+            if candidate.get("s3_resume_key")
+            else "No resume file associated."
+        )
+    candidate_details_list = []
+    for key, value in candidate.items():
+        if key == "s3_resume_key":
+            continue
+        formatted_value = value
+        if isinstance(value, str) and key in ["address", "skills"]:
+            # Pretty-print JSON-like strings, otherwise use as is
+            try:
+                formatted_value = json.dumps(json.loads(value), indent=2)
+            except json.JSONDecodeError:
+                formatted_value = value
+        candidate_details_list.append(f"{key.replace('_', ' ').title()}: {formatted_value}")
+
+    candidate_details_list.append(f"Resume Text: {resume_text}")
+    return "\n".join(candidate_details_list)
+
+
+def embedding_input_hash(candidate: dict) -> str:
+    """
+    Stable hash of everything that feeds a candidate's embedding. The resume
+    is represented by its S3 key: uploads get a fresh key, so the key changes
+    whenever the resume does and we never need to download it to compare.
+    """
+    canonical = json.dumps(
+        {"version": CANDIDATE_DOCUMENT_VERSION, **candidate},
+        sort_keys=True,
+        default=str,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+async def load_candidate_documents(
+    db: AsyncSession,
+    candidate_ids: list[int],
+    versions: EmbeddingVersions,
+    force: bool = False,
+) -> dict[int, CandidateDocument]:
+    """
+    Build the embedding input for each candidate whose stored embedding is
+    out of date for any of `versions`. A version is up to date when it has
+    a profile vector whose input hash matches; such candidates are skipped
+    unless `force` is set. Resume text comes from the attachment text
+    store, so embedding never downloads or parses the PDF again.
+    """
+    query = await db.execute(
+        select(
+            Candidate.id,
+            Candidate.first_name,
+            Candidate.last_name,
+            Candidate.email,
+            Candidate.phone_number,
+            Candidate.address,
+            Candidate.date_of_birth,
+            Candidate.years_of_experience,
+            Candidate.job_title,
+            Attachment.file_path.label("s3_resume_key"),
+        )
+        .join(Attachment, Candidate.resume_id == Attachment.id, isouter=True)
+        .where(Candidate.id.in_(candidate_ids))
+    )
+    models = [versions.active.model, *(version.model for version in versions.backfilling)]
+    stored = await db.execute(
+        select(
+            CandidateEmbedding.candidate_id,
+            CandidateEmbedding.model,
+            CandidateEmbedding.input_hash,
+        ).where(
+            CandidateEmbedding.candidate_id.in_(candidate_ids),
+            CandidateEmbedding.model.in_(models),
+            CandidateEmbedding.section == PROFILE_SECTION,
+        )
+    )
+    stored_hashes = {(row.candidate_id, row.model): row.input_hash for row in stored}
+
+    rows = []
+    for row in query.mappings().all():
+        candidate = dict(row)
+        input_hash = embedding_input_hash(candidate)
+        stale_models = frozenset(
+            model
+            for model in models
+            if force or stored_hashes.get((candidate["id"], model)) != input_hash
+        )
+        if stale_models:
+            rows.append((candidate, input_hash, stale_models))
+    if not rows:
+        return {}
+
+    resume_texts = await get_resume_texts(
+        db,
+        [
+            candidate["s3_resume_key"]
+            for candidate, _, _ in rows
+            if candidate["s3_resume_key"]
+        ],
+    )
+    documents = {}
+    for candidate, input_hash, stale_models in rows:
+        resume_text = resume_texts.get(candidate["s3_resume_key"])
+        if candidate["s3_resume_key"] and resume_text is None:
+            # Embedded with a placeholder for now. A blank hash never
+            # matches, so the candidate's next job retries the resume.
+            input_hash = ""
+        documents[candidate["id"]] = CandidateDocument(
+            format_candidate_document(candidate, resume_text),
+            input_hash,
+            candidate["s3_resume_key"],
+            resume_text,
+            stale_models,
+        )
+    return documents
+
+
+async def write_embeddings(
+    db: AsyncSession,
+    documents: dict[int, CandidateDocument],
+    version: VersionRef,
+) -> int:
+    """
+    Embed the documents that are stale for `version` in one batch and
+    upsert their profile vectors, with the compact and binary tiers
+    derived from them. Returns the number of vectors written.
+    """
+    ids = [
+        candidate_id
+        for candidate_id, document in documents.items()
+        if version.model in document.stale_models
+    ]
+    if not ids:
+        return 0
+    vectors = await version.get_provider().embed_documents(
+        [documents[candidate_id].text for candidate_id in ids]
+    )
+    now = datetime.now(timezone.utc)
+    stmt = pg_insert(CandidateEmbedding).values(
+        [
+            {
+                "candidate_id": candidate_id,
+                "model": version.model,
+                "section": PROFILE_SECTION,
+                "embedding": vector,
+                "embedding_compact": compact_vector(vector, COMPACT_EMBEDDING_DIMENSION),
+                "input_hash": documents[candidate_id].input_hash,
+                "updated_at": now,
+            }
+            for candidate_id, vector in zip(ids, vectors)
+        ]
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["candidate_id", "model", "section"],
+            set_={
+                "embedding": stmt.excluded.embedding,
+                "embedding_compact": stmt.excluded.embedding_compact,
+                "input_hash": stmt.excluded.input_hash,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+    )
+    # Quantized in SQL so stored bits always match binary_quantize() as
+    # applied to query vectors at search time.
+    await db.execute(
+        update(CandidateEmbedding)
+        .where(
+            CandidateEmbedding.candidate_id.in_(ids),
+            CandidateEmbedding.model == version.model,
+            CandidateEmbedding.section == PROFILE_SECTION,
+        )
+        .values(
+            embedding_binary=cast(
+                func.binary_quantize(CandidateEmbedding.embedding), BIT(EMBEDDING_BITS)
             )
-            result = query.mappings().one_or_none() # Use mappings() for dict-like access
-
-            if result is None:
-                 return 
-            
-            s3_key = result.get("s3_resume_key") # Use .get() for safety
-
-            if not s3_key:
-                # Decide action: maybe embed without resume text, or just mark as failed?
-                # For now, let's try embedding without resume text
-                resume_text = "No resume file associated."
-                # Or raise an error if resume is mandatory:
-                # raise ValueError("Resume S3 key is missing for candidate.")
-            elif not s3_client or not bucket_name:
-                # Decide action: Embed without resume? Mark as failed?
-                resume_text = "Error: Could not access resume file storage."
-                # Or raise an error:
-                # raise ConnectionError("S3 client/config not available to download resume.")
-            else:
-                 # --- Download Resume from S3 ---
-                try:
-                    s3_response = s3_client.get_object(Bucket=bucket_name, Key=s3_key)
-                    # Read the PDF content into memory
-                    pdf_content_bytes = s3_response['Body'].read()
-                    # Create an in-memory file-like object
-                    pdf_file_like_object = io.BytesIO(pdf_content_bytes)
-                    
-                    # --- Extract resume text using pdfplumber ---
-                    # pdfplumber can open file-like objects
-                    with pdfplumber.open(pdf_file_like_object) as pdf:
-                        resume_text = "\n\n".join(page.extract_text() or "" for page in pdf.pages) # Handle None from extract_text
-
-                except ClientError as e:
-                    # Decide action: embed without resume, mark as error?
-                    resume_text = f"Error: Could not download or process resume file from storage ({e})."
-                    # Or re-raise or handle specific codes like NoSuchKey
-                    # if e.response['Error']['Code'] == 'NoSuchKey': ...
-                except Exception:
-                     resume_text = "Error: Failed to process resume PDF content."
-
-
-            candidate_details_list = []
-            for key, value in result.items():
-                 if key != "s3_resume_key": # Exclude the key itself
-                     # Handle potential JSON fields if they are still strings
-                     try:
-                         if isinstance(value, str) and key in ['address', 'work_experience', 'education', 'skills', 'certifications']:
-                              # Attempt to pretty-print if it's JSON-like string, otherwise use as is
-                              try: 
-                                   parsed_json = json.loads(value)
-                                   formatted_value = json.dumps(parsed_json, indent=2)
-                              except json.JSONDecodeError:
-                                   formatted_value = value # Use original string if not valid JSON
-                         else:
-                              formatted_value = value
-                         candidate_details_list.append(f"{key.replace('_', ' ').title()}: {formatted_value}")
-                     except Exception:
-                         candidate_details_list.append(f"{key.replace('_', ' ').title()}: {value}") # Fallback
-
-            candidate_details_list.append(f"Resume Text: {resume_text}")
-            candidate_details = "\n".join(candidate_details_list)
-            
-            client = genai.Client(api_key= config.GEMINI_API_KEY)
-            embedding_vector = client.models.embed_content(
-                model="gemini-embedding-exp-03-07",
-                contents=[candidate_details],
-                config= types.EmbedContentConfig(task_type="SEMANTIC_SIMILARITY")
-            ).embeddings
-            embedding_values = embedding_vector[0].values # type: ignore
-
-            # --- Update the candidate record with the embedding ---
-            stmt = (
-                update(Candidate)
-                .where(Candidate.id == candidate_id)
-                .values(embedding=embedding_values, is_embedding_ready=True) 
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return len(ids)
+
+
+async def embed_candidates(
+    db: AsyncSession,
+    candidate_ids: list[int],
+    force: bool = False,
+    sections: frozenset[str] | None = None,
+) -> int:
+    """
+    Embed the given candidates with the active embedding version and with
+    any version being backfilled, upserting their profile vectors into
+    candidate_embeddings, and bring per-section chunks up to date for the
+    same versions. Candidates whose embedding input is unchanged are
+    skipped. With `sections`, only those chunk sections are refreshed. The
+    caller owns the transaction and must commit. Returns the number of
+    candidates re-embedded with the active version.
+    """
+    await lock_embedding_versions(db)
+    versions = await get_embedding_versions(db)
+    # Chunks are dual-written like profile vectors, so chunk search keeps
+    # working right after a cutover.
+    providers = [
+        version.get_provider() for version in (versions.active, *versions.backfilling)
+    ]
+    if sections is not None:
+        # Section edits never touch the profile document, only its chunks.
+        await sync_candidate_chunks(db, candidate_ids, providers, force=force, sections=sections)
+        await refresh_search_vectors(db, candidate_ids)
+        return 0
+
+    documents = await load_candidate_documents(db, candidate_ids, versions, force)
+    # Chunks cover sections (work experience, education, ...) that are not
+    # part of the profile hash, so they are synced even when the profile is
+    # unchanged. Resume text extracted above is reused instead of re-read.
+    await sync_candidate_chunks(
+        db,
+        candidate_ids,
+        providers,
+        resume_texts={
+            document.s3_resume_key: document.resume_text
+            for document in documents.values()
+            if document.resume_text is not None
+        },
+        force=force,
+    )
+    await refresh_search_vectors(db, candidate_ids)
+    if not documents:
+        return 0
+
+    for version in versions.backfilling:
+        await write_embeddings(db, documents, version)
+    return await write_embeddings(db, documents, versions.active)
+
+
+async def refresh_search_vectors(db: AsyncSession, candidate_ids: list[int]) -> None:
+    """
+    Recompute the full-text search document of the given candidates. Runs
+    after the chunk sync because the resume part is read from the chunks.
+    Rows whose document is unchanged are not rewritten.
+    """
+    search_vector = candidate_search_vector()
+    await db.execute(
+        update(Candidate)
+        .where(
+            Candidate.id.in_(candidate_ids),
+            Candidate.search_vector.is_distinct_from(search_vector),
+        )
+        .values(search_vector=search_vector)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def claim_embedding_jobs(db: AsyncSession, batch_size: int) -> list:
+    """
+    Claim up to `batch_size` jobs with SELECT ... FOR UPDATE SKIP LOCKED so
+    several workers can drain the queue without stepping on each other.
+    Jobs left in `processing` by a crashed worker are reclaimed once their
+    lease expires, unless they are out of attempts: a job that keeps
+    crashing its worker is parked as failed instead.
+    """
+    now = datetime.now(timezone.utc)
+    lease_expired = now - timedelta(seconds=config.EMBEDDING_JOB_LEASE_SECONDS)
+    await db.execute(
+        update(EmbeddingJob)
+        .where(
+            EmbeddingJob.status == "processing",
+            EmbeddingJob.locked_at < lease_expired,
+            EmbeddingJob.attempts >= config.EMBEDDING_JOB_MAX_ATTEMPTS,
+        )
+        .values(
+            status="failed",
+            locked_at=None,
+            last_error="Lease expired on the last attempt",
+        )
+        .execution_options(synchronize_session=False)
+    )
+    claimable = (
+        select(EmbeddingJob.id)
+        .where(
+            or_(
+                and_(EmbeddingJob.status == "pending", EmbeddingJob.run_after <= now),
+                and_(
+                    EmbeddingJob.status == "processing",
+                    EmbeddingJob.locked_at < lease_expired,
+                    EmbeddingJob.attempts < config.EMBEDDING_JOB_MAX_ATTEMPTS,
+                ),
             )
-            await db.execute(stmt)
-            await db.commit()
+        )
+        .order_by(EmbeddingJob.run_after, EmbeddingJob.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        update(EmbeddingJob)
+        .where(EmbeddingJob.id.in_(claimable))
+        .values(status="processing", locked_at=now, attempts=EmbeddingJob.attempts + 1)
+        .returning(EmbeddingJob.id, EmbeddingJob.candidate_id, EmbeddingJob.sections)
+        .execution_options(synchronize_session=False)
+    )
+    jobs = result.all()
+    await db.commit()
+    return jobs
 
+
+async def release_embedding_jobs(db: AsyncSession, job_ids: list[int], error: str) -> None:
+    """
+    Return failed jobs to the queue, or park them once out of attempts. A
+    job whose candidate got a new pending job meanwhile is folded into it.
+    """
+    failed = aliased(EmbeddingJob)
+    folded = await db.execute(
+        update(EmbeddingJob)
+        .where(
+            EmbeddingJob.status == "pending",
+            EmbeddingJob.candidate_id == failed.candidate_id,
+            failed.id.in_(job_ids),
+        )
+        .values(sections=_merge_sections(EmbeddingJob.sections, failed.sections))
+        .returning(failed.id)
+        .execution_options(synchronize_session=False)
+    )
+    folded_ids = list(folded.scalars().all())
+    if folded_ids:
+        await db.execute(
+            delete(EmbeddingJob)
+            .where(EmbeddingJob.id.in_(folded_ids))
+            .execution_options(synchronize_session=False)
+        )
+    await db.execute(
+        update(EmbeddingJob)
+        .where(EmbeddingJob.id.in_(job_ids))
+        .values(
+            status=case(
+                (EmbeddingJob.attempts >= config.EMBEDDING_JOB_MAX_ATTEMPTS, "failed"),
+                else_="pending",
+            ),
+            locked_at=None,
+            last_error=error[:1000],
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+def group_jobs_by_sections(jobs) -> dict[frozenset[str] | None, list[int]]:
+    """
+    Group claimed jobs into embed_candidates calls. A candidate with any
+    full (sections = NULL) job is refreshed fully; the rest are grouped by
+    the union of the sections their jobs touched.
+    """
+    sections_by_candidate: dict[int, set[str] | None] = {}
+    for job in jobs:
+        if job.sections is None:
+            sections_by_candidate[job.candidate_id] = None
+        elif job.candidate_id not in sections_by_candidate:
+            sections_by_candidate[job.candidate_id] = set(job.sections)
+        elif sections_by_candidate[job.candidate_id] is not None:
+            sections_by_candidate[job.candidate_id] |= set(job.sections)
+
+    groups: dict[frozenset[str] | None, list[int]] = {}
+    for candidate_id, sections in sorted(sections_by_candidate.items()):
+        key = None if sections is None else frozenset(sections)
+        groups.setdefault(key, []).append(candidate_id)
+    return groups
+
+
+async def run_embedding_jobs(db: AsyncSession, jobs) -> int:
+    """
+    Embed the candidates of `jobs` and delete the jobs in the same
+    transaction as the vector update. Returns the number of candidates
+    re-embedded.
+    """
+    embedded = 0
+    for sections, candidate_ids in group_jobs_by_sections(jobs).items():
+        embedded += await embed_candidates(db, candidate_ids, sections=sections)
+    await db.execute(
+        delete(EmbeddingJob)
+        .where(EmbeddingJob.id.in_([job.id for job in jobs]))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return embedded
+
+
+async def process_embedding_jobs(batch_size: int | None = None) -> int:
+    """
+    Claim one batch of due embedding jobs and embed the candidates with
+    batched requests (restricted to the sections the jobs name). If the
+    batch fails, each candidate is retried on its own so one bad document
+    only sends its own jobs back to the queue. Returns the number of jobs
+    claimed.
+    """
+    batch_size = batch_size or config.EMBEDDING_BATCH_SIZE
+    async with SessionLocal() as db:
+        jobs = await claim_embedding_jobs(db, batch_size)
+        if not jobs:
+            return 0
+
+        try:
+            embedded = await run_embedding_jobs(db, jobs)
         except Exception as e:
-            print(f"Error processing candidate {candidate_id}: {e}")
-            
             await db.rollback()
+            logger.exception("Embedding batch of %d jobs failed", len(jobs))
+            jobs_by_candidate: dict[int, list] = {}
+            for job in jobs:
+                jobs_by_candidate.setdefault(job.candidate_id, []).append(job)
+            if len(jobs_by_candidate) == 1:
+                await release_embedding_jobs(db, [job.id for job in jobs], str(e))
+                return len(jobs)
+            embedded = 0
+            for candidate_id, candidate_jobs in jobs_by_candidate.items():
+                try:
+                    embedded += await run_embedding_jobs(db, candidate_jobs)
+                except Exception as e:
+                    await db.rollback()
+                    logger.exception("Embedding candidate %d failed", candidate_id)
+                    await release_embedding_jobs(
+                        db, [job.id for job in candidate_jobs], str(e)
+                    )
 
+        logger.info("Embedded %d candidates from %d jobs", embedded, len(jobs))
+        return len(jobs)
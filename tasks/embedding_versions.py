@@ -0,0 +1,269 @@
+"""
+Move the candidate index to a new embedding model without a search outage:
+
+    python -m tasks.embedding_versions start gemini gemini-embedding-001
+    python -m tasks.backfill_embeddings --name gemini-embedding-001
+    python -m tasks.embedding_versions status
+    python -m tasks.embedding_versions cutover gemini-embedding-001
+
+While a version is backfilling every embedding write also stores its vector
+in candidate_embeddings, and its section chunks in candidate_chunks, next to
+the active ones; searches stay pinned to the active version until the
+cutover switches them in a single transaction.
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from sqlalchemy import delete, exists, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from db.models import (
+    PROFILE_SECTION,
+    Candidate,
+    CandidateChunk,
+    CandidateEmbedding,
+    EmbeddingJob,
+    EmbeddingVersion,
+)
+from db.session import SessionLocal
+from util.app_config import config
+from util.embeddings import EmbeddingProvider, get_embedding_provider
+
+logger = logging.getLogger(__name__)
+
+# Embedding writes hold this advisory lock shared and the cutover holds it
+# exclusively, so no batch can write old-model vectors after the swap.
+EMBEDDING_CUTOVER_LOCK = 0x656D6276
+
+
+class VersionRef(NamedTuple):
+    model: str
+    provider: str
+
+    def get_provider(self) -> EmbeddingProvider:
+        return get_embedding_provider(self.provider, self.model)
+
+
+class EmbeddingVersions(NamedTuple):
+    active: VersionRef
+    backfilling: list[VersionRef]
+
+
+async def get_embedding_versions(db: AsyncSession) -> EmbeddingVersions:
+    """
+    Return the version searches are pinned to and the versions being
+    dual-written. Without any registered version the configured model is
+    treated as active.
+    """
+    result = await db.execute(
+        select(EmbeddingVersion.model, EmbeddingVersion.provider, EmbeddingVersion.status)
+        .where(EmbeddingVersion.status.in_(["active", "backfilling"]))
+        .order_by(EmbeddingVersion.created_at)
+    )
+    active = VersionRef(config.EMBEDDING_MODEL, config.EMBEDDING_PROVIDER)
+    backfilling = []
+    for row in result.all():
+        if row.status == "active":
+            active = VersionRef(row.model, row.provider)
+        else:
+            backfilling.append(VersionRef(row.model, row.provider))
+    return EmbeddingVersions(active, backfilling)
+
+
+async def lock_embedding_versions(db: AsyncSession, exclusive: bool = False) -> None:
+    """Hold the cutover lock until the current transaction ends."""
+    function = "pg_advisory_xact_lock" if exclusive else "pg_advisory_xact_lock_shared"
+    await db.execute(text(f"SELECT {function}(:key)"), {"key": EMBEDDING_CUTOVER_LOCK})
+
+
+async def start_version(provider: str, model: str) -> None:
+    async with SessionLocal() as db:
+        version = await db.get(EmbeddingVersion, model)
+        if version is not None and version.status != "retired":
+            raise SystemExit(f"{model} is already {version.status}")
+        if version is None:
+            db.add(EmbeddingVersion(model=model, provider=provider, status="backfilling"))
+        else:
+            version.provider = provider
+            version.status = "backfilling"
+        await db.commit()
+    logger.info("Dual-writing %s; run tasks.backfill_embeddings to fill it", model)
+
+
+def _has_vector(model: str):
+    return exists().where(
+        CandidateEmbedding.candidate_id == Candidate.id,
+        CandidateEmbedding.model == model,
+        CandidateEmbedding.section == PROFILE_SECTION,
+    )
+
+
+async def _count_vectors(db: AsyncSession, model: str) -> int:
+    return await db.scalar(
+        select(func.count())
+        .select_from(CandidateEmbedding)
+        .where(
+            CandidateEmbedding.model == model,
+            CandidateEmbedding.section == PROFILE_SECTION,
+        )
+    )
+
+
+def _chunks_missing(previous: str, model: str):
+    """Chunks of `previous` that have no `model` counterpart yet."""
+    counterpart = aliased(CandidateChunk)
+    return (
+        select(CandidateChunk.candidate_id)
+        .where(CandidateChunk.embedding_model == previous)
+        .where(
+            ~exists().where(
+                counterpart.candidate_id == CandidateChunk.candidate_id,
+                counterpart.section == CandidateChunk.section,
+                counterpart.source_key == CandidateChunk.source_key,
+                counterpart.embedding_model == model,
+            )
+        )
+    )
+
+
+async def _count_chunks(db: AsyncSession, model: str) -> int:
+    return await db.scalar(
+        select(func.count())
+        .select_from(CandidateChunk)
+        .where(CandidateChunk.embedding_model == model)
+    )
+
+
+async def version_status() -> None:
+    async with SessionLocal() as db:
+        versions = await get_embedding_versions(db)
+        embedded = await _count_vectors(db, versions.active.model)
+        chunks = await _count_chunks(db, versions.active.model)
+        print(
+            f"active:      {versions.active.model} ({versions.active.provider}) "
+            f"{embedded}, {chunks} chunks"
+        )
+        for version in versions.backfilling:
+            covered = await _count_vectors(db, version.model)
+            covered_chunks = await _count_chunks(db, version.model)
+            print(
+                f"backfilling: {version.model} ({version.provider}) "
+                f"{covered}/{embedded}, {covered_chunks}/{chunks} chunks"
+            )
+
+
+async def cutover(model: str, allow_missing: bool = False) -> None:
+    """
+    Make `model` the active version. Its profile vectors and chunks are
+    already stored, so this only switches which model searches read, in
+    one transaction: concurrent searches see either the old or the new
+    vectors, never a mix. Refuses while some candidates still lack a
+    vector or chunk for the new model, unless `allow_missing` is set; those
+    candidates are then queued for embedding. The retired model's vectors
+    and chunks are dropped.
+    """
+    async with SessionLocal() as db:
+        await lock_embedding_versions(db, exclusive=True)
+        version = await db.get(EmbeddingVersion, model, with_for_update=True)
+        if version is None or version.status != "backfilling":
+            raise SystemExit(f"{model} is not being backfilled")
+        previous = (await get_embedding_versions(db)).active.model
+
+        missing = await db.scalar(
+            select(func.count())
+            .select_from(Candidate)
+            .where(_has_vector(previous), ~_has_vector(model))
+        )
+        missing_chunks = await db.scalar(
+            select(func.count()).select_from(_chunks_missing(previous, model).subquery())
+        )
+        if (missing or missing_chunks) and not allow_missing:
+            raise SystemExit(
+                f"{missing} embedded candidates have no {model} vector and "
+                f"{missing_chunks} chunks have no {model} counterpart yet; "
+                "finish the backfill or pass --allow-missing"
+            )
+
+        stale = (
+            select(Candidate.id)
+            .where(~_has_vector(model))
+            .union(_chunks_missing(previous, model))
+            .subquery()
+        )
+        await db.execute(
+            insert(EmbeddingJob)
+            .from_select(["candidate_id"], select(stale.c.id))
+            .on_conflict_do_nothing(
+                index_elements=["candidate_id"],
+                index_where=text("status = 'pending'"),
+            )
+        )
+        await db.execute(
+            update(EmbeddingVersion)
+            .where(EmbeddingVersion.status == "active")
+            .values(status="retired")
+        )
+        version.status = "active"
+        version.activated_at = datetime.now(timezone.utc)
+        await db.execute(
+            delete(CandidateEmbedding).where(CandidateEmbedding.model == previous)
+        )
+        await db.execute(
+            delete(CandidateChunk).where(CandidateChunk.embedding_model == previous)
+        )
+        await db.commit()
+    logger.info("%s is now the active embedding version", model)
+
+
+async def abort(model: str) -> None:
+    """Stop dual-writing `model` and drop its partial vectors and chunks."""
+    async with SessionLocal() as db:
+        version = await db.get(EmbeddingVersion, model)
+        if version is None or version.status != "backfilling":
+            raise SystemExit(f"{model} is not being backfilled")
+        await db.execute(
+            delete(CandidateEmbedding).where(CandidateEmbedding.model == model)
+        )
+        await db.execute(
+            delete(CandidateChunk).where(CandidateChunk.embedding_model == model)
+        )
+        version.status = "retired"
+        await db.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+    start_parser = commands.add_parser("start", help="Start dual-writing a new model")
+    start_parser.add_argument("provider", choices=["gemini", "sentence_transformers"])
+    start_parser.add_argument("model")
+    commands.add_parser("status", help="Show versions and backfill coverage")
+    cutover_parser = commands.add_parser("cutover", help="Make a backfilled model active")
+    cutover_parser.add_argument("model")
+    cutover_parser.add_argument(
+        "--allow-missing",
+        action="store_true",
+        help=(
+            "Cut over even if some candidates have no vector or chunks yet "
+            "(they are re-queued)"
+        ),
+    )
+    abort_parser = commands.add_parser("abort", help="Stop dual-writing a model")
+    abort_parser.add_argument("model")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "start":
+        asyncio.run(start_version(args.provider, args.model))
+    elif args.command == "status":
+        asyncio.run(version_status())
+    elif args.command == "cutover":
+        asyncio.run(cutover(args.model, args.allow_missing))
+    else:
+        asyncio.run(abort(args.model))
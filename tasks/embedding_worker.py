@@ -0,0 +1,43 @@
+"""
+Drains the embedding_jobs queue. Run one or more instances next to the API:
+
+    python -m tasks.embedding_worker
+"""
+
+import asyncio
+import logging
+
+from tasks.candidates import process_embedding_jobs
+from util.app_config import config
+
+logger = logging.getLogger(__name__)
+
+# Ceiling for the delay between retries while the database or the
+# embedding provider keeps failing.
+MAX_ERROR_BACKOFF_SECONDS = 60.0
+
+
+async def run_worker() -> None:
+    logger.info(
+        "Embedding worker started (batch size %d, poll every %ss)",
+        config.EMBEDDING_BATCH_SIZE,
+        config.EMBEDDING_WORKER_POLL_SECONDS,
+    )
+    backoff = config.EMBEDDING_WORKER_POLL_SECONDS
+    while True:
+        try:
+            claimed = await process_embedding_jobs(config.EMBEDDING_BATCH_SIZE)
+        except Exception:
+            logger.exception("Embedding worker iteration failed, retrying in %ss", backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_ERROR_BACKOFF_SECONDS)
+            continue
+        backoff = config.EMBEDDING_WORKER_POLL_SECONDS
+        # Keep draining while there is a backlog, otherwise back off.
+        if claimed < config.EMBEDDING_BATCH_SIZE:
+            await asyncio.sleep(config.EMBEDDING_WORKER_POLL_SECONDS)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_worker())
@@ -0,0 +1,77 @@
+"""
+Drains the resume_parse_jobs queue filled by /upload_resume/async. Run one
+or more instances next to the API:
+
+    python -m tasks.resume_parse_worker
+"""
+
+import asyncio
+import logging
+import time
+
+from db.session import SessionLocal
+from router.cv import (
+    claim_resume_parse_jobs,
+    discard_job_upload,
+    prune_resume_parse_jobs,
+    run_resume_parse_job,
+)
+from tasks.candidates import get_task_s3_client
+from tasks.embedding_worker import MAX_ERROR_BACKOFF_SECONDS
+from util.app_config import config
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs past their retention are deleted at most this often.
+PRUNE_INTERVAL_SECONDS = 300.0
+
+
+async def process_resume_parse_jobs(s3, batch_size: int | None = None) -> int:
+    """
+    Claim one batch of queued jobs and parse them concurrently. Returns
+    the number of jobs claimed.
+    """
+    batch_size = batch_size or config.RESUME_PARSE_BATCH_SIZE
+    async with SessionLocal() as db:
+        jobs, parked_keys = await claim_resume_parse_jobs(db, batch_size)
+    for s3_key in parked_keys:
+        await discard_job_upload(s3, s3_key)
+    # run_resume_parse_job records every failure on its job.
+    await asyncio.gather(*(run_resume_parse_job(job, s3) for job in jobs))
+    if jobs:
+        logger.info("Processed %d resume parse jobs", len(jobs))
+    return len(jobs)
+
+
+async def run_worker() -> None:
+    logger.info(
+        "Resume parse worker started (batch size %d, poll every %ss)",
+        config.RESUME_PARSE_BATCH_SIZE,
+        config.RESUME_PARSE_WORKER_POLL_SECONDS,
+    )
+    s3 = get_task_s3_client()
+    pruned_at = float("-inf")
+    backoff = config.RESUME_PARSE_WORKER_POLL_SECONDS
+    while True:
+        try:
+            if time.monotonic() - pruned_at >= PRUNE_INTERVAL_SECONDS:
+                async with SessionLocal() as db:
+                    pruned = await prune_resume_parse_jobs(db)
+                if pruned:
+                    logger.info("Deleted %d finished resume parse jobs", pruned)
+                pruned_at = time.monotonic()
+            claimed = await process_resume_parse_jobs(s3, config.RESUME_PARSE_BATCH_SIZE)
+        except Exception:
+            logger.exception("Resume parse worker iteration failed, retrying in %ss", backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_ERROR_BACKOFF_SECONDS)
+            continue
+        backoff = config.RESUME_PARSE_WORKER_POLL_SECONDS
+        # Keep draining while there is a backlog, otherwise back off.
+        if claimed < config.RESUME_PARSE_BATCH_SIZE:
+            await asyncio.sleep(config.RESUME_PARSE_WORKER_POLL_SECONDS)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_worker())
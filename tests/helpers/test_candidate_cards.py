@@ -0,0 +1,54 @@
+import re
+
+from sqlalchemy.dialects import postgresql
+
+from db.models import Candidate
+from helpers.candidates import CANDIDATE_PERSONAL_INFO_COLUMNS, candidate_card_query
+from helpers.search import profile_similarity_ranking, trigram_search
+
+
+def _selected_columns(stmt) -> set[str]:
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    select_list = sql.split("\nFROM ", 1)[0]
+    return set(re.findall(r"candidates\.(\w+)", select_list))
+
+
+HEAVY_COLUMNS = {
+    "embedding",
+    "embedding_compact",
+    "embedding_binary",
+    "search_vector",
+    "certifications",
+    "personal_growth",
+    "success_stories",
+    "who_am_i",
+}
+
+
+def test_candidate_card_query_skips_embeddings_and_documents():
+    columns = _selected_columns(candidate_card_query())
+
+    assert columns.isdisjoint(HEAVY_COLUMNS)
+    assert {"first_name", "job_title", "skills", "created_at"} <= columns
+
+
+def test_personal_info_query_skips_embeddings_and_documents():
+    columns = _selected_columns(candidate_card_query(CANDIDATE_PERSONAL_INFO_COLUMNS))
+
+    assert columns.isdisjoint(HEAVY_COLUMNS)
+    assert "address" in columns
+
+
+def test_search_queries_do_not_select_embeddings():
+    condition, similarity = trigram_search("jane")
+    listing = candidate_card_query().add_columns(similarity.label("sort_key")).filter(condition)
+
+    ranking = profile_similarity_ranking([0.1] * 3072, "model", 11, 100)
+    similarity_search = (
+        candidate_card_query()
+        .add_columns(ranking.c.distance.label("sort_key"))
+        .join(ranking, ranking.c.candidate_id == Candidate.id)
+    )
+
+    for stmt in (listing, similarity_search):
+        assert _selected_columns(stmt).isdisjoint(HEAVY_COLUMNS)
@@ -0,0 +1,111 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import and_
+from sqlalchemy.dialects import postgresql
+
+from helpers.search import (
+    _query_embedding_prune,
+    RRF_K,
+    candidate_filter_conditions,
+    reciprocal_rank_fusion,
+    trigram_search,
+)
+from schema.filters import CandidateFilters
+from util.app_config import config
+
+
+def test_reciprocal_rank_fusion_rewards_ids_in_both_rankings():
+    lexical = [1, 2, 3]
+    semantic = [4, 3, 1]
+
+    fused = reciprocal_rank_fusion([lexical, semantic])
+
+    assert [candidate_id for candidate_id, _ in fused] == [1, 3, 4, 2]
+    assert fused[0][1] == 1 / (RRF_K + 1) + 1 / (RRF_K + 3)
+
+
+def test_reciprocal_rank_fusion_single_ranking_keeps_order():
+    fused = reciprocal_rank_fusion([[7, 5, 9]])
+
+    assert [candidate_id for candidate_id, _ in fused] == [7, 5, 9]
+
+
+def test_reciprocal_rank_fusion_empty():
+    assert reciprocal_rank_fusion([[], []]) == []
+
+
+def _filters(**values) -> CandidateFilters:
+    defaults = dict(
+        min_experience=None,
+        max_experience=None,
+        status=None,
+        skills=None,
+        country=None,
+        embedding_ready=None,
+    )
+    return CandidateFilters(**{**defaults, **values})
+
+
+def _compile(conditions):
+    return and_(*conditions).compile(dialect=postgresql.dialect())
+
+
+def test_candidate_filter_conditions_empty():
+    assert candidate_filter_conditions(_filters()) == []
+    assert candidate_filter_conditions(None) == []
+
+
+def test_candidate_filter_conditions_use_indexed_expressions():
+    compiled = _compile(
+        candidate_filter_conditions(
+            _filters(
+                min_experience=3,
+                max_experience=8,
+                status=["applied", "interview"],
+                skills=["Python", "AWS"],
+                country="Morocco",
+                embedding_ready=True,
+            ),
+            model_name="gemini-embedding-001",
+        )
+    )
+
+    sql = str(compiled)
+    assert "candidates.years_of_experience >= %(years_of_experience_1)s" in sql
+    assert "candidates.years_of_experience <= %(years_of_experience_2)s" in sql
+    assert "candidates.status IN (__[POSTCOMPILE_status_1])" in sql
+    assert "candidates.skills @> %(skills_1)s" in sql
+    assert "lower(candidates.address ->> 'country') = %(lower_1)s" in sql
+    assert "EXISTS (SELECT * \nFROM candidate_embeddings" in sql
+    assert "candidate_embeddings.section = %(section_1)s" in sql
+    assert compiled.params["model_1"] == "gemini-embedding-001"
+    assert compiled.params["skills_1"] == {"technical_skills": ["Python", "AWS"]}
+    assert compiled.params["lower_1"] == "morocco"
+
+
+def test_trigram_search_matches_indexed_expressions():
+    condition, _ = trigram_search("jon")
+
+    sql = str(condition.compile(dialect=postgresql.dialect()))
+
+    full_name = "((coalesce(candidates.first_name, '') || ' ') || coalesce(candidates.last_name, ''))"
+    assert f"{full_name} ILIKE" in sql
+    for column in ("email", "phone_number", "job_title"):
+        assert f"candidates.{column} ILIKE" in sql
+        assert f"candidates.{column} %%>" in sql
+
+
+def test_reciprocal_rank_fusion_breaks_ties_by_id():
+    fused = reciprocal_rank_fusion([[9], [4]])
+
+    assert [candidate_id for candidate_id, _ in fused] == [4, 9]
+
+
+def test_query_embedding_prune_uses_cache_ttl(monkeypatch):
+    monkeypatch.setattr(config, "QUERY_EMBEDDING_CACHE_TTL_SECONDS", 3600.0)
+
+    statement = _query_embedding_prune(datetime(2026, 1, 1, 12, tzinfo=timezone.utc))
+
+    compiled = statement.compile(dialect=postgresql.dialect())
+    assert str(compiled).startswith("DELETE FROM query_embeddings WHERE")
+    assert compiled.params["created_at_1"] == datetime(2026, 1, 1, 11, tzinfo=timezone.utc)
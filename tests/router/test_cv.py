@@ -0,0 +1,290 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from db.models import ResumeParseJob
+from router import cv
+from router.cv import _discard_upload, _job_status
+
+
+class FakeS3:
+    def __init__(self):
+        self.deleted = []
+
+    def delete_object(self, Bucket, Key):
+        self.deleted.append((Bucket, Key))
+
+
+async def _finished(result=None, error=None):
+    if error:
+        raise error
+    return result
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_discard_upload_removes_completed_object():
+    s3 = FakeS3()
+    upload = asyncio.create_task(_finished())
+
+    await _discard_upload(upload, s3, "bucket", "resumes/a.pdf")
+
+    assert s3.deleted == [("bucket", "resumes/a.pdf")]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_discard_upload_skips_failed_upload():
+    s3 = FakeS3()
+    upload = asyncio.create_task(_finished(error=HTTPException(status_code=500)))
+
+    await _discard_upload(upload, s3, "bucket", "resumes/a.pdf")
+
+    assert s3.deleted == []
+
+
+def test_job_status_reports_stages_and_result():
+    job_id = uuid.uuid4()
+    job = ResumeParseJob(
+        id=job_id,
+        status="succeeded",
+        filename="cv.pdf",
+        content_type="application/pdf",
+        stage="saved",
+        stages=[
+            {"stage": "text_extracted", "at": "2026-01-01T00:00:00+00:00"},
+            {"stage": "uploaded", "at": "2026-01-01T00:00:01+00:00"},
+        ],
+        result={
+            "file_id": str(job_id),
+            "filename": "cv.pdf",
+            "content_type": "application/pdf",
+            "file_path": "resumes/a.pdf",
+            "cv_data": {"first_name": "Ada"},
+        },
+    )
+
+    status = _job_status(job)
+
+    assert [entry.stage for entry in status.stages] == ["text_extracted", "uploaded"]
+    assert status.result.cv_data == {"first_name": "Ada"}
+    assert status.error is None
+
+
+class FakeSession:
+    async def get(self, model, key):
+        return None
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_parse_resume_failed_upload_skips_the_llm(monkeypatch, tmp_path):
+    resume = tmp_path / "cv.pdf"
+    resume.write_bytes(b"%PDF-1.4")
+    llm_calls = []
+    extracted = asyncio.Event()
+
+    def failing_upload(s3, file_path, bucket_name, key, content_type):
+        raise HTTPException(status_code=500, detail="Could not upload file to storage.")
+
+    async def extract(db, source, content_hash):
+        # Parsing is slower than the failed upload.
+        await asyncio.sleep(0.2)
+        extracted.set()
+
+    async def llm(text):
+        llm_calls.append(text)
+        return "{}"
+
+    monkeypatch.setattr(cv, "_upload_file", failing_upload)
+    monkeypatch.setattr(cv, "extract_resume_text", extract)
+    monkeypatch.setattr(cv, "process_cv_async", llm)
+
+    with pytest.raises(HTTPException) as error:
+        await cv.parse_resume(
+            FakeSession(), FakeS3(), str(resume), "cv.pdf", "application/pdf"
+        )
+
+    assert error.value.detail == "Could not upload file to storage."
+    await asyncio.sleep(0.3)
+    assert not extracted.is_set()
+    assert llm_calls == []
+
+
+class CommittingSession(FakeSession):
+    def __init__(self, fail_commit=False):
+        self.fail_commit = fail_commit
+
+    def add(self, obj):
+        pass
+
+    async def flush(self):
+        pass
+
+    async def execute(self, statement):
+        pass
+
+    async def commit(self):
+        if self.fail_commit:
+            raise RuntimeError("commit failed")
+
+    async def refresh(self, obj):
+        raise RuntimeError("connection lost")
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize("fail_commit", [True, False])
+async def test_parse_resume_removes_upload_only_when_commit_fails(
+    monkeypatch, tmp_path, fail_commit
+):
+    resume = tmp_path / "cv.pdf"
+    resume.write_bytes(b"%PDF-1.4")
+    s3 = FakeS3()
+
+    async def extract(db, source, content_hash):
+        return cv.PdfText("Ada Lovelace", 1, 1)
+
+    async def llm(text):
+        return "{}"
+
+    monkeypatch.setattr(cv, "_upload_file", lambda *args: None)
+    monkeypatch.setattr(cv, "extract_resume_text", extract)
+    monkeypatch.setattr(cv, "process_cv_async", llm)
+
+    with pytest.raises(RuntimeError):
+        await cv.parse_resume(
+            CommittingSession(fail_commit), s3, str(resume), "cv.pdf", "application/pdf"
+        )
+
+    await asyncio.sleep(0.05)
+    assert len(s3.deleted) == (1 if fail_commit else 0)
+
+
+def _job(status="running", stages=()):
+    return ResumeParseJob(
+        id=uuid.uuid4(),
+        status=status,
+        filename="cv.pdf",
+        content_type="application/pdf",
+        stages=list(stages),
+    )
+
+
+async def _events(monkeypatch, jobs):
+    polls = iter(jobs)
+
+    async def load_job(db, job_id):
+        return jobs[0]
+
+    async def poll_job(job_id):
+        return next(polls)
+
+    monkeypatch.setattr(cv, "_load_job", load_job)
+    monkeypatch.setattr(cv, "_poll_job", poll_job)
+    monkeypatch.setattr(cv, "RESUME_PARSE_EVENTS_POLL_SECONDS", 0)
+    response = await cv.stream_resume_parse_job(uuid.uuid4(), db=None)
+    return [event async for event in response.body_iterator]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_job_events_end_with_error_when_job_disappears(monkeypatch):
+    stage = {"stage": "uploaded", "at": "2026-01-01T00:00:00+00:00"}
+
+    events = await _events(monkeypatch, [_job(stages=[stage]), None])
+
+    assert [event["event"] for event in events] == ["stage", "error"]
+    assert "not found" in events[-1]["data"]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_job_events_stop_after_max_duration(monkeypatch):
+    monkeypatch.setattr(cv.config, "RESUME_PARSE_EVENTS_MAX_SECONDS", 0)
+
+    events = await _events(monkeypatch, [_job(), _job()])
+
+    assert [event["event"] for event in events] == ["error"]
+    assert "still running" in events[-1]["data"]
+
+
+class Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def scalars(self):
+        return self
+
+
+class RecordingSession:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+        self.committed = False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self.results.pop(0)
+
+    async def commit(self):
+        self.committed = True
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_claim_resume_parse_jobs_reclaims_jobs_without_heartbeat(monkeypatch):
+    monkeypatch.setattr(cv.config, "RESUME_PARSE_JOB_MAX_ATTEMPTS", 3)
+    job = SimpleNamespace(id=uuid.uuid4(), s3_key="resumes/b.pdf", attempts=1)
+    db = RecordingSession(Result(["resumes/a.pdf", None]), Result([job]))
+
+    jobs, parked_keys = await cv.claim_resume_parse_jobs(db, 4)
+
+    assert jobs == [job]
+    assert parked_keys == ["resumes/a.pdf"]
+    assert db.committed
+    park, claim = (
+        str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        for statement in db.statements
+    )
+    assert "resume_parse_jobs.status = 'running'" in park
+    assert "resume_parse_jobs.attempts >= 3" in park
+    assert "FOR UPDATE SKIP LOCKED" in claim
+    assert "resume_parse_jobs.status = 'queued' OR resume_parse_jobs.status = 'running'" in claim
+    assert "attempts=(resume_parse_jobs.attempts + 1)" in claim
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize(
+    "attached, retry, attempts, status, discarded",
+    [
+        (False, True, 1, "queued", False),
+        (False, True, 3, "failed", True),
+        (False, False, 1, "failed", True),
+        (True, True, 1, "failed", False),
+    ],
+)
+async def test_fail_job_requeues_or_fails(
+    monkeypatch, attached, retry, attempts, status, discarded
+):
+    monkeypatch.setattr(cv.config, "RESUME_PARSE_JOB_MAX_ATTEMPTS", 3)
+    updates, discards = [], []
+
+    async def is_attached(s3_key):
+        return attached
+
+    async def update_job(job_id, **values):
+        updates.append(values)
+
+    async def discard(s3, s3_key):
+        discards.append(s3_key)
+
+    monkeypatch.setattr(cv, "_is_attached", is_attached)
+    monkeypatch.setattr(cv, "_update_job", update_job)
+    monkeypatch.setattr(cv, "discard_job_upload", discard)
+    job = SimpleNamespace(id=uuid.uuid4(), s3_key="resumes/a.pdf", attempts=attempts)
+
+    await cv._fail_job(job, FakeS3(), "boom", retry=retry)
+
+    assert updates == [{"status": status, "error": "boom"}]
+    assert discards == (["resumes/a.pdf"] if discarded else [])
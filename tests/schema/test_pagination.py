@@ -0,0 +1,69 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from schema.pagination import CursorPagination, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip_keeps_exact_values():
+    token = encode_cursor("profile", 0.12345678901234567, 42)
+
+    assert "=" not in token
+    assert decode_cursor(token) == ["profile", 0.12345678901234567, 42]
+
+
+@pytest.mark.parametrize("token", ["not-base64!", encode_cursor("x")[:-2] + "$$", "bnVsbA"])
+def test_decode_cursor_rejects_garbage(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+
+def test_cursor_pagination_after():
+    first_page = CursorPagination(cursor=None, page_size=10)
+    assert first_page.after("created_at", datetime, int) is None
+
+    pagination = CursorPagination(
+        cursor=encode_cursor("created_at", "2026-10-18T10:00:00+00:00", 7), page_size=10
+    )
+    assert pagination.after("created_at", datetime, int) == [
+        datetime(2026, 10, 18, 10, tzinfo=timezone.utc),
+        7,
+    ]
+
+
+def test_cursor_pagination_rejects_cursor_of_other_ordering():
+    pagination = CursorPagination(cursor=encode_cursor("search", 0.5, 7), page_size=10)
+
+    with pytest.raises(HTTPException) as error:
+        pagination.after("created_at", datetime, int)
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "keys",
+    [
+        ("profile", 0.5),
+        ("profile", 0.5, 7, 9),
+        ("profile", "0.5", 7),
+        ("profile", 0.5, 7.0),
+        ("profile", True, 7),
+        ("created_at", 123, 7),
+        ("created_at", "yesterday", 7),
+    ],
+)
+def test_cursor_pagination_rejects_keys_of_wrong_shape(keys):
+    kind, *values = keys
+    pagination = CursorPagination(cursor=encode_cursor(kind, *values), page_size=10)
+    types = (datetime, int) if kind == "created_at" else (float, int)
+
+    with pytest.raises(HTTPException) as error:
+        pagination.after(kind, *types)
+    assert error.value.status_code == 400
+    assert error.value.detail == "Invalid cursor"
+
+
+def test_cursor_pagination_rejects_malformed_cursor():
+    with pytest.raises(HTTPException) as error:
+        CursorPagination(cursor="%%%", page_size=10)
+    assert error.value.status_code == 400
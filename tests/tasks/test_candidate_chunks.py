@@ -0,0 +1,95 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from tasks.candidate_chunks import (
+    RESUME_WINDOW_OVERLAP,
+    RESUME_WINDOW_WORDS,
+    _embed_chunks,
+    content_hash,
+    resume_chunks,
+    skills_chunk,
+    success_story_chunks,
+)
+
+
+def test_resume_chunks_overlap_and_cover_all_words():
+    words = [f"w{i}" for i in range(700)]
+
+    chunks = resume_chunks("resumes/abc.pdf", " ".join(words))
+
+    assert [chunk.source_key for chunk in chunks] == [
+        "resumes/abc.pdf#0",
+        "resumes/abc.pdf#1",
+        "resumes/abc.pdf#2",
+    ]
+    first, second = chunks[0].content.split(), chunks[1].content.split()
+    assert len(first) == RESUME_WINDOW_WORDS
+    assert first[-RESUME_WINDOW_OVERLAP:] == second[:RESUME_WINDOW_OVERLAP]
+    assert chunks[-1].content.split()[-1] == "w699"
+
+
+def test_resume_chunks_short_and_empty_text():
+    assert len(resume_chunks("key", "just a few words")) == 1
+    assert resume_chunks("key", "") == []
+
+
+def test_skills_chunk_lists_languages_with_level():
+    chunk = skills_chunk(
+        {
+            "technical_skills": ["Python", "SQL"],
+            "general_skills": [],
+            "languages": [{"language": "French", "level": "C1"}],
+        }
+    )
+
+    assert chunk.content == "Technical skills: Python, SQL\nLanguages: French (C1)"
+    assert skills_chunk(None) is None
+
+
+def test_success_story_chunks_accept_json_strings():
+    stories = [
+        json.dumps({"id": "s1", "headline": "Cut costs", "results": "-30%"}),
+        {"headline": "Shipped v2", "skills": ["Go"]},
+    ]
+
+    chunks = success_story_chunks(stories)
+
+    assert [chunk.source_key for chunk in chunks] == ["s1", "1"]
+    assert chunks[1].content == "Shipped v2\nSkills: Go"
+
+
+class FakeProvider:
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.embedded = []
+
+    async def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[0.0] for _ in texts]
+
+
+class FakeSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_embed_chunks_fills_only_models_missing_the_chunk():
+    key = (1, "skills", "skills")
+    desired = {key: "Technical skills: Python"}
+    existing = {
+        key: {"old-model": SimpleNamespace(content_hash=content_hash(desired[key]))}
+    }
+    old, new = FakeProvider("old-model"), FakeProvider("new-model")
+    db = FakeSession()
+
+    assert await _embed_chunks(db, desired, existing, old, force=False) == 0
+    assert await _embed_chunks(db, desired, existing, new, force=False) == 1
+    assert new.embedded == ["Technical skills: Python"]
+    (upsert,) = db.statements
+    assert upsert.compile().params["embedding_model_m0"] == "new-model"
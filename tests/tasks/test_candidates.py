@@ -0,0 +1,236 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from tasks import candidates
+from tasks.candidates import (
+    claim_embedding_jobs,
+    embedding_input_hash,
+    enqueue_candidate_embedding,
+    group_jobs_by_sections,
+    load_candidate_documents,
+    refresh_search_vectors,
+    release_embedding_jobs,
+)
+from tasks.embedding_versions import EmbeddingVersions, VersionRef
+
+
+def make_candidate(**overrides):
+    candidate = {
+        "id": 1,
+        "first_name": "Ada",
+        "last_name": "Lovelace",
+        "email": "ada@example.com",
+        "phone_number": None,
+        "address": {"street": "1 Main St", "country": "UK"},
+        "date_of_birth": None,
+        "years_of_experience": 7,
+        "job_title": "Engineer",
+        "s3_resume_key": "resumes/abc.pdf",
+    }
+    candidate.update(overrides)
+    return candidate
+
+
+def test_embedding_input_hash_ignores_key_order():
+    candidate = make_candidate()
+    reordered = dict(reversed(list(candidate.items())))
+
+    assert embedding_input_hash(candidate) == embedding_input_hash(reordered)
+
+
+def test_embedding_input_hash_changes_with_embedded_fields():
+    base = embedding_input_hash(make_candidate())
+
+    assert embedding_input_hash(make_candidate(job_title="Manager")) != base
+    assert embedding_input_hash(make_candidate(s3_resume_key="resumes/new.pdf")) != base
+
+
+class Job:
+    def __init__(self, candidate_id, sections, id=None):
+        self.id = id
+        self.candidate_id = candidate_id
+        self.sections = sections
+
+
+def test_group_jobs_by_sections_merges_per_candidate():
+    jobs = [
+        Job(1, ["work_experience"]),
+        Job(1, ["education"]),
+        Job(2, ["work_experience"]),
+        Job(2, None),
+        Job(3, None),
+        Job(4, ["education", "work_experience"]),
+    ]
+
+    assert group_jobs_by_sections(jobs) == {
+        frozenset({"work_experience", "education"}): [1, 4],
+        None: [2, 3],
+    }
+
+
+class Result:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+
+    def all(self):
+        return self.rows
+
+    def scalars(self):
+        return self
+
+
+class RecordingSession:
+    """Stands in for AsyncSession, returning canned results in order."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.executed = []
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, statement):
+        self.executed.append(statement)
+        self.statements.append(
+            str(
+                statement.compile(
+                    dialect=postgresql.dialect(),
+                    compile_kwargs={"literal_binds": True},
+                )
+            )
+        )
+        return self.results.pop(0) if self.results else Result()
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_claim_embedding_jobs_skips_rows_locked_by_other_workers():
+    jobs = [Job(1, None)]
+    db = RecordingSession(Result(), Result(jobs))
+
+    assert await claim_embedding_jobs(db, batch_size=10) == jobs
+
+    park, claim = db.statements
+    assert "FOR UPDATE SKIP LOCKED" in claim
+    assert "LIMIT 10" in claim
+    assert "SET status='processing'" in claim
+    # Expired leases are only reclaimed while attempts remain.
+    assert "embedding_jobs.attempts < 5" in claim
+    assert park.startswith("UPDATE embedding_jobs SET status='failed'")
+    assert "embedding_jobs.attempts >= 5" in park
+    assert db.commits == 1
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_release_embedding_jobs_folds_failed_jobs_into_pending_ones():
+    db = RecordingSession(Result([7]))
+
+    await release_embedding_jobs(db, [7, 8], "provider unavailable")
+
+    fold, delete_folded, requeue = db.statements
+    assert fold.startswith("UPDATE embedding_jobs SET sections=")
+    assert "embedding_jobs.status = 'pending'" in fold
+    assert "embedding_jobs_1.id IN (7, 8)" in fold
+    assert delete_folded.startswith("DELETE FROM embedding_jobs")
+    assert "IN (7)" in delete_folded
+    assert "IN (7, 8)" in requeue and "'provider unavailable'" in requeue
+    assert db.commits == 1
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_release_embedding_jobs_without_pending_jobs_only_requeues():
+    db = RecordingSession(Result([]))
+
+    await release_embedding_jobs(db, [8], "timeout")
+
+    assert len(db.statements) == 2
+    assert db.statements[1].startswith("UPDATE embedding_jobs SET status=CASE")
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_enqueue_inlines_the_pending_index_predicate():
+    db = RecordingSession()
+
+    await enqueue_candidate_embedding(db, 5, ["education"], delay_seconds=30)
+
+    # A bound parameter here would stop generic plans from matching the
+    # partial unique index.
+    sql = str(db.executed[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (candidate_id) WHERE status = 'pending' DO UPDATE" in sql
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_failed_batch_only_releases_jobs_of_failing_candidates(monkeypatch):
+    jobs = [Job(1, None, id=10), Job(2, None, id=20), Job(3, ["education"], id=30)]
+    released = []
+    sessions = []
+
+    class Session(RecordingSession):
+        async def __aenter__(self):
+            sessions.append(self)
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def rollback(self):
+            pass
+
+    async def claim(db, batch_size):
+        return jobs
+
+    async def embed(db, candidate_ids, sections=None):
+        if 2 in candidate_ids:
+            raise RuntimeError("bad document")
+        return len(candidate_ids)
+
+    async def release(db, job_ids, error):
+        released.append((job_ids, error))
+
+    monkeypatch.setattr(candidates, "SessionLocal", Session)
+    monkeypatch.setattr(candidates, "claim_embedding_jobs", claim)
+    monkeypatch.setattr(candidates, "embed_candidates", embed)
+    monkeypatch.setattr(candidates, "release_embedding_jobs", release)
+
+    assert await candidates.process_embedding_jobs(10) == 3
+
+    assert released == [([20], "bad document")]
+    deleted = [sql for sql in sessions[0].statements if sql.startswith("DELETE")]
+    assert [sql.split("IN ")[-1] for sql in deleted] == ["(10)", "(30)"]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_unreadable_resume_leaves_the_input_hash_blank(monkeypatch):
+    rows = [make_candidate(id=1), make_candidate(id=2, s3_resume_key=None)]
+
+    class Rows(Result):
+        def mappings(self):
+            return self
+
+        def __iter__(self):
+            return iter(self.rows)
+
+    async def no_texts(db, s3_keys):
+        return {}
+
+    monkeypatch.setattr(candidates, "get_resume_texts", no_texts)
+    db = RecordingSession(Rows(rows), Rows([]))
+    versions = EmbeddingVersions(VersionRef("model", "gemini"), [])
+
+    documents = await load_candidate_documents(db, [1, 2], versions)
+
+    assert documents[1].input_hash == ""
+    assert "Failed to process resume" in documents[1].text
+    assert documents[2].input_hash == embedding_input_hash(rows[1])
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_refresh_search_vectors_skips_unchanged_rows():
+    db = RecordingSession()
+
+    await refresh_search_vectors(db, [1, 2])
+
+    (statement,) = db.statements
+    assert statement.startswith("UPDATE candidates SET search_vector=")
+    assert "candidates.search_vector IS DISTINCT FROM" in statement
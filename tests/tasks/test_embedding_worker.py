@@ -0,0 +1,33 @@
+import pytest
+
+from tasks import embedding_worker
+
+
+class Stop(Exception):
+    pass
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_run_worker_survives_failed_iterations(monkeypatch):
+    outcomes = [RuntimeError("db down"), RuntimeError("db down"), 0]
+    sleeps = []
+
+    async def process(batch_size):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+        if not outcomes:
+            raise Stop
+
+    monkeypatch.setattr(embedding_worker, "process_embedding_jobs", process)
+    monkeypatch.setattr(embedding_worker.asyncio, "sleep", sleep)
+    monkeypatch.setattr(embedding_worker.config, "EMBEDDING_WORKER_POLL_SECONDS", 2.0)
+
+    with pytest.raises(Stop):
+        await embedding_worker.run_worker()
+
+    assert sleeps == [2.0, 4.0, 2.0]
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from google.genai import errors as genai_errors
+
+from util.embeddings import (
+    EmbeddingProvider,
+    EmbeddingUnavailableError,
+    RateLimitedEmbeddingProvider,
+    compact_vector,
+    pad_vector,
+)
+
+
+def test_pad_vector_fills_column_width_with_zeros():
+    assert pad_vector([0.6, 0.8], 4) == [0.6, 0.8, 0.0, 0.0]
+
+
+def test_pad_vector_rejects_vectors_wider_than_column():
+    with pytest.raises(ValueError):
+        pad_vector([0.1, 0.2, 0.3], 2)
+
+
+def test_compact_vector_truncates_and_renormalizes():
+    assert compact_vector([3.0, 4.0, 12.0], 2) == pytest.approx([0.6, 0.8])
+
+
+def test_compact_vector_leaves_zero_vector_alone():
+    assert compact_vector([0.0, 0.0, 1.0], 2) == [0.0, 0.0]
+
+
+class CountingProvider(EmbeddingProvider):
+    model_name = "fake"
+    dimension = 2
+    max_batch_size = 100
+
+    def __init__(self, failures=None):
+        self.calls = []
+        self.failures = list(failures or [])
+
+    async def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        if self.failures:
+            raise self.failures.pop(0)
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def make_rate_limited(inner, **overrides):
+    options = dict(
+        requests_per_minute=0,
+        tokens_per_minute=0,
+        max_retries=2,
+        coalesce_window_ms=20,
+    )
+    options.update(overrides)
+    provider = RateLimitedEmbeddingProvider(inner, **options)
+    provider.backoff_base_seconds = 0.001
+    return provider
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_concurrent_queries_are_coalesced_into_one_request():
+    inner = CountingProvider()
+    provider = make_rate_limited(inner)
+
+    results = await asyncio.gather(
+        provider.embed_query("python"),
+        provider.embed_query("golang"),
+        provider.embed_query("python"),
+    )
+
+    assert inner.calls == [["python", "golang"]]
+    assert results[0] == results[2] == [6.0, 1.0]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_rate_limited_requests_are_retried():
+    inner = CountingProvider(failures=[genai_errors.ServerError(503, {})])
+    provider = make_rate_limited(inner)
+
+    assert await provider.embed_documents(["sql"]) == [[3.0, 1.0]]
+    assert len(inner.calls) == 2
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_gives_up_after_max_retries():
+    inner = CountingProvider(
+        failures=[genai_errors.ClientError(429, {}) for _ in range(3)]
+    )
+    provider = make_rate_limited(inner)
+
+    with pytest.raises(EmbeddingUnavailableError):
+        await provider.embed_documents(["sql"])
+    assert len(inner.calls) == 3
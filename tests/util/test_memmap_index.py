@@ -0,0 +1,99 @@
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+from util.memmap_index import MemmapVectorIndex
+
+
+def _index(tmp_path, vectors: dict[int, list[float]]) -> MemmapVectorIndex:
+    index = MemmapVectorIndex(str(tmp_path / "model"), dimension=3)
+    with index.try_lock() as locked:
+        assert locked
+        index.apply(list(vectors), list(vectors.values()))
+    return index
+
+
+def test_search_ranks_by_exact_cosine_distance(tmp_path):
+    index = _index(
+        tmp_path, {1: [1.0, 0.0, 0.0], 2: [0.0, 1.0, 0.0], 3: [1.0, 1.0, 0.0]}
+    )
+
+    ranked = index.search([2.0, 0.1, 0.0], limit=2)
+
+    assert [candidate_id for candidate_id, _ in ranked] == [1, 3]
+    assert ranked[0][1] < ranked[1][1]
+
+
+def test_search_applies_allowed_ids_and_cursor(tmp_path):
+    index = _index(
+        tmp_path,
+        {1: [1.0, 0.0, 0.0], 2: [1.0, 0.0, 0.0], 3: [0.9, 0.1, 0.0], 4: [0.0, 1.0, 0.0]},
+    )
+
+    assert [c for c, _ in index.search([1.0, 0.0, 0.0], 10, allowed=[2, 4])] == [2, 4]
+    assert [c for c, _ in index.search([1.0, 0.0, 0.0], 2, exclude=[1])] == [2, 3]
+    first, second = index.search([1.0, 0.0, 0.0], 2)
+    assert [first[0], second[0]] == [1, 2]
+    rest = index.search([1.0, 0.0, 0.0], 10, after=second[::-1])
+    assert [candidate_id for candidate_id, _ in rest] == [3, 4]
+
+
+def test_apply_updates_in_place_and_tombstones_removed_ids(tmp_path):
+    index = _index(tmp_path, {1: [1.0, 0.0, 0.0], 2: [0.0, 1.0, 0.0]})
+    watermark = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    deleted_watermark = datetime(2026, 1, 2, tzinfo=timezone.utc)
+
+    with index.try_lock():
+        index.apply(
+            [2],
+            [[1.0, 0.0, 0.0]],
+            removed=[1, 99],
+            watermark=watermark,
+            deleted_watermark=deleted_watermark,
+        )
+
+    assert [candidate_id for candidate_id, _ in index.search([1.0, 0.0, 0.0], 10)] == [2]
+    assert index.watermark == watermark
+    assert index.deleted_watermark == deleted_watermark
+
+
+def test_compact_drops_tombstones_without_breaking_readers(tmp_path):
+    index = _index(tmp_path, {i: [1.0, float(i), 0.0] for i in range(1, 9)})
+    reader = MemmapVectorIndex(str(tmp_path / "model"), dimension=3)
+    before = reader.search([1.0, 0.0, 0.0], 10)
+
+    with index.try_lock():
+        index.apply([], [], removed=[1, 2, 3])
+        assert index.needs_compaction
+        index.compact()
+
+    assert not index.needs_compaction
+    assert reader.search([1.0, 0.0, 0.0], 10) == [
+        (candidate_id, distance) for candidate_id, distance in before if candidate_id > 3
+    ]
+    assert sorted(os.listdir(tmp_path / "model")) == [
+        ".lock", "ids.i64.1", "meta.json", "vectors.f16.1"
+    ]
+
+
+def test_clear_empties_the_snapshot(tmp_path):
+    index = _index(tmp_path, {1: [1.0, 0.0, 0.0]})
+
+    with index.try_lock():
+        index.clear()
+
+    assert index.search([1.0, 0.0, 0.0], 10) == []
+    assert index.watermark is None and index.deleted_watermark is None
+
+
+def test_snapshot_is_shared_between_handles(tmp_path):
+    writer = _index(tmp_path, {1: [0.0, 0.0, 1.0]})
+    reader = MemmapVectorIndex(str(tmp_path / "model"), dimension=3)
+    assert reader.search([0.0, 0.0, 1.0], 1) == [(1, 0.0)]
+
+    with writer.try_lock() as locked, reader.try_lock() as reader_locked:
+        assert locked and not reader_locked
+        writer.apply(list(range(2, 2000)), np.ones((1998, 3)))
+
+    assert len(reader.search([1.0, 1.0, 1.0], 5000)) == 1999
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from util.pdf_text import PdfExtractionError, extract_pdf, extract_pdf_text
+
+
+def make_pdf(pages: list[str]) -> bytes:
+    """Minimal PDF with one line of Helvetica text per page."""
+    count = len(pages)
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(count))
+    font = 3 + 2 * count
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {count} >>",
+    ]
+    for i, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> /Contents {4 + 2 * i} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+    return out
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_extract_pdf_text_stops_at_page_cap():
+    pdf = make_pdf(["First page", "Second page", "Third page"])
+
+    extracted = await extract_pdf(pdf, max_pages=2)
+
+    assert "First page" in extracted.text
+    assert "Second page" in extracted.text
+    assert "Third page" not in extracted.text
+    assert (extracted.page_count, extracted.pages_extracted) == (3, 2)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_extract_pdf_text_reads_files_by_path(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(make_pdf(["Ada Lovelace"]))
+
+    assert "Ada Lovelace" in await extract_pdf_text(str(path))
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_extract_pdf_text_rejects_invalid_documents():
+    with pytest.raises(PdfExtractionError):
+        await extract_pdf_text(b"not a pdf")
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_extract_pdf_timeout_only_fails_its_own_extraction():
+    slow, other = await asyncio.gather(
+        extract_pdf_text(make_pdf(["Slow"]), timeout=0.001),
+        extract_pdf_text(make_pdf(["Other request"])),
+        return_exceptions=True,
+    )
+
+    assert isinstance(slow, PdfExtractionError)
+    assert "Other request" in other
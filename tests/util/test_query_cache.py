@@ -0,0 +1,64 @@
+from util.query_cache import QueryEmbeddingCache, SimilarCandidatesCache, normalize_query
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_normalize_query_ignores_case_and_whitespace():
+    assert normalize_query("  Senior   Python\tDeveloper ") == "senior python developer"
+
+
+def test_cache_hits_normalized_query_per_model():
+    cache = QueryEmbeddingCache(max_entries=10, ttl_seconds=60)
+    cache.put("model-a", "Senior Python developer", [0.1, 0.2])
+
+    assert cache.get("model-a", "senior  python developer") == [0.1, 0.2]
+    assert cache.get("model-b", "senior python developer") is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache = QueryEmbeddingCache(max_entries=2, ttl_seconds=60)
+    cache.put("m", "a", [1.0])
+    cache.put("m", "b", [2.0])
+    cache.get("m", "a")
+    cache.put("m", "c", [3.0])
+
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") == [1.0]
+    assert cache.evictions == 1
+
+
+def test_cache_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = QueryEmbeddingCache(max_entries=2, ttl_seconds=60, clock=clock)
+    cache.put("m", "a", [1.0])
+
+    clock.now = 59.0
+    assert cache.get("m", "a") == [1.0]
+    clock.now = 60.0
+    assert cache.get("m", "a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_similar_cache_drops_entries_when_source_vector_changes():
+    cache = SimilarCandidatesCache(max_entries=10, ttl_seconds=60)
+    cache.put((1, "m", None), "v1", ([2, 3], None))
+
+    assert cache.get((1, "m", None), "v1") == ([2, 3], None)
+    assert cache.get((1, "m", None), "v2") is None
+    assert cache.get((1, "m", None), "v1") is None
+
+
+def test_similar_cache_entries_expire():
+    clock = FakeClock()
+    cache = SimilarCandidatesCache(max_entries=10, ttl_seconds=60, clock=clock)
+    cache.put((1,), "v1", ([2], None))
+    clock.now = 61
+
+    assert cache.get((1,), "v1") is None
+    assert (cache.hits, cache.misses) == (0, 1)
@@ -0,0 +1,27 @@
+import time
+
+import pytest
+
+from util.rate_limit import TokenBucket
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_token_bucket_waits_for_refill_once_drained():
+    bucket = TokenBucket(rate_per_minute=600)  # 10 tokens per second
+    await bucket.acquire(600)
+
+    started = time.monotonic()
+    await bucket.acquire(2)
+
+    assert time.monotonic() - started >= 0.15
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_token_bucket_with_zero_rate_is_unlimited():
+    bucket = TokenBucket(rate_per_minute=0)
+
+    started = time.monotonic()
+    for _ in range(1000):
+        await bucket.acquire(50)
+
+    assert time.monotonic() - started < 0.1
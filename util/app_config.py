@@ -20,6 +20,44 @@ class Config(BaseModel):
     AWS_S3_BUCKET_NAME: str
     API_BASE_URL: str
     GEMINI_API_KEY: str
+    EMBEDDING_PROVIDER: str
+    EMBEDDING_MODEL: str
+    EMBEDDING_DIMENSION: int
+    LOCAL_EMBEDDING_DEVICE: str
+    LOCAL_EMBEDDING_BATCH_SIZE: int
+    EMBEDDING_REQUESTS_PER_MINUTE: float
+    EMBEDDING_TOKENS_PER_MINUTE: float
+    EMBEDDING_MAX_RETRIES: int
+    EMBEDDING_COALESCE_WINDOW_MS: float
+    EMBEDDING_BATCH_SIZE: int
+    EMBEDDING_WORKER_POLL_SECONDS: float
+    EMBEDDING_JOB_MAX_ATTEMPTS: int
+    EMBEDDING_JOB_LEASE_SECONDS: int
+    EMBEDDING_DEBOUNCE_SECONDS: float
+    EMBEDDING_DEBOUNCE_MAX_SECONDS: float
+    SEARCH_RERANK_CANDIDATES: int
+    SEARCH_BINARY_RERANK_CANDIDATES: int
+    SEARCH_HNSW_EF_SEARCH: int
+    SEARCH_HNSW_ITERATIVE_SCAN: str
+    SEARCH_FILTER_OVERFETCH: int
+    HYBRID_SEARCH_DEPTH: int
+    QUERY_EMBEDDING_CACHE_SIZE: int
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: float
+    QUERY_EMBEDDING_CACHE_PERSIST: bool
+    SIMILAR_CANDIDATES_CACHE_SIZE: int
+    SIMILAR_CANDIDATES_CACHE_TTL_SECONDS: float
+    SEARCH_ENGINE: str
+    PDF_EXTRACT_WORKERS: int
+    PDF_EXTRACT_TIMEOUT_SECONDS: float
+    PDF_EXTRACT_MAX_PAGES: int
+    RESUME_PARSE_JOB_STALE_SECONDS: float
+    RESUME_PARSE_EVENTS_MAX_SECONDS: float
+    RESUME_PARSE_BATCH_SIZE: int
+    RESUME_PARSE_WORKER_POLL_SECONDS: float
+    RESUME_PARSE_JOB_MAX_ATTEMPTS: int
+    RESUME_PARSE_JOB_RETENTION_SECONDS: float
+    SEARCH_MEMMAP_DIR: str
+    SEARCH_MEMMAP_REFRESH_SECONDS: float
 
 
 config = Config(
@@ -36,4 +74,64 @@ config = Config(
     AWS_S3_BUCKET_NAME=os.getenv("AWS_S3_BUCKET_NAME", ""),
     API_BASE_URL=os.getenv("API_BASE_URL", ""),
     GEMINI_API_KEY=os.getenv("GEMINI_API_KEY", ""),
+    EMBEDDING_PROVIDER=os.getenv("EMBEDDING_PROVIDER", "gemini"),
+    EMBEDDING_MODEL=os.getenv("EMBEDDING_MODEL", "gemini-embedding-exp-03-07"),
+    EMBEDDING_DIMENSION=int(os.getenv("EMBEDDING_DIMENSION", "3072")),
+    LOCAL_EMBEDDING_DEVICE=os.getenv("LOCAL_EMBEDDING_DEVICE", "cpu"),
+    LOCAL_EMBEDDING_BATCH_SIZE=int(os.getenv("LOCAL_EMBEDDING_BATCH_SIZE", "64")),
+    EMBEDDING_REQUESTS_PER_MINUTE=float(os.getenv("EMBEDDING_REQUESTS_PER_MINUTE", "0")),
+    EMBEDDING_TOKENS_PER_MINUTE=float(os.getenv("EMBEDDING_TOKENS_PER_MINUTE", "0")),
+    EMBEDDING_MAX_RETRIES=int(os.getenv("EMBEDDING_MAX_RETRIES", "5")),
+    EMBEDDING_COALESCE_WINDOW_MS=float(os.getenv("EMBEDDING_COALESCE_WINDOW_MS", "10")),
+    EMBEDDING_BATCH_SIZE=int(os.getenv("EMBEDDING_BATCH_SIZE", "100")),
+    EMBEDDING_WORKER_POLL_SECONDS=float(os.getenv("EMBEDDING_WORKER_POLL_SECONDS", "2")),
+    EMBEDDING_JOB_MAX_ATTEMPTS=int(os.getenv("EMBEDDING_JOB_MAX_ATTEMPTS", "5")),
+    EMBEDDING_JOB_LEASE_SECONDS=int(os.getenv("EMBEDDING_JOB_LEASE_SECONDS", "600")),
+    EMBEDDING_DEBOUNCE_SECONDS=float(os.getenv("EMBEDDING_DEBOUNCE_SECONDS", "30")),
+    EMBEDDING_DEBOUNCE_MAX_SECONDS=float(
+        os.getenv("EMBEDDING_DEBOUNCE_MAX_SECONDS", "300")
+    ),
+    SEARCH_RERANK_CANDIDATES=int(os.getenv("SEARCH_RERANK_CANDIDATES", "100")),
+    SEARCH_BINARY_RERANK_CANDIDATES=int(
+        os.getenv("SEARCH_BINARY_RERANK_CANDIDATES", "400")
+    ),
+    SEARCH_HNSW_EF_SEARCH=int(os.getenv("SEARCH_HNSW_EF_SEARCH", "100")),
+    SEARCH_HNSW_ITERATIVE_SCAN=os.getenv("SEARCH_HNSW_ITERATIVE_SCAN", "relaxed_order"),
+    SEARCH_FILTER_OVERFETCH=int(os.getenv("SEARCH_FILTER_OVERFETCH", "4")),
+    HYBRID_SEARCH_DEPTH=int(os.getenv("HYBRID_SEARCH_DEPTH", "200")),
+    QUERY_EMBEDDING_CACHE_SIZE=int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024")),
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS=float(
+        os.getenv("QUERY_EMBEDDING_CACHE_TTL_SECONDS", "86400")
+    ),
+    QUERY_EMBEDDING_CACHE_PERSIST=os.getenv("QUERY_EMBEDDING_CACHE_PERSIST", "false").lower()
+    in ("1", "true", "yes"),
+    SIMILAR_CANDIDATES_CACHE_SIZE=int(os.getenv("SIMILAR_CANDIDATES_CACHE_SIZE", "1024")),
+    SIMILAR_CANDIDATES_CACHE_TTL_SECONDS=float(
+        os.getenv("SIMILAR_CANDIDATES_CACHE_TTL_SECONDS", "3600")
+    ),
+    # "pgvector" (HNSW indexes) or "memmap" (exact search over a float16
+    # snapshot shared by the workers on a host; suits mid-sized pools).
+    SEARCH_ENGINE=os.getenv("SEARCH_ENGINE", "pgvector"),
+    SEARCH_MEMMAP_DIR=os.getenv("SEARCH_MEMMAP_DIR", "/tmp/ats-vector-index"),
+    SEARCH_MEMMAP_REFRESH_SECONDS=float(
+        os.getenv("SEARCH_MEMMAP_REFRESH_SECONDS", "5")
+    ),
+    PDF_EXTRACT_WORKERS=int(os.getenv("PDF_EXTRACT_WORKERS", "2")),
+    PDF_EXTRACT_TIMEOUT_SECONDS=float(os.getenv("PDF_EXTRACT_TIMEOUT_SECONDS", "30")),
+    PDF_EXTRACT_MAX_PAGES=int(os.getenv("PDF_EXTRACT_MAX_PAGES", "30")),
+    RESUME_PARSE_JOB_STALE_SECONDS=float(
+        os.getenv("RESUME_PARSE_JOB_STALE_SECONDS", "120")
+    ),
+    RESUME_PARSE_EVENTS_MAX_SECONDS=float(
+        os.getenv("RESUME_PARSE_EVENTS_MAX_SECONDS", "600")
+    ),
+    RESUME_PARSE_BATCH_SIZE=int(os.getenv("RESUME_PARSE_BATCH_SIZE", "4")),
+    RESUME_PARSE_WORKER_POLL_SECONDS=float(
+        os.getenv("RESUME_PARSE_WORKER_POLL_SECONDS", "1")
+    ),
+    RESUME_PARSE_JOB_MAX_ATTEMPTS=int(os.getenv("RESUME_PARSE_JOB_MAX_ATTEMPTS", "3")),
+    # Finished jobs are deleted this long after they end (default 7 days).
+    RESUME_PARSE_JOB_RETENTION_SECONDS=float(
+        os.getenv("RESUME_PARSE_JOB_RETENTION_SECONDS", "604800")
+    ),
 )
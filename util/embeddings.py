@@ -0,0 +1,276 @@
+import asyncio
+import logging
+import math
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import httpx
+from google import genai
+from google.genai import errors as genai_errors
+from google.genai import types
+
+from .app_config import config
+from .rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingProvider:
+    """
+    Turns text into vectors that fit `CandidateEmbedding.embedding`.
+    Implementations must return vectors of exactly `dimension` floats, in
+    input order.
+    """
+
+    model_name: str
+    dimension: int
+    # Largest number of texts a single provider request accepts (None: no limit).
+    max_batch_size: int | None = None
+
+    async def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        raise NotImplementedError
+
+    async def embed_query(self, text: str) -> list[float]:
+        vectors = await self.embed_documents([text])
+        return vectors[0]
+
+
+class GeminiEmbeddingProvider(EmbeddingProvider):
+    # Gemini rejects batchEmbedContents requests with more than 100 items.
+    max_batch_size = 100
+
+    def __init__(self, model_name: str, api_key: str, dimension: int):
+        self.model_name = model_name
+        self.dimension = dimension
+        self._client = genai.Client(api_key=api_key)
+
+    async def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors: list[list[float]] = []
+        for start in range(0, len(texts), self.max_batch_size):
+            response = await self._client.aio.models.embed_content(
+                model=self.model_name,
+                contents=texts[start : start + self.max_batch_size],
+                config=types.EmbedContentConfig(task_type="SEMANTIC_SIMILARITY"),
+            )
+            vectors.extend(embedding.values for embedding in response.embeddings)  # type: ignore
+        return vectors
+
+
+# --- Local sentence-transformers backend ---
+# The model lives in a dedicated worker process so CPU-bound inference never
+# runs on the event loop and torch is only imported when this provider is used.
+
+_local_model = None
+
+
+def _load_local_model(model_name: str, device: str) -> None:
+    global _local_model
+    from sentence_transformers import SentenceTransformer
+
+    _local_model = SentenceTransformer(model_name, device=device)
+
+
+def _encode_local(texts: list[str], batch_size: int) -> list[list[float]]:
+    vectors = _local_model.encode(  # type: ignore
+        texts,
+        batch_size=batch_size,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+    )
+    return vectors.tolist()
+
+
+class SentenceTransformerEmbeddingProvider(EmbeddingProvider):
+    def __init__(self, model_name: str, dimension: int, device: str, batch_size: int):
+        self.model_name = model_name
+        self.dimension = dimension
+        self.batch_size = batch_size
+        self._executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_load_local_model,
+            initargs=(model_name, device),
+        )
+
+    async def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        loop = asyncio.get_running_loop()
+        vectors = await loop.run_in_executor(
+            self._executor, _encode_local, texts, self.batch_size
+        )
+        return [pad_vector(vector, self.dimension) for vector in vectors]
+
+
+def pad_vector(vector: list[float], dimension: int) -> list[float]:
+    """
+    Zero-pad a smaller model's output to the column width. Padding leaves
+    cosine distances unchanged, so local vectors can share the column.
+    """
+    if len(vector) > dimension:
+        raise ValueError(
+            f"Embedding has {len(vector)} dimensions, column holds {dimension}."
+        )
+    return vector + [0.0] * (dimension - len(vector))
+
+
+def compact_vector(vector: list[float], dimension: int) -> list[float]:
+    """
+    Keep the leading `dimension` values and re-normalize to unit length.
+    Matches `l2_normalize(subvector(embedding, 1, dimension))` in SQL, which
+    the compact-column migration uses for existing rows.
+    """
+    head = vector[:dimension]
+    norm = math.sqrt(sum(value * value for value in head))
+    if norm == 0:
+        return head
+    return [value / norm for value in head]
+
+
+class EmbeddingUnavailableError(Exception):
+    """The provider kept failing with retryable (quota / server) errors."""
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, genai_errors.APIError):
+        return error.code == 429 or error.code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for the languages we index.
+    return len(text) // 4 + 1
+
+
+class RateLimitedEmbeddingProvider(EmbeddingProvider):
+    """
+    Wraps a provider with requests/tokens-per-minute buckets, jittered
+    exponential backoff on 429/5xx, and a short window that merges
+    concurrent `embed_query` calls into one batched request.
+    """
+
+    backoff_base_seconds = 1.0
+    backoff_cap_seconds = 30.0
+
+    def __init__(
+        self,
+        inner: EmbeddingProvider,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        max_retries: int,
+        coalesce_window_ms: float,
+    ):
+        self.inner = inner
+        self.model_name = inner.model_name
+        self.dimension = inner.dimension
+        self.max_batch_size = inner.max_batch_size
+        self.max_retries = max_retries
+        self.coalesce_window = coalesce_window_ms / 1000
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_tasks: set[asyncio.Task] = set()
+
+    async def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        step = self.max_batch_size or max(len(texts), 1)
+        vectors: list[list[float]] = []
+        for start in range(0, len(texts), step):
+            vectors.extend(await self._embed_request(texts[start : start + step]))
+        return vectors
+
+    async def _embed_request(self, texts: list[str]) -> list[list[float]]:
+        await self._tokens.acquire(sum(estimate_tokens(text) for text in texts))
+        for attempt in range(self.max_retries + 1):
+            await self._requests.acquire()
+            try:
+                return await self.inner.embed_documents(texts)
+            except Exception as e:
+                if not _is_retryable(e):
+                    raise
+                if attempt == self.max_retries:
+                    raise EmbeddingUnavailableError(
+                        f"Embedding provider still failing after {attempt + 1} attempts: {e}"
+                    ) from e
+                delay = min(self.backoff_cap_seconds, self.backoff_base_seconds * 2**attempt)
+                delay = delay / 2 + random.uniform(0, delay / 2)
+                logger.warning(
+                    "Embedding request failed (%s), retrying in %.1fs", e, delay
+                )
+                await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    async def embed_query(self, text: str) -> list[float]:
+        if self.coalesce_window <= 0:
+            return (await self.embed_documents([text]))[0]
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((text, future))
+        if self.max_batch_size and len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.coalesce_window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if pending:
+            task = asyncio.create_task(self._embed_pending(pending))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def _embed_pending(self, pending: list[tuple[str, asyncio.Future]]) -> None:
+        # Identical queries in the same window share one slot in the request.
+        texts = list(dict.fromkeys(text for text, _ in pending))
+        try:
+            vectors = dict(zip(texts, await self.embed_documents(texts)))
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for text, future in pending:
+            if not future.done():
+                future.set_result(vectors[text])
+
+
+def _create_provider(provider: str, model_name: str) -> EmbeddingProvider:
+    if provider == "gemini":
+        return GeminiEmbeddingProvider(
+            model_name=model_name,
+            api_key=config.GEMINI_API_KEY,
+            dimension=config.EMBEDDING_DIMENSION,
+        )
+    if provider == "sentence_transformers":
+        logger.info("Using local sentence-transformers model %s", model_name)
+        return SentenceTransformerEmbeddingProvider(
+            model_name=model_name,
+            dimension=config.EMBEDDING_DIMENSION,
+            device=config.LOCAL_EMBEDDING_DEVICE,
+            batch_size=config.LOCAL_EMBEDDING_BATCH_SIZE,
+        )
+    raise ValueError(f"Unknown embedding provider: {provider!r}")
+
+
+@lru_cache
+def get_embedding_provider(
+    provider: str | None = None, model_name: str | None = None
+) -> EmbeddingProvider:
+    """
+    Return the process-wide provider for `model_name` served by `provider`
+    (EMBEDDING_PROVIDER / EMBEDDING_MODEL by default). Instances are shared
+    by every caller so rate limits and query coalescing apply globally.
+    """
+    return RateLimitedEmbeddingProvider(
+        _create_provider(
+            provider or config.EMBEDDING_PROVIDER, model_name or config.EMBEDDING_MODEL
+        ),
+        requests_per_minute=config.EMBEDDING_REQUESTS_PER_MINUTE,
+        tokens_per_minute=config.EMBEDDING_TOKENS_PER_MINUTE,
+        max_retries=config.EMBEDDING_MAX_RETRIES,
+        coalesce_window_ms=config.EMBEDDING_COALESCE_WINDOW_MS,
+    )
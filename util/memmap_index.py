@@ -0,0 +1,328 @@
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, Sequence
+
+import numpy as np
+
+# Rows scored per matrix-vector product. NumPy has no BLAS kernel for
+# float16, so each block is widened to float32 before the product.
+SCORE_BLOCK_ROWS = 8192
+MIN_CAPACITY = 1024
+# Tombstoned slots are never reused, so the live rows are copied to a new
+# generation of files once this share of the snapshot is dead.
+COMPACT_TOMBSTONE_RATIO = 0.25
+
+
+class MemmapVectorIndex:
+    """
+    Float16 snapshot of one model's profile vectors for exact cosine
+    search. The matrix lives in memory-mapped files under `directory`, so
+    every worker on the host maps the same pages instead of holding its own
+    copy. Writers take an exclusive file lock; readers never lock.
+
+    Rows are appended before `meta.json` publishes the new row count, so a
+    reader never sees a half-written new row. Removed candidates are
+    tombstoned with id 0 and their slots are not reused until `compact()`
+    copies the live rows to a new generation of files; readers that
+    mapped the previous generation finish on it.
+    """
+
+    def __init__(self, directory: str, dimension: int):
+        self.directory = directory
+        self.dimension = dimension
+        self._meta: dict = {}
+        self._vectors: np.memmap | None = None
+        self._ids: np.memmap | None = None
+        # (generation, capacity) of the files currently mapped
+        self._mapped: tuple[int, int] | None = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _file(self, name: str, generation: int) -> str:
+        return self._path(f"{name}.{generation}")
+
+    def _read_meta(self) -> dict:
+        try:
+            with open(self._path("meta.json")) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            meta = {}
+        # Snapshots written before generations existed are rebuilt.
+        if "generation" not in meta:
+            meta = {
+                "generation": 0,
+                "capacity": 0,
+                "count": 0,
+                "tombstones": 0,
+                "watermark": None,
+                "deleted_watermark": None,
+                "refreshed_at": 0.0,
+            }
+        return meta
+
+    def _write_meta(self, meta: dict) -> None:
+        tmp = self._path("meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._path("meta.json"))
+        self._meta = meta
+
+    def _load(self) -> dict:
+        """
+        Re-read the metadata and remap the files if they have grown or a
+        compaction replaced them.
+        """
+        while True:
+            meta = self._read_meta()
+            generation, capacity = meta["generation"], meta["capacity"]
+            if not capacity:
+                self._vectors = self._ids = self._mapped = None
+            elif self._mapped != (generation, capacity):
+                try:
+                    vectors = np.memmap(
+                        self._file("vectors.f16", generation),
+                        dtype=np.float16,
+                        mode="r+",
+                        shape=(capacity, self.dimension),
+                    )
+                    ids = np.memmap(
+                        self._file("ids.i64", generation),
+                        dtype=np.int64,
+                        mode="r+",
+                        shape=(capacity,),
+                    )
+                except FileNotFoundError:
+                    # Compacted away between reading the metadata and
+                    # opening the files; the new metadata is published.
+                    continue
+                self._vectors, self._ids = vectors, ids
+                self._mapped = (generation, capacity)
+            self._meta = meta
+            return meta
+
+    @property
+    def watermark(self) -> datetime | None:
+        """Latest `updated_at` of the vectors in the snapshot."""
+        value = self._load()["watermark"]
+        return datetime.fromisoformat(value) if value else None
+
+    @property
+    def deleted_watermark(self) -> datetime | None:
+        """Time up to which deleted vectors have been tombstoned."""
+        value = self._load()["deleted_watermark"]
+        return datetime.fromisoformat(value) if value else None
+
+    @property
+    def needs_compaction(self) -> bool:
+        meta = self._load()
+        return meta["tombstones"] > COMPACT_TOMBSTONE_RATIO * meta["count"]
+
+    def is_fresh(self, max_age_seconds: float) -> bool:
+        return time.time() - self._load()["refreshed_at"] < max_age_seconds
+
+    @contextmanager
+    def try_lock(self) -> Iterator[bool]:
+        """
+        Exclusive writer lock shared by all processes. Yields False instead
+        of waiting when another writer holds it, as that writer is already
+        bringing the snapshot up to date.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(".lock"), "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _allocate(self, generation: int, capacity: int) -> None:
+        for name, row_bytes in (
+            ("vectors.f16", self.dimension * np.dtype(np.float16).itemsize),
+            ("ids.i64", np.dtype(np.int64).itemsize),
+        ):
+            with open(self._file(name, generation), "ab") as f:
+                f.truncate(capacity * row_bytes)
+
+    def _grow(self, capacity: int) -> None:
+        self._allocate(self._meta["generation"], capacity)
+        self._write_meta({**self._meta, "capacity": capacity})
+        self._load()
+
+    def _replace(self, meta: dict) -> None:
+        """Publish a new generation and delete the files of the previous one."""
+        previous = self._meta["generation"]
+        self._write_meta(meta)
+        self._load()
+        for name in ("vectors.f16", "ids.i64"):
+            try:
+                os.remove(self._file(name, previous))
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        """Empty the snapshot so it is rebuilt. Must hold `try_lock()`."""
+        meta = self._load()
+        self._replace(
+            {
+                **meta,
+                "generation": meta["generation"] + 1,
+                "capacity": 0,
+                "count": 0,
+                "tombstones": 0,
+                "watermark": None,
+                "deleted_watermark": None,
+            }
+        )
+
+    def compact(self) -> None:
+        """
+        Copy the live rows, in slot order, to a new generation of files
+        without tombstones. Must hold `try_lock()`.
+        """
+        meta = self._load()
+        count = meta["count"]
+        live = np.flatnonzero(self._ids[:count]) if count else np.empty(0, np.int64)
+        generation = meta["generation"] + 1
+        capacity = max(MIN_CAPACITY, 2 * len(live))
+        self._allocate(generation, capacity)
+        vectors = np.memmap(
+            self._file("vectors.f16", generation),
+            dtype=np.float16,
+            mode="r+",
+            shape=(capacity, self.dimension),
+        )
+        ids = np.memmap(
+            self._file("ids.i64", generation), dtype=np.int64, mode="r+", shape=(capacity,)
+        )
+        for start in range(0, len(live), SCORE_BLOCK_ROWS):
+            slots = live[start : start + SCORE_BLOCK_ROWS]
+            vectors[start : start + len(slots)] = self._vectors[slots]
+            ids[start : start + len(slots)] = self._ids[slots]
+        vectors.flush()
+        ids.flush()
+        self._replace(
+            {
+                **meta,
+                "generation": generation,
+                "capacity": capacity,
+                "count": len(live),
+                "tombstones": 0,
+            }
+        )
+
+    def apply(
+        self,
+        ids: Sequence[int],
+        vectors: Sequence[Sequence[float]],
+        removed: Sequence[int] = (),
+        watermark: datetime | None = None,
+        deleted_watermark: datetime | None = None,
+    ) -> None:
+        """
+        Tombstone the `removed` ids, then upsert `vectors` for `ids`. Must
+        hold `try_lock()`.
+        """
+        meta = self._load()
+        count = meta["count"]
+        tombstones = meta["tombstones"]
+        indexed = self._ids[:count] if self._ids is not None else np.empty(0, np.int64)
+        slots = {
+            int(candidate_id): slot
+            for slot, candidate_id in enumerate(indexed)
+            if candidate_id
+        }
+        for candidate_id in removed:
+            slot = slots.pop(candidate_id, None)
+            if slot is not None:
+                self._ids[slot] = 0
+                tombstones += 1
+
+        rows = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dimension)
+        norms = np.linalg.norm(rows, axis=1, keepdims=True)
+        rows = rows / np.where(norms == 0, 1, norms)
+
+        new_ids = [candidate_id for candidate_id in ids if candidate_id not in slots]
+        if count + len(new_ids) > meta["capacity"]:
+            self._grow(max(MIN_CAPACITY, 2 * (count + len(new_ids))))
+        for candidate_id in new_ids:
+            slots[candidate_id] = count
+            count += 1
+        for candidate_id, row in zip(ids, rows):
+            slot = slots[candidate_id]
+            self._vectors[slot] = row
+            self._ids[slot] = candidate_id
+
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._ids.flush()
+        if watermark:
+            self._meta["watermark"] = watermark.isoformat()
+        if deleted_watermark:
+            self._meta["deleted_watermark"] = deleted_watermark.isoformat()
+        self._write_meta(
+            {
+                **self._meta,
+                "count": count,
+                "tombstones": tombstones,
+                "refreshed_at": time.time(),
+            }
+        )
+
+    def search(
+        self,
+        query: Sequence[float],
+        limit: int,
+        allowed: Sequence[int] | None = None,
+        after: Sequence | None = None,
+        exclude: Sequence[int] = (),
+    ) -> list[tuple[int, float]]:
+        """
+        Exact top `limit` (candidate_id, cosine distance) pairs, ordered by
+        distance then id. `allowed` restricts the candidates, `exclude`
+        drops some; `after` is a (distance, id) keyset cursor.
+        """
+        count = self._load()["count"]
+        if not count or limit <= 0:
+            return []
+        # Another thread may remap the handle after a compaction; this
+        # search stays on the generation it started with.
+        vectors, ids = self._vectors, self._ids
+        q = np.asarray(query, dtype=np.float32)
+        q /= np.linalg.norm(q) or 1.0
+        ids = np.array(ids[:count])
+        distances = np.empty(count, dtype=np.float32)
+        for start in range(0, count, SCORE_BLOCK_ROWS):
+            stop = min(start + SCORE_BLOCK_ROWS, count)
+            block = vectors[start:stop].astype(np.float32)
+            distances[start:stop] = 1 - block @ q
+
+        excluded = ids == 0
+        if allowed is not None:
+            excluded |= ~np.isin(ids, np.asarray(allowed, dtype=np.int64))
+        if len(exclude):
+            excluded |= np.isin(ids, np.asarray(exclude, dtype=np.int64))
+        if after:
+            after_distance, after_id = after
+            excluded |= (distances < after_distance) | (
+                (distances == after_distance) & (ids <= after_id)
+            )
+        candidates = np.flatnonzero(~excluded)
+        if len(candidates) > limit:
+            top = np.argpartition(distances[candidates], limit - 1)[:limit]
+            # Rows tied with the k-th distance may fall on either side of
+            # the partition; keep them all so the id tie-break is exact.
+            cutoff = distances[candidates[top]].max()
+            candidates = candidates[distances[candidates] <= cutoff]
+        order = np.lexsort((ids[candidates], distances[candidates]))[:limit]
+        return [
+            (int(ids[slot]), float(distances[slot])) for slot in candidates[order]
+        ]
@@ -0,0 +1,118 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+from multiprocessing.connection import Connection
+from typing import NamedTuple
+
+import pdfplumber
+
+from .app_config import config
+
+logger = logging.getLogger(__name__)
+
+
+class PdfExtractionError(Exception):
+    """The PDF could not be parsed, or parsing took longer than allowed."""
+
+
+class PdfText(NamedTuple):
+    text: str
+    page_count: int
+    # Pages the text was taken from, capped at the requested max_pages.
+    pages_extracted: int
+
+
+# --- Worker side ---
+# pdfplumber is pure Python and CPU-bound: parsing in a separate process
+# keeps it off the event loop and lets concurrent uploads use every core.
+
+
+def _extract_text(source: str | bytes, max_pages: int) -> PdfText:
+    file = io.BytesIO(source) if isinstance(source, bytes) else source
+    with pdfplumber.open(file) as pdf:
+        pages = pdf.pages[:max_pages]
+        text = "\n\n".join(page.extract_text() or "" for page in pages)
+        return PdfText(text, len(pdf.pages), len(pages))
+
+
+def _extract_to_pipe(conn: Connection, source: str | bytes, max_pages: int) -> None:
+    try:
+        conn.send((True, _extract_text(source, max_pages)))
+    except Exception as e:
+        # Parser exceptions are not always picklable; their message is.
+        conn.send((False, str(e)))
+    finally:
+        conn.close()
+
+
+# --- Caller side ---
+# Each extraction gets its own process, so a timeout kills exactly the
+# parse that overran and never another request's. The fork server keeps
+# pdfplumber imported, so starting a process costs a fork, not an import.
+
+_context = multiprocessing.get_context("forkserver")
+_context.set_forkserver_preload([__name__])
+_slots: asyncio.Semaphore | None = None
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(config.PDF_EXTRACT_WORKERS)
+    return _slots
+
+
+def _extract_in_process(source: str | bytes, max_pages: int, timeout: float) -> PdfText:
+    receiver, sender = _context.Pipe(duplex=False)
+    process = _context.Process(
+        target=_extract_to_pipe, args=(sender, source, max_pages), daemon=True
+    )
+    process.start()
+    sender.close()
+    try:
+        # Also returns early when the process dies without sending.
+        if not receiver.poll(timeout):
+            logger.warning("PDF extraction timed out, terminating its process")
+            raise PdfExtractionError("PDF text extraction timed out")
+        try:
+            ok, value = receiver.recv()
+        except EOFError:
+            raise PdfExtractionError("PDF extraction worker crashed")
+    finally:
+        receiver.close()
+        if process.is_alive():
+            process.terminate()
+        process.join()
+    if not ok:
+        raise PdfExtractionError(f"Could not extract PDF text: {value}")
+    return value
+
+
+async def extract_pdf(
+    source: str | bytes,
+    max_pages: int | None = None,
+    timeout: float | None = None,
+) -> PdfText:
+    """
+    Text of the first `max_pages` pages (PDF_EXTRACT_MAX_PAGES) of the PDF
+    at path `source` or in `source` bytes, extracted in a separate process,
+    at most PDF_EXTRACT_WORKERS at a time. Raises PdfExtractionError when
+    parsing fails or exceeds `timeout` seconds (PDF_EXTRACT_TIMEOUT_SECONDS).
+    """
+    async with _get_slots():
+        return await asyncio.to_thread(
+            _extract_in_process,
+            source,
+            max_pages or config.PDF_EXTRACT_MAX_PAGES,
+            timeout or config.PDF_EXTRACT_TIMEOUT_SECONDS,
+        )
+
+
+async def extract_pdf_text(
+    source: str | bytes,
+    max_pages: int | None = None,
+    timeout: float | None = None,
+) -> str:
+    """Like `extract_pdf`, returning only the text."""
+    return (await extract_pdf(source, max_pages, timeout)).text
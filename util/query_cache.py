@@ -0,0 +1,106 @@
+import re
+import time
+from collections import OrderedDict
+from typing import Callable
+
+
+def normalize_query(text: str) -> str:
+    """Case- and whitespace-insensitive form of a search string."""
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+class QueryEmbeddingCache:
+    """
+    In-process LRU of query embeddings with a per-entry TTL. Keys are
+    (model, normalized query) so a model cutover never serves stale vectors.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[tuple[str, str], tuple[float, list[float]]] = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.persisted_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, model: str, query: str) -> list[float] | None:
+        key = (model, normalize_query(query))
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, vector = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return vector
+
+    def put(self, model: str, query: str, vector: list[float]) -> None:
+        if self.max_entries <= 0:
+            return
+        key = (model, normalize_query(query))
+        self._entries[key] = (self._clock() + self.ttl_seconds, vector)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.persisted_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "persisted_hits": self.persisted_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.persisted_hits) / lookups if lookups else 0.0,
+        }
+
+
+class SimilarCandidatesCache:
+    """
+    In-process LRU of "more like this" pages with a per-entry TTL. Each
+    entry is stamped with the source candidate's embedding version, so a
+    re-embedded candidate never serves the neighbours of its old vector.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[tuple, tuple[float, object, object]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple, stamp: object) -> object | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self._clock() or entry[1] != stamp:
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def put(self, key: tuple, stamp: object, value: object) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (self._clock() + self.ttl_seconds, stamp, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)